@@ -0,0 +1,37 @@
+import argparse
+import sys
+import typing as T
+from benchmarks.generators import default_workloads
+from benchmarks.runner import run, save, load, compare, report
+
+
+def main(argv: T.Optional[T.List[str]] = None) -> int:
+    """
+        Runs the benchmarks, optionally saving the results and comparing them with a baseline.
+        Returns 1 if there is any regression, 0 otherwise.
+    """
+    arg_parser = argparse.ArgumentParser(description="Time each phase of the parser construction and parsing on synthetic grammars.")
+    arg_parser.add_argument("--scale", type=int, default=1, help="size of the generated grammars")
+    arg_parser.add_argument("--tokens", type=int, default=20000, help="length of the parsed inputs")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="runs per measure (the best one is kept)")
+    arg_parser.add_argument("--output", help="JSON file to write the results to")
+    arg_parser.add_argument("--baseline", help="JSON file of previous results to compare with")
+    arg_parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before reporting a regression")
+    args = arg_parser.parse_args(argv)
+
+    results = run(default_workloads(args.scale), args.tokens, args.repeat)
+    print(report(results))
+    if args.output:
+        save(results, args.output)
+    if args.baseline:
+        regressions = compare(results, load(args.baseline), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regression with respect to {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
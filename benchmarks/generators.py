@@ -0,0 +1,175 @@
+"""
+    Synthetic grammars of any size, with generators of valid inputs of any length.
+
+    Every generator returns a Workload: the productions of the grammar (to build fresh Grammar
+    objects, since they cache their FIRST and FOLLOW sets) and a function producing a valid
+    token stream of at least n tokens, lazily, from a random seed.
+"""
+import typing as T
+import random
+from grammar import Grammar
+
+TOKENS = T.Callable[[int, int], T.Iterator[str]]
+
+
+class Workload(T.NamedTuple):
+    """
+        @attrs:
+            name [str]: identifies the workload in benchmark results
+            rules [dict[str, set[str]]]: productions, as in Grammar
+            start [str]: start variable
+            tokens [Callable[[int, int], Iterator[str]]]: (n, seed) -> terminal names of a valid
+                input of at least n tokens
+    """
+    name: str
+    rules: T.Dict[str, T.Set[str]]
+    start: str
+    tokens: TOKENS
+
+    def grammar(self) -> Grammar:
+        """
+            New Grammar object (with nothing computed yet).
+        """
+        return Grammar({var: set(words) for var, words in self.rules.items()}, self.start)
+
+
+def expression_tower(levels: int) -> Workload:
+    """
+        Expressions with 'levels' binary operators of increasing precedence, one variable each
+        (the usual stratified E / T / F grammar for levels = 2):
+            E0 -> E0 op0 E1 | E1
+            ...
+            Ek -> OPENP E0 CLOSEP | id | num     (k = levels)
+        Deep towers make long chains of unit reductions.
+    """
+    rules: T.Dict[str, T.Set[str]] = dict()
+    for k in range(levels):
+        rules[f"E{k}"] = {f"E{k} op{k} E{k + 1}", f"E{k + 1}"}
+    rules[f"E{levels}"] = {"OPENP E0 CLOSEP", "id", "num"}
+
+    def tokens(n: int, seed: int = 0) -> T.Iterator[str]:
+        rng = random.Random(seed)
+        operators = [f"op{k}" for k in range(levels)]
+        count = 0
+        while (True):
+            if rng.random() < 0.1:  # short parenthesized operand
+                yield from ("OPENP", rng.choice(("id", "num")), rng.choice(operators), rng.choice(("id", "num")), "CLOSEP")
+                count += 5
+            else:
+                yield rng.choice(("id", "num"))
+                count += 1
+            if count >= n:
+                return
+            yield rng.choice(operators)
+            count += 1
+
+    return Workload(f"expression_tower_{levels}", rules, "E0", tokens)
+
+
+def statement_list(kinds: int) -> Workload:
+    """
+        Long left-recursive list of statements of 'kinds' keyword-introduced forms, plus
+        assignments and nested blocks:
+            P -> P S | S
+            S -> id EQ E SEMI | BEGIN P END | kw0 id SEMI | ... | kw{kinds-1} id SEMI
+            E -> E PLUS id | id
+    """
+    rules = {
+        "P": {"P S", "S"},
+        "S": {"id EQ E SEMI", "BEGIN P END"} | {f"kw{k} id SEMI" for k in range(kinds)},
+        "E": {"E PLUS id", "id"},
+    }
+
+    def tokens(n: int, seed: int = 0) -> T.Iterator[str]:
+        rng = random.Random(seed)
+        count, depth = 0, 0
+        while (count < n or depth > 0):
+            r = rng.random()
+            if r < 0.05 and depth < 10 and count < n:
+                yield "BEGIN"
+                depth += 1
+                count += 1
+            elif r < 0.1 and depth > 0:
+                yield "END"
+                depth -= 1
+                count += 1
+                continue  # a block is a statement: the list goes on
+            if r < 0.5:
+                statement = ["id", "EQ", "id"] + ["PLUS", "id"] * rng.randrange(3) + ["SEMI"]
+            else:
+                statement = [f"kw{rng.randrange(kinds)}", "id", "SEMI"]
+            yield from statement
+            count += len(statement)
+
+    return Workload(f"statement_list_{kinds}", rules, "P", tokens)
+
+
+def nullable_sequence(width: int) -> Workload:
+    """
+        Items made of 'width' optional parts, so that most reductions are by empty productions:
+            S -> S X | X
+            X -> A0 A1 ... A{width-1} end
+            Ai -> ai |
+    """
+    rules: T.Dict[str, T.Set[str]] = {
+        "S": {"S X", "X"},
+        "X": {" ".join(f"A{i}" for i in range(width)) + " end"},
+    }
+    for i in range(width):
+        rules[f"A{i}"] = {f"a{i}", ""}
+
+    def tokens(n: int, seed: int = 0) -> T.Iterator[str]:
+        rng = random.Random(seed)
+        count = 0
+        while (count < n):
+            for i in range(width):
+                if rng.random() < 0.3:
+                    yield f"a{i}"
+                    count += 1
+            yield "end"
+            count += 1
+
+    return Workload(f"nullable_sequence_{width}", rules, "S", tokens)
+
+
+def large_vocabulary(n_terminals: int) -> Workload:
+    """
+        Sequences over many terminals (wide ACTION tables):
+            S -> S T | T
+            T -> t0 | ... | t{n_terminals-1} | OPENP S CLOSEP
+    """
+    rules = {
+        "S": {"S T", "T"},
+        "T": {f"t{i}" for i in range(n_terminals)} | {"OPENP S CLOSEP"},
+    }
+
+    def tokens(n: int, seed: int = 0) -> T.Iterator[str]:
+        rng = random.Random(seed)
+        count, depth = 0, 0
+        while (count < n or depth > 0):
+            r = rng.random()
+            if r < 0.05 and depth < 10 and count < n:
+                yield "OPENP"  # S can not be empty
+                depth += 1
+                count += 1
+            elif r < 0.1 and depth > 0:
+                yield "CLOSEP"
+                depth -= 1
+                count += 1
+                continue
+            yield f"t{rng.randrange(n_terminals)}"
+            count += 1
+
+    return Workload(f"large_vocabulary_{n_terminals}", rules, "S", tokens)
+
+
+def default_workloads(scale: int = 1) -> T.List[Workload]:
+    """
+        One workload of each kind, with grammars growing linearly with 'scale'.
+    """
+    return [
+        expression_tower(4 * scale),
+        statement_list(10 * scale),
+        nullable_sequence(8 * scale),
+        large_vocabulary(200 * scale),
+    ]
@@ -0,0 +1,136 @@
+"""
+    Times every phase of the construction and use of an SLR parser on synthetic workloads,
+    and compares the results with a baseline to catch performance regressions.
+"""
+import typing as T
+import json
+import platform
+import time
+from benchmarks.generators import Workload
+from parsers.LR0 import LR0_Automaton
+from parsers.SLR import SLR_Parser
+
+# construction phases (seconds, lower is better), in pipeline order
+PHASES = ("first", "follow", "automaton", "compile_tables", "build_table")
+# parsing throughput (tokens per second, higher is better)
+THROUGHPUTS = ("parse", "recognize")
+
+RESULTS = T.Dict[str, T.Any]
+
+
+def measure(workload: Workload, n_tokens: int, repeat: int = 3, seed: int = 0) -> T.Dict[str, float]:
+    """
+        Best time (over 'repeat' runs, each on a fresh Grammar) of each phase:
+            first: Grammar.first (the grammar is compiled on first use)
+            follow: Grammar.follow
+            automaton: LR0_Automaton construction
+            compile_tables: SLR_Parser construction on that automaton (SLR_Parser.compile_tables,
+                integer ACTION and GOTO tables)
+            build_table: SLR_Parser.build_table (their dict representation)
+        and the best throughput of SLR_Parser.parse and SLR_Parser.recognize on a valid
+        input of n_tokens tokens (generated beforehand).
+    """
+    best: T.Dict[str, float] = dict()
+
+    def record(key: str, value: float, higher_is_better: bool = False):
+        if key not in best or (value > best[key] if higher_is_better else value < best[key]):
+            best[key] = value
+
+    tokens = list(workload.tokens(n_tokens, seed))
+    for _ in range(repeat):
+        grammar = workload.grammar()
+        start = time.perf_counter()
+        first = grammar.first(bitset=True)
+        record("first", time.perf_counter() - start)
+        start = time.perf_counter()
+        grammar.follow(first, bitset=True)
+        record("follow", time.perf_counter() - start)
+        start = time.perf_counter()
+        automaton = LR0_Automaton(grammar)
+        record("automaton", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        parser = SLR_Parser(grammar, automaton=automaton)
+        record("compile_tables", time.perf_counter() - start)
+        start = time.perf_counter()
+        parser.build_table()
+        record("build_table", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        status, _ = parser.parse(tokens)
+        elapsed = time.perf_counter() - start
+        if status != 0:
+            raise RuntimeError(f"Workload {workload.name} generated an invalid input")
+        record("parse", len(tokens) / max(elapsed, 1e-9), higher_is_better=True)
+        start = time.perf_counter()
+        parser.recognize(tokens)
+        record("recognize", len(tokens) / max(time.perf_counter() - start, 1e-9), higher_is_better=True)
+    return best
+
+
+def run(workloads: T.Sequence[Workload], n_tokens: int, repeat: int = 3) -> RESULTS:
+    """
+        Results of measure for every workload, with the context needed to compare runs.
+    """
+    return {
+        "python": platform.python_version(),
+        "n_tokens": n_tokens,
+        "repeat": repeat,
+        "workloads": {w.name: measure(w, n_tokens, repeat) for w in workloads},
+    }
+
+
+def save(results: RESULTS, filepath: str):
+    with open(filepath, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load(filepath: str) -> RESULTS:
+    with open(filepath) as f:
+        return json.load(f)
+
+
+def compare(results: RESULTS,
+            baseline: RESULTS,
+            tolerance: float = 0.25,
+            min_seconds: float = 1e-3) -> T.List[str]:
+    """
+        Regressions of 'results' with respect to 'baseline': phases more than (1 + tolerance)
+        times slower, and throughputs more than (1 + tolerance) times lower. Phases that take
+        less than min_seconds in both runs are ignored (too noisy), as are the workloads and
+        metrics missing from either run.
+
+        @returns:
+            one message per regression (empty if there is none)
+    """
+    regressions: T.List[str] = []
+    for name, metrics in results["workloads"].items():
+        reference = baseline["workloads"].get(name)
+        if reference is None:
+            continue
+        for phase in PHASES:
+            if phase not in metrics or phase not in reference:
+                continue
+            if max(metrics[phase], reference[phase]) < min_seconds:
+                continue
+            if metrics[phase] > reference[phase] * (1 + tolerance):
+                regressions.append(f"{name}: {phase} took {metrics[phase]:.4f}s (baseline {reference[phase]:.4f}s)")
+        for kind in THROUGHPUTS:
+            if kind not in metrics or kind not in reference:
+                continue
+            if metrics[kind] * (1 + tolerance) < reference[kind]:
+                regressions.append(f"{name}: {kind} ran at {metrics[kind]:.0f} tokens/s (baseline {reference[kind]:.0f} tokens/s)")
+    return regressions
+
+
+def report(results: RESULTS) -> str:
+    """
+        Results as a text table, one row per workload.
+    """
+    header = f"{'workload':<26}" + "".join(f"{phase:>15}" for phase in PHASES) + "".join(f"{kind + ' tok/s':>17}" for kind in THROUGHPUTS)
+    lines = [header]
+    for name, metrics in results["workloads"].items():
+        lines.append(f"{name:<26}"
+                     + "".join(f"{metrics[phase]:>15.5f}" for phase in PHASES)
+                     + "".join(f"{metrics[kind]:>17.0f}" for kind in THROUGHPUTS))
+    return "\n".join(lines)
@@ -1,11 +1,18 @@
 import typing as T
+import hashlib
+import json
+from array import array
+from utils.digraph import digraph
+from utils.bitset import BitsetMapping, bits_of
 
 
 class Grammar:
     def __init__(self,
                  grammar: T.Dict[str, T.Set[str]],
                  start: str,
-                 eof_symbol: str = "$"):
+                 eof_symbol: str = "$",
+                 precedence: T.Optional[T.Sequence[T.Tuple[str, T.Sequence[str]]]] = None,
+                 production_precedence: T.Optional[T.Dict[T.Tuple[str, T.Tuple[str, ...]], str]] = None):
         """
 
         Args:
@@ -15,6 +22,13 @@ class Grammar:
                 start variable
             eof_symbol (str):
                 symbol for end of input
+            precedence (Optional[list[tuple[str, list[str]]]]):
+                yacc-style operator precedence: (associativity, terminals) pairs, from the lowest
+                to the highest precedence, associativity being 'left', 'right' or 'nonassoc'.
+                Terminals may also be names only used in production_precedence (e.g. UMINUS)
+            production_precedence (Optional[dict[tuple[str, tuple[str]], str]]):
+                (variable, word) -> terminal whose precedence the production takes (%prec), instead
+                of the one of its last terminal with a declared precedence
 
         NOTE: any symbol not in the left hand of any rule is considered a terminal
         """
@@ -34,6 +48,11 @@ class Grammar:
 
         self.start = start
         self.eof_symbol = eof_symbol
+        self.precedence: T.List[T.Tuple[str, T.List[str]]] = [(assoc, list(names)) for assoc, names in (precedence or [])]
+        self.production_precedence: T.Dict[T.Tuple[str, T.Tuple[str, ...]], str] = dict(production_precedence or {})
+        for assoc, _ in self.precedence:
+            if assoc not in ("left", "right", "nonassoc"):
+                raise ValueError(f"Unknown associativity '{assoc}': expected 'left', 'right' or 'nonassoc'")
 
         for A, right_side in self.grammar.items():
             self.symbols.add(A)
@@ -46,6 +65,8 @@ class Grammar:
             self.terminals.remove('')
             self.symbols.remove('')
 
+        self._compiled: T.Optional["CompiledGrammar"] = None
+
     def __str__(self,
                 rule_separator: str = "->",
                 or_clause: str = "|",
@@ -70,39 +91,28 @@ class Grammar:
                     f"{(' ' + or_clause + ' ').join(right_side)}\n"
         return s.strip()
 
-    def first(self) -> T.Dict[str, T.Set[str]]:
+    def first(self, bitset: bool = False) -> T.Mapping[str, T.Set[str]]:
         """
         Args:
             self: grammar object
+            bitset (bool): if true, return a read-only view over the bitsets
+                computed by CompiledGrammar.first_sets instead of a dict of fresh sets
 
         Algorithm:
-            First(t) = [t] for all terminals
-            For each grammar production A -> X1 ... XN
-                if (epsilon in First(X1) and ... and epsilon in First(X(i-1)))
-                    First(A) <- First(A) U First(Xi)
-        """
-        first: T.Dict[str, T.Set[str]] = dict()
-        first[''] = set({''})
-        for t in self.terminals:
-            first[t] = set({t})
-        # pre-create all first sets for variables (as empty)
-        for A in self.vars:
-            first[A] = set()
-
-        converged = False
-        while (not converged):
-            converged = True
-            for A, possible_targets in self.grammar.items():
-                for word in possible_targets:
-                    old_first = first[A]
-                    for i in range(len(word)):
-                        if (all(['' in first[word[j]] for j in range(i)])):
-                            first[A] = first[A].union(first[word[i]])
-                    if (all(['' in first[x] for x in word])):
-                        first[A].add('')
-                    if (first[A] != old_first):
-                        converged = False
-        return first
+            see CompiledGrammar.first_sets
+
+        Returns:
+            dict[str, set[str]]: first set of every symbol (and of the empty word '')
+        """
+        view = self.compile().first_view()
+        return view if bitset else view.to_dict()
+
+    def nullable(self) -> T.Set[str]:
+        """
+        Set of variables that derive the empty word (see CompiledGrammar.nullable).
+        """
+        compiled = self.compile()
+        return set(compiled.names[s] for s, flag in enumerate(compiled.nullable()) if flag)
 
     @staticmethod
     def first_fromword(word: T.Union[T.List[str], T.Tuple[str, ...]],
@@ -116,65 +126,420 @@ class Grammar:
 
         Returns:
             set[str]: first set of W1W2...WN
-        Complexity (estimated):
-            O(|word|^2 + sum first[Wi]) algorithm (naive approach)
+        Complexity:
+            O(|word| + sum first[Wi]), scanning stops at the first non-nullable symbol
         """
         F: T.Set[str] = set()
-        for i in range(len(word)):
-            if (all(['' in first[word[j]] for j in range(i)])):
-                F = F.union(first[word[i]])
-        if (all(['' in first[w] for w in word])):
-            F.add('')
+        for symb in word:
+            F.update(first[symb])
+            if ('' not in first[symb]):
+                F.discard('')
+                return F
+        F.add('')
         return F
 
     def follow(self,
-               first: T.Dict[str, T.Set[str]]) -> T.Dict[str, T.Set[str]]:
+               first: T.Mapping[str, T.Set[str]],
+               bitset: bool = False) -> T.Mapping[str, T.Set[str]]:
         """
         Args:
             self: grammar object
             first (dict[str, set[str]]): first set of all symbols in grammar
+            bitset (bool): if true, return a read-only view over the bitsets
+                instead of a dict of fresh sets
 
         Algorithm:
-            follow(S) <- ['$']
-            do
-                for A -> aBb productions
-                    if '' not in first(b)
-                        follow(B) <- follow(B) U first(b)
-                    else
-                        follow(B) <- follow(B) U (first(b) \\ {''}) U follow(A)
-            while changes occur
+            see CompiledGrammar.follow_sets
 
         Returns:
             dict[str, set[str]]: follow set of each nonterminal
         """
-        follow: T.Dict[str, T.Set[str]] = dict()
-        converged: bool = False
+        compiled = self.compile()
+        if first is compiled.first_view():
+            follow = compiled.follow_sets()
+        else:
+            first_bits = [0] * compiled.n_symbols
+            nullable = [False] * compiled.n_symbols
+            for s, name in enumerate(compiled.names):
+                if name in first:
+                    first_bits[s] = bits_of(compiled.ids[t] for t in first[name] if t != '')
+                    nullable[s] = '' in first[name]
+            follow = compiled.follow_sets(first_bits, nullable)
+        view = compiled.follow_view(follow)
+        return view if bitset else view.to_dict()
+
+    def compile(self) -> "CompiledGrammar":
+        """
+            Integer representation of this grammar (built once and cached).
+        """
+        if self._compiled is None:
+            self._compiled = CompiledGrammar(self)
+        return self._compiled
+
+
+class CompiledGrammar:
+    """
+        Grammar with interned symbols and numbered productions.
+
+        Symbols are mapped to dense integer ids: terminals come first, starting with
+        the EOF symbol (always id 0), followed by the variables. So a symbol 's' is a
+        terminal iff s < n_terminals, and a variable v has 'column' v - n_terminals.
+
+        Production p is lhs[p] -> rhs[offset[p]] ... rhs[offset[p + 1] - 1], all stored
+        in flat integer arrays. Productions are numbered following the order of the
+        variables in the grammar (which is the order in the grammar file), so the
+        numbering is the same between runs.
+
+        Names are kept only for display purposes (and AST labels).
+
+        @attrs:
+            names [list[str]]: symbol id -> name
+            ids [dict[str, int]]: name -> symbol id
+            n_terminals [int]: number of terminals (EOF included)
+            n_symbols [int]: number of symbols
+            eof [int]: id of the EOF symbol
+            start [int]: id of the start variable
+            lhs [array[int]]: left side of each production
+            offset [array[int]]: where the right side of each production starts in 'rhs'
+            rhs [array[int]]: right sides of all productions, concatenated
+            productions_of [list[list[int]]]: symbol id -> ids of its productions (empty for terminals)
+            associativity [list[str]]: precedence level -> 'left', 'right' or 'nonassoc' (level 0 means no precedence)
+            precedence [array[int]]: symbol id -> precedence level (0 for variables and undeclared terminals)
+            production_precedence [array[int]]: production -> precedence level
+    """
+
+    def __init__(self, grammar: Grammar):
+        self.grammar = grammar
+        words: T.List[T.Tuple[str, T.Tuple[str, ...]]] = []
+        for A, possible_targets in grammar.grammar.items():
+            for word in sorted(possible_targets):
+                words.append((A, word))
+
+        # terminals in order of first appearance
+        self.names: T.List[str] = [grammar.eof_symbol]
+        self.ids: T.Dict[str, int] = {grammar.eof_symbol: 0}
+        for _, word in words:
+            for symb in word:
+                if (symb not in grammar.vars and symb not in self.ids):
+                    self.ids[symb] = len(self.names)
+                    self.names.append(symb)
+        self.n_terminals: int = len(self.names)
+        for A in grammar.grammar:
+            self.ids[A] = len(self.names)
+            self.names.append(A)
+        self.n_symbols: int = len(self.names)
+        self.eof: int = 0
+        self.start: int = self.ids[grammar.start]
 
-        # pre-create all follow sets
-        for A in self.vars:
-            follow[A] = set()
+        self.lhs = array('i')
+        self.offset = array('i', [0])
+        self.rhs = array('i')
+        self.productions_of: T.List[T.List[int]] = [[] for _ in range(self.n_symbols)]
+        for p, (A, word) in enumerate(words):
+            self.lhs.append(self.ids[A])
+            self.rhs.extend(self.ids[symb] for symb in word)
+            self.offset.append(len(self.rhs))
+            self.productions_of[self.ids[A]].append(p)
+
+        # operator precedence: levels start at 1, in declaration order
+        self.associativity: T.List[str] = [""] + [assoc for assoc, _ in grammar.precedence]
+        level_of: T.Dict[str, int] = dict()
+        for level, (_, names) in enumerate(grammar.precedence, start=1):
+            for name in names:
+                level_of[name] = level
+        self.precedence = array('i', [level_of.get(name, 0) if s < self.n_terminals else 0
+                                      for s, name in enumerate(self.names)])
+        self.production_precedence = array('i', [0]) * len(words)
+        for p, (A, word) in enumerate(words):
+            if (A, word) in grammar.production_precedence:
+                name = grammar.production_precedence[A, word]
+                if name not in level_of:
+                    raise ValueError(f"%prec {name} in production {A} -> {' '.join(word)}: {name} has no declared precedence")
+                self.production_precedence[p] = level_of[name]
+                continue
+            for symb in reversed(word):
+                if (self.precedence[self.ids[symb]] != 0):
+                    self.production_precedence[p] = self.precedence[self.ids[symb]]
+                    break
+
+        # LR(0) items: item offset[p] + p + dot stands for lhs[p] -> rhs[...dot] . rhs[dot...],
+        # so each production owns length(p) + 1 consecutive ids and advancing the dot is +1
+        self.item_production = array('i')
+        self.item_symbol = array('i')  # symbol right after the dot, -1 if there is none
+        for p in range(self.n_productions):
+            for i in range(self.offset[p], self.offset[p + 1]):
+                self.item_production.append(p)
+                self.item_symbol.append(self.rhs[i])
+            self.item_production.append(p)
+            self.item_symbol.append(-1)
+
+        self._closures: T.List[T.Optional[T.Tuple[int, ...]]] = [None] * self.n_symbols
+        self._nullable: T.Optional[T.List[bool]] = None
+        self._first: T.Optional[T.List[int]] = None
+        self._follow: T.Optional[T.List[int]] = None
+        self._first_view: T.Optional[BitsetMapping] = None
+
+    def nullable(self) -> T.List[bool]:
+        """
+            nullable[s] is true iff symbol s derives the empty word (computed once).
+
+            Algorithm:
+                Every production A -> X1 ... XN keeps a counter of how many of its
+                symbols are not yet known to be nullable. Once a variable becomes
+                nullable, the counters of the productions it occurs in are decreased,
+                and a production whose counter reaches zero makes its left side nullable.
+        """
+        if self._nullable is not None:
+            return self._nullable
+        nullable: T.List[bool] = [False] * self.n_symbols
+        # occurrences[B] = productions where B occurs (once per occurrence)
+        occurrences: T.List[T.List[int]] = [[] for _ in range(self.n_symbols)]
+        counters: T.List[int] = [0] * self.n_productions
+        worklist: T.List[int] = []
+        for p in range(self.n_productions):
+            word = self.right_side(p)
+            if (any(self.is_terminal(s) for s in word)):
+                continue  # contains a terminal, can never vanish
+            counters[p] = len(word)
+            for s in word:
+                occurrences[s].append(p)
+            if (len(word) == 0 and not nullable[self.lhs[p]]):
+                nullable[self.lhs[p]] = True
+                worklist.append(self.lhs[p])
+
+        while (worklist):
+            B = worklist.pop()
+            for p in occurrences[B]:
+                counters[p] -= 1
+                if (counters[p] == 0 and not nullable[self.lhs[p]]):
+                    nullable[self.lhs[p]] = True
+                    worklist.append(self.lhs[p])
+        self._nullable = nullable
+        return nullable
+
+    def first_sets(self) -> T.List[int]:
+        """
+            first[s] = bitset of the terminals that can start a word derived from s
+            (the empty word is not in the bitset, see nullable). Computed once.
+
+            Algorithm:
+                First(t) = [t] for all terminals
+                For each grammar production A -> X1 ... XN, scan X1, X2, ... up to
+                (and including) the first non-nullable symbol Xi:
+                    terminals are added to First(A) right away
+                    each variable Xj is recorded as a dependency (Xj -> A)
+
+                Then a worklist propagates First(B) to every A that depends on B,
+                requeueing A only when its set actually grows.
+
+            Complexity:
+                O(|G| * |terminals| / wordsize), where |G| is the total size of all productions
+        """
+        if self._first is not None:
+            return self._first
+        nullable = self.nullable()
+        first: T.List[int] = [0] * self.n_symbols
+        for t in range(self.n_terminals):
+            first[t] = 1 << t
+
+        # dependents[B] = variables A with a production A -> X1 ... B ...
+        # where X1 ... are all nullable
+        dependents: T.List[T.Set[int]] = [set() for _ in range(self.n_symbols)]
+        for p in range(self.n_productions):
+            A = self.lhs[p]
+            for s in self.right_side(p):
+                if (self.is_terminal(s)):
+                    first[A] |= first[s]
+                elif (s != A):
+                    dependents[s].add(A)
+                if (not nullable[s]):
+                    break
+
+        worklist: T.List[int] = [A for A in range(self.n_terminals, self.n_symbols) if first[A] != 0]
+        queued: T.Set[int] = set(worklist)
+        while (worklist):
+            B = worklist.pop()
+            queued.discard(B)
+            for A in dependents[B]:
+                new_first = first[A] | first[B]
+                if (new_first != first[A]):
+                    first[A] = new_first
+                    if (A not in queued):
+                        queued.add(A)
+                        worklist.append(A)
+        self._first = first
+        return first
+
+    def follow_sets(self,
+                    first: T.Optional[T.List[int]] = None,
+                    nullable: T.Optional[T.List[bool]] = None) -> T.List[int]:
+        """
+            follow[v] = bitset of the terminals (EOF included) that can follow variable v
+            (terminal rows are left empty). Computed once when called without arguments.
 
+            Algorithm:
+                follow(S) <- ['$']
+                for A -> aBb productions (each production scanned once, right to left,
+                so first(b) is built incrementally instead of once per occurrence)
+                    follow(B) <- follow(B) U first(b)
+                    if b is nullable
+                        B includes A: follow(B) <- follow(B) U follow(A)
+                The 'includes' relation is then solved with the digraph algorithm,
+                which collapses its strongly connected components.
+
+            Complexity:
+                O(|G| * |terminals| / wordsize), where |G| is the total size of all productions
+        """
+        cache = first is None and nullable is None
+        if cache and self._follow is not None:
+            return self._follow
+        if first is None:
+            first = self.first_sets()
+        if nullable is None:
+            nullable = self.nullable()
+
+        follow: T.List[int] = [0] * self.n_symbols
+        includes: T.List[T.Set[int]] = [set() for _ in range(self.n_symbols)]
         # follow set of start variable starts with EOF symbol (end of input)
-        follow[self.start] = set({self.eof_symbol})
-
-        while (not converged):
-            converged = True
-            for A, possible_targets in self.grammar.items():
-                for word in possible_targets:
-                    for i, symb in enumerate(word):
-                        if (not (symb in self.vars)):
-                            continue
-                        suffix = word[i + 1:]
-                        first_suffix = Grammar.first_fromword(suffix, first)
-
-                        old_follow = follow[symb]
-
-                        if ('' in first_suffix):
-                            first_suffix.remove('')
-                            follow[symb] = follow[symb].union(first_suffix, follow[A])
-                        else:
-                            follow[symb] = follow[symb].union(first_suffix)
-
-                        if (follow[symb] != old_follow):
-                            converged = False
+        follow[self.start] = 1 << self.eof
+
+        for p in range(self.n_productions):
+            A = self.lhs[p]
+            first_suffix = 0
+            nullable_suffix = True
+            for s in reversed(self.right_side(p)):
+                if (not self.is_terminal(s)):
+                    follow[s] |= first_suffix
+                    if (nullable_suffix and s != A):
+                        includes[s].add(A)
+                if (nullable[s]):
+                    first_suffix |= first[s]
+                else:
+                    first_suffix = first[s]
+                    nullable_suffix = False
+
+        follow = digraph([list(targets) for targets in includes], follow)
+        if cache:
+            self._follow = follow
         return follow
+
+    def first_view(self) -> BitsetMapping:
+        """
+            FIRST sets with the same API as a dict[str, set[str]] (including the keys
+            for every terminal and for the empty word ''). Built once, so that Grammar.follow
+            recognizes it and uses the bitsets directly.
+        """
+        if self._first_view is not None:
+            return self._first_view
+        first = self.first_sets()
+        index = {name: s for s, name in enumerate(self.names) if s != self.eof}
+        index[''] = self.n_symbols
+        # the empty word gets an extra (empty, nullable) row
+        self._first_view = BitsetMapping(index,
+                                         first + [0],
+                                         self.names,
+                                         self.nullable() + [True])
+        return self._first_view
+
+    def follow_view(self, follow: T.Optional[T.List[int]] = None) -> BitsetMapping:
+        """
+            FOLLOW sets with the same API as a dict[str, set[str]] (one key per variable).
+        """
+        if follow is None:
+            follow = self.follow_sets()
+        index = {self.names[v]: v for v in range(self.n_terminals, self.n_symbols)}
+        return BitsetMapping(index, follow, self.names)
+
+    @property
+    def n_productions(self) -> int:
+        return len(self.lhs)
+
+    def is_terminal(self, symbol: int) -> bool:
+        return symbol < self.n_terminals
+
+    def length(self, p: int) -> int:
+        """
+            Size of the right side of production p.
+        """
+        return self.offset[p + 1] - self.offset[p]
+
+    def right_side(self, p: int) -> T.Tuple[int, ...]:
+        return tuple(self.rhs[self.offset[p]:self.offset[p + 1]])
+
+    def unit_productions(self) -> T.Dict[int, int]:
+        """
+            Productions A -> B whose right side is a single variable: production id -> B.
+        """
+        units: T.Dict[int, int] = dict()
+        for p in range(self.n_productions):
+            if self.length(p) == 1 and not self.is_terminal(self.rhs[self.offset[p]]):
+                units[p] = self.rhs[self.offset[p]]
+        return units
+
+    def production(self, p: int) -> T.Tuple[str, T.Tuple[str, ...]]:
+        """
+            Production p as names: (variable, word)
+        """
+        return self.names[self.lhs[p]], tuple(self.names[s] for s in self.right_side(p))
+
+    def production_str(self, p: int, rule_separator: str = "->") -> str:
+        var, word = self.production(p)
+        return f"{var} {rule_separator} {' '.join(word)}".strip()
+
+    def fingerprint(self) -> str:
+        """
+            SHA-256 (hex) of the normalized grammar: symbol names (EOF included) in id order,
+            start variable, the numbered productions and the precedence declarations. Equal
+            fingerprints mean equal symbol ids and production numbers, so anything built on
+            them can be reused.
+        """
+        normalized = [self.names, self.eof, self.start, list(self.lhs), list(self.offset), list(self.rhs),
+                      self.associativity, list(self.precedence), list(self.production_precedence)]
+        return hashlib.sha256(json.dumps(normalized).encode("utf-8")).hexdigest()
+
+    @property
+    def n_items(self) -> int:
+        return len(self.item_production)
+
+    def item(self, p: int, dot: int = 0) -> int:
+        """
+            Id of the LR(0) item of production p with the dot before its dot-th symbol.
+        """
+        return self.offset[p] + p + dot
+
+    def dot(self, item: int) -> int:
+        p = self.item_production[item]
+        return item - self.offset[p] - p
+
+    def closure_items(self, var: int) -> T.Tuple[int, ...]:
+        """
+            LR(0) closure of variable 'var': all items Y -> .a (sorted) for every Y
+            reachable from 'var' through the first symbol of productions
+            (var itself included). Computed once per variable, on first request.
+        """
+        cached = self._closures[var]
+        if cached is not None:
+            return cached
+        items: T.List[int] = []
+        visited: T.Set[int] = {var}
+        worklist: T.List[int] = [var]
+        while (worklist):
+            Y = worklist.pop()
+            for p in self.productions_of[Y]:
+                item = self.item(p)
+                items.append(item)
+                Z = self.item_symbol[item]
+                if (Z != -1 and not self.is_terminal(Z) and Z not in visited):
+                    visited.add(Z)
+                    worklist.append(Z)
+        closure = tuple(sorted(items))
+        self._closures[var] = closure
+        return closure
+
+    def dotted_word(self, item: int, indicator: str = '.') -> T.Tuple[str, ...]:
+        """
+            Right side of the item's production, as names, with the indicator inserted at the dot.
+        """
+        word = self.production(self.item_production[item])[1]
+        dot = self.dot(item)
+        return (*word[:dot], indicator, *word[dot:])
@@ -0,0 +1,298 @@
+import typing as T
+from parsers.LR0 import LR0_Automaton
+from parsers.LALR import LALR_Parser
+from parsers.tables import ERROR, ACCEPT, is_shift, is_reduce, reduced_production
+from grammar import Grammar
+from utils.AST import AST
+from utils.forest import SPPF_Node
+from utils.lexer import Lexer, Token
+
+
+class GSS_Node:
+    """
+        Node of the graph-structured stack: a parser state at some input position.
+
+        @attrs:
+            state [int]: LR state
+            level [int]: number of tokens consumed when it was pushed
+            links [list[tuple[GSS_Node, SPPF_Node]]]: the nodes below it, with the forest node
+                of the symbol between them
+    """
+    __slots__ = ("state", "level", "links")
+
+    def __init__(self, state: int, level: int):
+        self.state = state
+        self.level = level
+        self.links: T.List[T.Tuple["GSS_Node", SPPF_Node]] = []
+
+
+def _paths(top: GSS_Node,
+           n: int,
+           required: T.Optional[T.Tuple[GSS_Node, SPPF_Node]]) -> T.List[T.Tuple[GSS_Node, T.List[SPPF_Node]]]:
+    """
+        All paths of n links down from 'top' (through 'required', if given): (bottom node, forest nodes in order).
+    """
+    paths = []
+    stack = [(top, n, [], required is None)]
+    while (stack):
+        node, k, children, seen = stack.pop()
+        if k == 0:
+            if seen:
+                paths.append((node, children[::-1]))
+            continue
+        for link in node.links:
+            stack.append((link[0], k - 1, children + [link[1]], seen or link is required))
+    return paths
+
+
+class _Conflict_Recording_Parser(LALR_Parser):
+    """
+        LALR(1) construction that keeps the conflicts no precedence declaration settles
+        instead of raising an error or defaulting to the reduction (only its tables are used).
+    """
+
+    def __init__(self,
+                 grammar: Grammar,
+                 indicator='.',
+                 eof_symbol='$',
+                 compress: bool = False):
+        self.conflict_sets: T.Dict[T.Tuple[int, int], T.Set[int]] = dict()
+        super().__init__(grammar, indicator, eof_symbol, compress)
+
+    def _resolve_action_conflicts(self,
+                                  entry: T.Tuple[int, int],
+                                  current: int,
+                                  new_value: int) -> int:
+        """
+            Same as SLR_Parser._resolve_action_conflicts when precedence settles the conflict,
+            otherwise records both actions in the conflicts and keeps the current one.
+        """
+        if current == ERROR or current == new_value or (is_shift(current) and is_shift(new_value)):
+            return super()._resolve_action_conflicts(entry, current, new_value)
+        if ACCEPT not in (current, new_value) and not (is_reduce(current) and is_reduce(new_value)):
+            reduce = new_value if is_reduce(new_value) else current
+            if self.compiled.precedence[entry[1]] != 0 and self.compiled.production_precedence[reduced_production(reduce)] != 0:
+                return super()._resolve_action_conflicts(entry, current, new_value)
+        self.conflict_sets.setdefault(entry, set()).update((current, new_value))
+        return current
+
+
+class GLR_Parser:
+    """
+        Generalized LR parser (Tomita, with Farshi's treatment of empty productions) on the
+        LALR(1) tables: conflicts that no precedence declaration settles (shift-reduce,
+        reduce-reduce and reduce-accept) are kept (see conflicts) instead of raising an error
+        or defaulting to the reduction, and the parser follows all of their actions at once.
+
+        Stacks are stored as a graph-structured stack (GSS): stacks share their common prefixes,
+        and stacks reaching the same state after the same input are merged. The trees are stored
+        as a shared packed parse forest (see utils.forest.SPPF_Node).
+
+        While a single stack is alive and its actions are not conflicted, the parser runs a plain
+        LR loop (one GSS node per shift or reduction, no bookkeeping of other stacks), so the
+        unambiguous parts of the input are parsed at nearly the speed of a deterministic parser.
+
+        This is not an SLR_Parser: push parsers, semantic actions, error recovery, arenas, table
+        caches and incremental parsing all drive the tables deterministically, which is wrong on
+        conflicted entries, so only the entry points built on forest are offered.
+
+        @attrs:
+            grammar [Grammar]: the grammar to parse
+            compiled [CompiledGrammar]: its integer representation
+            tables [ParseTables | CompressedTables]: LALR(1) tables, holding one of the actions
+                of each conflicted entry
+            conflicts [dict[tuple[int, int], tuple[int, ...]]]: (state, terminal id) -> all its
+                encoded actions, for the entries with conflicts
+    """
+
+    def __init__(self,
+                 grammar: Grammar,
+                 indicator='.',
+                 eof_symbol='$',
+                 compress: bool = False):
+        """
+            Args: as SLR_Parser. Tables are always built, since conflicts are not cached, and
+            unit elimination is not available (it relies on rows without conflicts).
+        """
+        self._builder = _Conflict_Recording_Parser(grammar, indicator, eof_symbol, compress)
+        self.grammar = grammar
+        self.compiled = self._builder.compiled
+        self.tables = self._builder.tables
+        self.conflicts: T.Dict[T.Tuple[int, int], T.Tuple[int, ...]] = {
+            entry: tuple(sorted(actions)) for entry, actions in self._builder.conflict_sets.items()
+        }
+        # state -> bitset of the terminals with conflicts
+        self.conflicted: T.List[int] = [0] * self.tables.n_states
+        for state, terminal in self.conflicts:
+            self.conflicted[state] |= 1 << terminal
+
+    @property
+    def automaton(self) -> LR0_Automaton:
+        return self._builder.automaton
+
+    def _actions(self, state: int, terminal: int) -> T.Sequence[int]:
+        if self.conflicted[state] >> terminal & 1:
+            return self.conflicts[state, terminal]
+        action = self.tables.get_action(state, terminal)
+        return (action,) if action != ERROR else ()
+
+    def forest(self, tokens: T.Iterable[T.Tuple[int, T.Any]]) -> T.Tuple[int, T.Optional[SPPF_Node]]:
+        """
+            Parses (terminal id, value, ...) tuples, e.g. utils.lexer.Token.
+            Return a tuple (status code, forest of all parse trees), the forest being None on errors.
+        """
+        tables = self.tables
+        get_action, get_goto = tables.get_action, tables.get_goto
+        lhs, length, names = tables.lhs, tables.length, tables.names
+        n_terminals, eof = tables.n_terminals, tables.eof
+        conflicted = self.conflicted
+        actions_of = self._actions
+
+        bottom = GSS_Node(0, 0)
+        tops: T.Dict[int, GSS_Node] = {0: bottom}
+        stream = iter(tokens)
+        tok = next(stream, None)
+        i = 0
+        # forest nodes of variables ending at position i, by (symbol, start)
+        level_nodes: T.Dict[T.Tuple[int, int], SPPF_Node] = dict()
+        while (True):
+            t = eof if tok is None else tok[0]
+            if not (0 <= t < n_terminals):
+                return -1, None
+
+            # deterministic part: a single stack, without conflicts, across as many tokens as possible
+            if len(tops) == 1:
+                (v,) = tops.values()
+                while (True):
+                    state = v.state
+                    if conflicted[state] >> t & 1:
+                        break
+                    action = get_action(state, t)
+                    if action > 0:  # shift
+                        w = GSS_Node(action - 1, i + 1)
+                        w.links.append((v, SPPF_Node(tok[1], t, i, i + 1)))  # type: ignore
+                        v = w
+                        i += 1
+                        if level_nodes:
+                            level_nodes = dict()
+                        tok = next(stream, None)
+                        t = eof if tok is None else tok[0]
+                        if not (0 <= t < n_terminals):
+                            return -1, None
+                        continue
+                    if action >= ACCEPT:  # accept or error
+                        break
+                    p = -action - 2
+                    u, children = v, []
+                    for _ in range(length[p]):
+                        if len(u.links) != 1:
+                            break
+                        u, child = u.links[0]
+                        children.append(child)
+                    if len(children) != length[p]:  # several paths
+                        break
+                    children.reverse()
+                    A = lhs[p]
+                    node = level_nodes.get((A, u.level))
+                    if node is None:
+                        node = level_nodes[A, u.level] = SPPF_Node(names[A], A, u.level, i)
+                        node.families.append(children)
+                    else:
+                        node.add_family(children)
+                    target = get_goto(u.state, A)
+                    if target == state:  # would merge with v
+                        break
+                    w = GSS_Node(target, i)
+                    w.links.append((u, node))
+                    v = w  # the previous top only reduces on t, so it dies
+                tops = {v.state: v}
+
+            # general reduction phase
+            worklist: T.List[T.Tuple[GSS_Node, int, T.Optional[T.Tuple[GSS_Node, SPPF_Node]]]] = []
+            for v in tops.values():
+                worklist.extend((v, reduced_production(a), None) for a in actions_of(v.state, t) if is_reduce(a))
+            while (worklist):
+                v, p, required = worklist.pop()
+                A = lhs[p]
+                for u, children in _paths(v, length[p], required):
+                    node = level_nodes.get((A, u.level))
+                    if node is None:
+                        node = level_nodes[A, u.level] = SPPF_Node(names[A], A, u.level, i)
+                        node.families.append(children)
+                    else:
+                        node.add_family(children)
+                    target = get_goto(u.state, A)
+                    w = tops.get(target)
+                    if w is None:
+                        w = tops[target] = GSS_Node(target, i)
+                        w.links.append((u, node))
+                        worklist.extend((w, reduced_production(a), None) for a in actions_of(target, t) if is_reduce(a))
+                    elif all(link[0] is not u for link in w.links):
+                        link = (u, node)
+                        w.links.append(link)
+                        # the new link extends the paths of every stack of this level going through w
+                        for x in list(tops.values()):
+                            worklist.extend((x, reduced_production(a), link) for a in actions_of(x.state, t)
+                                            if is_reduce(a) and length[reduced_production(a)] > 0)
+
+            if t == eof:
+                for v in tops.values():
+                    if ACCEPT in actions_of(v.state, t):
+                        for u, node in v.links:
+                            if u is bottom and node.symbol == tables.start:
+                                return 0, node
+                return -1, None
+
+            # shift phase
+            leaf = SPPF_Node(tok[1], t, i, i + 1)  # type: ignore
+            i += 1
+            shifted: T.Dict[int, GSS_Node] = dict()
+            for v in tops.values():
+                for a in actions_of(v.state, t):
+                    if is_shift(a):
+                        w = shifted.get(a - 1)
+                        if w is None:
+                            w = shifted[a - 1] = GSS_Node(a - 1, i)
+                        w.links.append((v, leaf))
+            if not shifted:
+                return -1, None
+            tops = shifted
+            level_nodes = dict()
+            tok = next(stream, None)
+
+    def parse_forest(self, stream: T.Iterable[str]) -> T.Tuple[int, T.Optional[SPPF_Node]]:
+        """
+            Same as forest, for terminal names (consumed lazily, as in SLR_Parser.parse).
+        """
+        symbol_ids = self.compiled.ids
+        return self.forest((symbol_ids.get(tok, -1), tok) for tok in stream)
+
+    def parse(self, stream: T.Iterable[str]) -> T.Tuple[int, AST]:
+        """
+            Same as SLR_Parser.parse, returning one of the parse trees (see SPPF_Node.first_tree).
+            On errors, the tree is AST(-1, []).
+        """
+        status, forest = self.parse_forest(stream)
+        if forest is None:
+            return status, AST(-1, [])  # type: ignore
+        return status, forest.first_tree()
+
+    def recognize(self, stream: T.Iterable[str]) -> bool:
+        return self.parse_forest(stream)[0] == 0
+
+    def lexer(self,
+              rules: T.Sequence[T.Tuple[str, str]],
+              ignore: T.Sequence[str] = ()) -> Lexer:
+        """
+            Lexer (see utils.lexer.Lexer) producing tokens of this grammar, given a regex for each terminal.
+        """
+        return Lexer(rules, self.compiled.ids, ignore)
+
+    def parse_tokens(self, tokens: T.Iterable[Token]) -> T.Tuple[int, AST]:
+        """
+            Same as parse for the tokens of a lexer (AST leaves are the matched texts).
+        """
+        status, forest = self.forest(tokens)
+        if forest is None:
+            return status, AST(-1, [])  # type: ignore
+        return status, forest.first_tree()
@@ -0,0 +1,87 @@
+import typing as T
+from parsers.SLR import SLR_Parser
+from utils.digraph import digraph
+
+
+class LALR_Parser(SLR_Parser):
+    """
+        LALR(1) parser: same LR(0) automaton (and table size) as SLR_Parser, but each reduction
+        only happens on its LALR(1) lookaheads instead of the whole FOLLOW set of its variable.
+        Lookaheads are computed with the relations of DeRemer and Pennello (1982), without
+        building any LR(1) item.
+    """
+
+    def reduce_lookaheads(self) -> T.Callable[[int, int], int]:
+        lookaheads = self.lalr_lookaheads()
+        return lambda state, p: lookaheads.get((state, p), 0)
+
+    def lalr_lookaheads(self) -> T.Dict[T.Tuple[int, int], int]:
+        """
+            LA(q, A -> w) for every state q with a complete item A -> w., as terminal bitsets.
+
+            Algorithm (over the nonterminal transitions (p, A) of the LR(0) automaton):
+                DR(p, A) = terminals t that can be shifted from goto(p, A) (and EOF for (0, S),
+                    as if the grammar were augmented with S' -> S $, the transition being
+                    added if S does not appear on any right side)
+                (p, A) reads (r, C) iff r = goto(p, A) and C is nullable
+                Read(p, A) = DR(p, A) U U{ Read(r, C) | (p, A) reads (r, C) }
+                (p, A) includes (p', B) iff B -> bAc, c is nullable and p' reaches p by reading b
+                Follow(p, A) = Read(p, A) U U{ Follow(p', B) | (p, A) includes (p', B) }
+                (q, A -> w) lookback (p, A) iff p reaches q by reading w
+                LA(q, A -> w) = U{ Follow(p, A) | (q, A -> w) lookback (p, A) }
+            Both fixed points are solved with the digraph algorithm, so the whole computation
+            is linear on the size of the relations.
+        """
+        compiled = self.compiled
+        transitions = self.automaton.transitions
+        nullable = compiled.nullable()
+
+        # number the nonterminal transitions
+        index: T.Dict[T.Tuple[int, int], int] = dict()
+        for p, targets in enumerate(transitions):
+            for A in targets:
+                if not compiled.is_terminal(A):
+                    index[p, A] = len(index)
+        # the start variable only has a transition from state 0 if it appears on some right side
+        if (0, compiled.start) not in index:
+            index[0, compiled.start] = len(index)
+
+        direct_reads: T.List[int] = [0] * len(index)
+        reads: T.List[T.List[int]] = [[] for _ in range(len(index))]
+        for (p, A), i in index.items():
+            if p == 0 and A == compiled.start:
+                direct_reads[i] |= 1 << compiled.eof
+            r = transitions[p].get(A)
+            if r is None:
+                continue
+            for C in transitions[r]:
+                if compiled.is_terminal(C):
+                    direct_reads[i] |= 1 << C
+                elif (nullable[C]):
+                    reads[i].append(index[r, C])
+        read = digraph(reads, direct_reads)
+
+        includes: T.List[T.List[int]] = [[] for _ in range(len(index))]
+        lookback: T.Dict[T.Tuple[int, int], T.List[int]] = dict()
+        for (start, B), i in index.items():
+            for production in compiled.productions_of[B]:
+                word = compiled.right_side(production)
+                # nullable_suffix[k]: word[k:] is nullable
+                nullable_suffix = [True] * (len(word) + 1)
+                for k in range(len(word) - 1, -1, -1):
+                    nullable_suffix[k] = nullable_suffix[k + 1] and nullable[word[k]]
+                state = start
+                for k, X in enumerate(word):
+                    if (not compiled.is_terminal(X)) and nullable_suffix[k + 1]:
+                        includes[index[state, X]].append(i)
+                    state = transitions[state][X]
+                lookback.setdefault((state, production), []).append(i)
+        follow = digraph(includes, read)
+
+        lookaheads: T.Dict[T.Tuple[int, int], int] = dict()
+        for key, sources in lookback.items():
+            bits = 0
+            for i in sources:
+                bits |= follow[i]
+            lookaheads[key] = bits
+        return lookaheads
@@ -1,6 +1,6 @@
 import typing as T
-import copy
-from grammar import Grammar
+import time
+from grammar import Grammar, CompiledGrammar
 
 # P[v] = set of all productions v -> a
 PRODUCTION_TABLE = T.Dict[str, T.Set[T.Tuple[str, ...]]]
@@ -8,6 +8,22 @@ PRODUCTION_TABLE = T.Dict[str, T.Set[T.Tuple[str, ...]]]
 LOOKAHEAD_TABLE = T.Dict[T.Tuple[str, str], T.Set[T.Tuple[str, ...]]]
 
 
+def accepting_key(compiled: CompiledGrammar,
+                   state: int,
+                   symbol: int,
+                   kernel: T.Tuple[int, ...]) -> T.Tuple[int, ...]:
+    """
+        Lookup key of the kernel of the goto of 'state' on 'symbol'. There is no augmented
+        production S' -> S, but the goto of the start state (0) on S holds the implicit item
+        S' -> S. (where the parser accepts), so it gets its own key (marked by an extra -1,
+        which is not an item) and is never shared with a state reached from anywhere else.
+        Otherwise, when S appears on a right side, ACCEPT would also fire with a deeper stack.
+    """
+    if state == 0 and symbol == compiled.start:
+        return kernel + (-1,)
+    return kernel
+
+
 class Abstract_LR0_State:
     """
         Abstract LR0 state, not vinculated to any grammar.
@@ -46,8 +62,17 @@ class LR0_State(Abstract_LR0_State):
     """
         This class represents an state of an LR0 automaton.
 
-        The respective productions 'P' are represented as a
-        dict[tuple[str, str], set[tuple[str]]],
+        Items are integers, as numbered by CompiledGrammar: item i stands for the
+        production compiled.item_production[i] with the dot right before the symbol
+        compiled.item_symbol[i] (-1 when the dot is at the end), and advancing the
+        dot is simply i + 1.
+
+        @attrs:
+            kernel [tuple[int]]: items the state was generated from (sorted)
+            items [tuple[int]]: kernel items plus their closure (sorted)
+
+        The productions 'P' of Abstract_LR0_State are derived from the items (for display
+        and comparison only) as a dict[tuple[str, str], set[tuple[str]]],
         where for each symbol 's' (variable or terminal or empty)
         and each variable X
 
@@ -55,80 +80,54 @@ class LR0_State(Abstract_LR0_State):
     """
 
     @staticmethod
-    def __closure_step(
-            transition: T.Tuple[str, T.Tuple[str, ...]],
-            grammar: Grammar,
-            current_productions: LOOKAHEAD_TABLE,
-            first_set: T.Dict[str, T.Set[str]],
-            indicator: str = '.') -> LOOKAHEAD_TABLE:
+    def __closure_LR0(compiled: CompiledGrammar,
+                      kernel: T.Tuple[int, ...]) -> T.Tuple[int, ...]:
         """
-            This simply calculates the closure of a production of the form v -> x0x1...x[i].x[i+1]...x[n-1]
-
-            for (j=i+1...n-1)
-                if epsilon in first(x[i+1]...x[j]) / derives epsilon
-                    add all productions x[i + 1] -> alpha with a prepended dot (x[i+1] -> .alpha)
+            For every item v -> a.Xb (X variable) in the state, add all items X -> .c,
+            and repeat for the new items.
 
-            This makes it possible to accept grammar with epsilon transitions.
+            The items added by each variable are already closed and cached by the compiled
+            grammar (CompiledGrammar.closure_items), so a single pass over the kernel suffices:
+            the closure is the kernel plus the union of the blocks of the variables after a dot.
         """
-        var, word = transition
-        lookahead_pos = word.index(indicator) + 1
-        nullable = [('' in first_set[x]) for x in word[lookahead_pos:]]
-        for i in range(lookahead_pos, len(word)):
-            prepended_dot_word = tuple((indicator, *(word[i + 1:])))
-            if all(nullable[: i - lookahead_pos]) and word[i] in grammar.vars:
-                for new_target_word in grammar.grammar[word[i]]:
-                    lookahead = '' if len(new_target_word) == 0 else new_target_word[0]
-                    prepended_dot_word = (indicator, *new_target_word)
-                    if (lookahead, word[i]) not in current_productions:  # safe add
-                        current_productions[lookahead, word[i]] = {prepended_dot_word}
-                    else:
-                        current_productions[lookahead, word[i]].add(prepended_dot_word)
-        if all(nullable):
-            current_productions['', var].add((indicator,))
-        return current_productions
-
-    @staticmethod
-    def __closure_LR0(grammar: Grammar,
-                      productions: LOOKAHEAD_TABLE,
-                      first_set: T.Dict[str, T.Set[str]],
-                      indicator: str) -> LOOKAHEAD_TABLE:
-        converged = False
-        while (not converged):
-            converged = True
-            # so it does not change along with the production lookahead table
-            old_productions_dict = copy.deepcopy(productions)  # FIXME?
-            for ((lookahead, var), possible_targets) in old_productions_dict.items():
-                if (lookahead not in grammar.vars):
-                    continue
-                for word in possible_targets:
-                    productions = LR0_State.__closure_step(
-                        (var, word),
-                        grammar,
-                        productions,
-                        first_set,
-                        indicator
-                    )
-            if (productions != old_productions_dict):
-                converged = False
-        return productions
+        items: T.Set[int] = set(kernel)
+        expanded: T.Set[int] = set()
+        for item in kernel:
+            symbol = compiled.item_symbol[item]
+            if (symbol == -1 or compiled.is_terminal(symbol) or symbol in expanded):
+                continue
+            expanded.add(symbol)
+            items.update(compiled.closure_items(symbol))
+        return tuple(sorted(items))
 
     def __init__(self,
-                 grammar: Grammar,
-                 start_productions: LOOKAHEAD_TABLE,
+                 compiled: CompiledGrammar,
+                 kernel: T.Iterable[int],
                  id: int,
-                 first_set: T.Dict[str, T.Set[str]],
-                 follow_set: T.Dict[str, T.Set[str]],
                  indicator: str = '.'):
         self.id = id
-        self.first_set = first_set
-        self.follow_set = follow_set
+        self.compiled = compiled
+        self.indicator = indicator
+        self.kernel: T.Tuple[int, ...] = tuple(sorted(kernel))
+        self.items: T.Tuple[int, ...] = LR0_State.__closure_LR0(compiled, self.kernel)
+
+    @property
+    def productions(self) -> LOOKAHEAD_TABLE:
+        productions: LOOKAHEAD_TABLE = dict()
+        for item in self.items:
+            p = self.compiled.item_production[item]
+            symbol = self.compiled.item_symbol[item]
+            lookahead = '' if symbol == -1 else self.compiled.names[symbol]
+            var = self.compiled.names[self.compiled.lhs[p]]
+            if ((lookahead, var) not in productions):
+                productions[lookahead, var] = set()
+            productions[lookahead, var].add(self.compiled.dotted_word(item, self.indicator))
+        return productions
 
-        self.productions = LR0_State.__closure_LR0(
-            grammar,
-            start_productions,
-            first_set,
-            indicator
-        )
+    def __eq__(self, other):
+        if isinstance(other, LR0_State):
+            return self.kernel == other.kernel
+        return super().__eq__(other)
 
 
 class Abstract_LR0_Automaton:
@@ -157,7 +156,7 @@ class Abstract_LR0_Automaton:
                 grammar_symbols.add(symb)
 
         width: int = max(len(str(s.id)) for s in self.states)
-        width = max(width, max(len(symb) for symb in grammar_symbols))
+        width = max(width, max((len(symb) for symb in grammar_symbols), default=0))
         lines: T.List[str] = []
 
         # top line
@@ -171,7 +170,7 @@ class Abstract_LR0_Automaton:
             lines.append((len(lines[-1]) // len(vertical_separator)) * vertical_separator)
             curr_line: str = str(state.id).center(width + 1, " ")
             for symb in grammar_symbols:
-                new_state_id: T.Optional[int] = self.transition_table[state.id][symb]
+                new_state_id: T.Optional[int] = self.transition_table[state.id].get(symb)
                 curr_line += horizontal_separator
                 if new_state_id is not None:
                     curr_line += str(new_state_id).center(width + 1, " ")
@@ -186,89 +185,80 @@ class Abstract_LR0_Automaton:
 class LR0_Automaton(Abstract_LR0_Automaton):
     """
         LR0 Automaton built from an specific (provided) grammar.
+
+        @attrs:
+            stats [dict[str, float]]: number of states and construction time (seconds)
     """
 
     def build(self,
               state: LR0_State):
         """
             Given a state t of the LR0,
-            for each symbol s,
-                for each rule that has s as lookahead in state t (v -> a.sb)
-                    create a new state t' with all corresponding rules v -> as.b and their closure, and make t point to t'
-                    if this state t' already exists, delete this copy and make t point to the already existing state instead
+            partition its items v -> a.sb by the symbol s after the dot (a single pass
+            over the items of t, advancing each of them to v -> as.b), then for each s
+                if a state with this kernel already exists, make t point to it
+                else create the new state t' (kernel and its closure) and make t point to t'
+
+            Two states are equal iff their kernels are (items with the dot past the start
+            are only ever added by a goto), so states are looked up by kernel in a dict
+            (see accepting_key for the goto of the start state on the start variable).
         """
-        for s in self.grammar.symbols:
-            new_productions: LOOKAHEAD_TABLE = dict()
-            for v in self.grammar.vars:
-                if ((s, v) not in state.productions):
-                    continue
-                # look at all productions v -> a.sb
-                # and create a state with the corresponding v -> as.b
-                for word in state.productions[(s, v)]:
-                    idx = word.index(self.indicator)
-                    new_word: list[str] = list(word)  # turn mutable
-                    new_word[idx] = word[idx + 1]
-                    new_word[idx + 1] = self.indicator
-                    ref_symbol = '' if idx + 2 == len(new_word) else new_word[idx + 2]
-                    if ((ref_symbol, v) not in new_productions):
-                        new_productions[(ref_symbol, v)] = set()
-                    new_productions[(ref_symbol, v)].add(tuple(new_word))
-
-            # now all next productions were generated using s as lookahead
-            new_state = LR0_State(
-                grammar=self.grammar,
-                start_productions=new_productions,
-                id=len(self.states),
-                first_set=self.first,
-                follow_set=self.follow
-            )
-
-            # if there was no rules with a specific lookahead symbol, the generated new state will be empty, so we need to consider this new case
-
-            if (len(new_state.productions) == 0):
+        item_symbol = self.compiled.item_symbol
+        kernels: T.Dict[int, T.List[int]] = dict()
+        for item in state.items:
+            s = item_symbol[item]
+            if (s == -1):
                 continue
-
-            if (not (new_state in self.states)):
-                # no state with the same exact productions
-                self.states.append(new_state)
-                # empty dictionary line
-                self.transition_table.append(dict({t: None for t in self.grammar.symbols}))
-                self.transition_table[state.id][s] = new_state.id
+            if (s not in kernels):
+                kernels[s] = [item + 1]
             else:
-                idx = self.states.index(new_state)
-                self.transition_table[state.id][s] = self.states[idx].id
+                kernels[s].append(item + 1)
+
+        transitions = self.transitions[state.id]
+        # visit symbols in id order so state numbering does not depend on item order
+        for s in sorted(kernels):
+            # state.items is sorted, so the new kernel already is in canonical form
+            kernel = tuple(kernels[s])
+            key = accepting_key(self.compiled, state.id, s, kernel)
+            target = self.kernels.get(key)
+            if (target is None):
+                # no state with the same kernel: only now the closure is computed
+                target = len(self.states)
+                self.kernels[key] = target
+                self.states.append(LR0_State(
+                    compiled=self.compiled,
+                    kernel=kernel,
+                    id=target,
+                    indicator=self.indicator
+                ))
+                self.transitions.append(dict())
+            transitions[s] = target
 
     def __init__(self,
                  grammar: Grammar,
                  indicator: str = '.',
                  eof_symbol: str = '$'):
         super().__init__(indicator, eof_symbol)
+        start_time = time.perf_counter()
         self.states: T.List[LR0_State] = []
+        # transitions[t][s] = state reached from state t through symbol (id) s
+        self.transitions: T.List[T.Dict[int, int]] = []
+        # kernel (sorted tuple of items) -> state id
+        self.kernels: T.Dict[T.Tuple[int, ...], int] = dict()
         self.grammar = grammar
-        self.first = grammar.first()
-        self.follow = grammar.follow(self.first)
-
-        # BUILD START LOOKAHED TABLE for start state
-        start_productions: LOOKAHEAD_TABLE = dict()
-        for s in grammar.symbols:
-            start_productions[(s, grammar.start)] = set()
-        start_productions[('', grammar.start)] = set()
-
-        for symbol_list in grammar.grammar[grammar.start]:
-            if len(symbol_list) > 0:
-                start_productions[(symbol_list[0], grammar.start)].add(
-                    tuple((indicator, *symbol_list))
-                )
-            else:
-                start_productions['', grammar.start].add(tuple(indicator,))
-
-        self.states.append(LR0_State(grammar,
-                                     start_productions,
+        self.compiled: CompiledGrammar = grammar.compile()
+        # read-only views over the bitsets of the compiled grammar
+        self.first = grammar.first(bitset=True)
+        self.follow = grammar.follow(self.first, bitset=True)
+
+        # start state: v -> .a for all productions of the start variable
+        start_kernel = [self.compiled.item(p) for p in self.compiled.productions_of[self.compiled.start]]
+        self.states.append(LR0_State(self.compiled,
+                                     start_kernel,
                                      0,
-                                     self.first,
-                                     self.follow,
                                      indicator))
-        self.transition_table.append(dict({s: None for s in self.grammar.symbols}))
+        self.kernels[self.states[0].kernel] = 0
+        self.transitions.append(dict())
         self.start_state = self.states[0]
 
         # the while loop accounts for the fact that
@@ -278,9 +268,20 @@ class LR0_Automaton(Abstract_LR0_Automaton):
             self.build(self.states[i])
             i += 1
 
+        # same transitions, by symbol name (only existing transitions are present)
+        self.transition_table = [
+            {self.compiled.names[s]: target for s, target in transitions.items()}
+            for transitions in self.transitions
+        ]
+
         # build transitions to accept state
         for state in self.states:
-            for (_, var), possible_targets in state.productions.items():
-                for word in possible_targets:
-                    if (var == self.grammar.start and word[-1] == self.indicator):
-                        self.accepting.add(state.id)
+            for item in state.items:
+                p = self.compiled.item_production[item]
+                if (self.compiled.lhs[p] == self.compiled.start and self.compiled.item_symbol[item] == -1):
+                    self.accepting.add(state.id)
+
+        self.stats: T.Dict[str, float] = {
+            "states": len(self.states),
+            "seconds": time.perf_counter() - start_time,
+        }
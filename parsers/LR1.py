@@ -0,0 +1,310 @@
+import typing as T
+import argparse
+import sys
+import time
+import warnings
+from parsers.LR0 import LR0_State, Abstract_LR0_Automaton, accepting_key
+from parsers.SLR import SLR_Parser
+from grammar import Grammar, CompiledGrammar
+
+
+class LR1_State(LR0_State):
+    """
+        State of an LR(1) automaton: an LR(0) state (its core) whose kernel items carry lookaheads.
+
+        @attrs:
+            closure [tuple[int]]: kernel items plus their LR(0) closure
+            lookaheads [list[int]]: lookaheads[i] is the terminal bitset of kernel[i]
+            reductions [dict[int, int]]: production -> bitset of terminals it is reduced on
+                (filled when the state is expanded)
+    """
+
+    def __init__(self,
+                 compiled: CompiledGrammar,
+                 kernel: T.Sequence[int],
+                 lookaheads: T.Sequence[int],
+                 id: int,
+                 indicator: str = '.'):
+        # kernel is already sorted, so lookaheads stay aligned with it
+        super().__init__(compiled, kernel, id, indicator)
+        # LR(0) closure; items keeps those with lookaheads (see LR1_Automaton.build)
+        self.closure: T.Tuple[int, ...] = self.items
+        self.lookaheads: T.List[int] = list(lookaheads)
+        self.reductions: T.Dict[int, int] = dict()
+
+
+def weakly_compatible(a: T.Sequence[int], b: T.Sequence[int]) -> bool:
+    """
+        Pager's weak compatibility of the lookaheads of two states with the same core:
+        for every pair of kernel items i != j,
+            a[i] & b[j] == 0 and b[i] & a[j] == 0,
+            or a[i] & a[j] != 0, or b[i] & b[j] != 0
+        Merging weakly compatible states never introduces a reduce-reduce conflict
+        that none of them had (unlike LALR's merging of all states with the same core).
+    """
+    n = len(a)
+    for i in range(n):
+        for j in range(i + 1, n):
+            if (a[i] & b[j]) == 0 and (b[i] & a[j]) == 0:
+                continue
+            if (a[i] & a[j]) != 0 or (b[i] & b[j]) != 0:
+                continue
+            return False
+    return True
+
+
+class LR1_Automaton(Abstract_LR0_Automaton):
+    """
+        LR(1) automaton built with Pager's method: LR(1) states are generated on the fly and a
+        new state is merged into an existing one with the same core (kernel of LR(0) items,
+        looked up by hashing as in LR0_Automaton) whenever their lookaheads are weakly
+        compatible. A state whose lookaheads grew is expanded again, so the lookaheads
+        reach its successors.
+
+        The result recognizes the same language as the canonical LR(1) automaton, has no
+        conflict that the canonical one does not have, and usually has the size of the LR(0)
+        automaton.
+
+        @attrs:
+            stats [dict[str, float]]: number of states, of merges and of (re)expansions, and the
+                construction time (seconds)
+    """
+
+    def _item_tables(self):
+        """
+            first_after[i] and nullable_after[i]: FIRST (bitset) and nullability of what follows
+            the symbol after the dot of item i (v -> a.Xb gives b).
+        """
+        compiled = self.compiled
+        first, nullable = compiled.first_sets(), compiled.nullable()
+        self.first_after = [0] * compiled.n_items
+        self.nullable_after = [True] * compiled.n_items
+        for p in range(compiled.n_productions):
+            word = compiled.right_side(p)
+            first_suffix, nullable_suffix = 0, True
+            for dot in range(len(word) - 1, -1, -1):
+                item = compiled.item(p, dot)
+                self.first_after[item] = first_suffix
+                self.nullable_after[item] = nullable_suffix
+                s = word[dot]
+                if (nullable[s]):
+                    first_suffix |= first[s]
+                else:
+                    first_suffix = first[s]
+                    nullable_suffix = False
+
+    def _closure_lookaheads(self, state: LR1_State) -> T.Dict[int, int]:
+        """
+            Lookaheads of the items of the closure: item -> terminal bitset.
+            Items X -> .c added by the closure all share the lookaheads of X, computed as a
+            fixed point over the variables after a dot.
+        """
+        compiled = self.compiled
+        item_symbol, item_production = compiled.item_symbol, compiled.item_production
+        var_lookaheads: T.Dict[int, int] = dict()
+        worklist: T.List[int] = []
+
+        def add(var: int, bits: int):
+            current = var_lookaheads.get(var)
+            if current is None or (bits & ~current):
+                var_lookaheads[var] = bits if current is None else current | bits
+                worklist.append(var)
+
+        for item, bits in zip(state.kernel, state.lookaheads):
+            if compiled.dot(item) == 0:  # start state
+                add(compiled.lhs[item_production[item]], bits)
+            X = item_symbol[item]
+            if X != -1 and not compiled.is_terminal(X):
+                add(X, self.first_after[item] | (bits if self.nullable_after[item] else 0))
+        while (worklist):
+            var = worklist.pop()
+            bits = var_lookaheads[var]
+            for p in compiled.productions_of[var]:
+                item = compiled.item(p)
+                X = item_symbol[item]
+                if X != -1 and not compiled.is_terminal(X):
+                    add(X, self.first_after[item] | (bits if self.nullable_after[item] else 0))
+
+        lookaheads = {item: var_lookaheads[compiled.lhs[item_production[item]]]
+                      for item in state.closure if compiled.dot(item) == 0}
+        for item, bits in zip(state.kernel, state.lookaheads):
+            lookaheads[item] = lookaheads.get(item, 0) | bits
+        return lookaheads
+
+    def _find_or_merge(self,
+                       key: T.Tuple[int, ...],
+                       kernel: T.Tuple[int, ...],
+                       lookaheads: T.List[int]) -> int:
+        """
+            Id of the state for the given LR(1) kernel: an existing state with the same core
+            (looked up by 'key', see accepting_key) that is weakly compatible (merged if needed),
+            or a new one.
+        """
+        for candidate in self.kernels.get(key, []):
+            current = self.states[candidate].lookaheads
+            if all((new & ~old) == 0 for new, old in zip(lookaheads, current)):
+                return candidate
+            if weakly_compatible(current, lookaheads):
+                self.states[candidate].lookaheads = [old | new for old, new in zip(current, lookaheads)]
+                self.merges += 1
+                if candidate not in self.pending:
+                    self.pending.add(candidate)
+                    self.worklist.append(candidate)
+                return candidate
+        target = len(self.states)
+        self.states.append(LR1_State(self.compiled, kernel, lookaheads, target, self.indicator))
+        self.transitions.append(dict())
+        self.kernels.setdefault(key, []).append(target)
+        self.pending.add(target)
+        self.worklist.append(target)
+        return target
+
+    def build(self, state: LR1_State):
+        """
+            Computes the reductions of the state and its successors on every symbol
+            (replacing the previous ones if the state was already expanded).
+
+            Closure items without lookaheads (those of a variable followed by an unproductive
+            symbol) are not items of the canonical LR(1) state: they are dropped from
+            state.items, and have neither reductions nor successors.
+        """
+        compiled = self.compiled
+        item_symbol, item_production = compiled.item_symbol, compiled.item_production
+        lookaheads = self._closure_lookaheads(state)
+        state.items = tuple(item for item in state.closure if lookaheads[item])
+        state.reductions = dict()
+        successors: T.Dict[int, T.List[int]] = dict()
+        for item in state.items:
+            s = item_symbol[item]
+            if s == -1:
+                p = item_production[item]
+                state.reductions[p] = state.reductions.get(p, 0) | lookaheads[item]
+            elif s not in successors:
+                successors[s] = [item]
+            else:
+                successors[s].append(item)
+
+        transitions = self.transitions[state.id] = dict()
+        for s in sorted(successors):
+            # state.items is sorted, so the kernel (advanced items) is already sorted too
+            items = successors[s]
+            kernel = tuple(item + 1 for item in items)
+            transitions[s] = self._find_or_merge(accepting_key(compiled, state.id, s, kernel), kernel, [lookaheads[item] for item in items])
+
+    def _prune(self):
+        """
+            Drops the states that became unreachable after merges, renumbering the others.
+        """
+        order = [0]
+        new_id = {0: 0}
+        for state in order:
+            for target in self.transitions[state].values():
+                if target not in new_id:
+                    new_id[target] = len(order)
+                    order.append(target)
+        states: T.List[LR1_State] = []
+        transitions: T.List[T.Dict[int, int]] = []
+        self.kernels = dict()
+        accept_state = self.transitions[0].get(self.compiled.start)
+        for old in order:
+            state = self.states[old]
+            state.id = new_id[old]
+            states.append(state)
+            transitions.append({s: new_id[t] for s, t in self.transitions[old].items()})
+            key = accepting_key(self.compiled, 0, self.compiled.start, state.kernel) if old == accept_state else state.kernel
+            self.kernels.setdefault(key, []).append(state.id)
+        self.states, self.transitions = states, transitions
+
+    def __init__(self,
+                 grammar: Grammar,
+                 indicator: str = '.',
+                 eof_symbol: str = '$'):
+        super().__init__(indicator, eof_symbol)
+        start_time = time.perf_counter()
+        self.states: T.List[LR1_State] = []
+        # transitions[t][s] = state reached from state t through symbol (id) s
+        self.transitions: T.List[T.Dict[int, int]] = []
+        # core (sorted tuple of LR(0) items) -> ids of the states with this core
+        self.kernels: T.Dict[T.Tuple[int, ...], T.List[int]] = dict()
+        self.grammar = grammar
+        self.compiled: CompiledGrammar = grammar.compile()
+        self.first = grammar.first(bitset=True)
+        self.follow = grammar.follow(self.first, bitset=True)
+        self._item_tables()
+        self.merges = 0
+        expansions = 0
+
+        # start state: v -> .a, $ for all productions of the start variable
+        start_kernel = tuple(sorted(self.compiled.item(p) for p in self.compiled.productions_of[self.compiled.start]))
+        self.pending: T.Set[int] = set()
+        self.worklist: T.List[int] = []
+        self._find_or_merge(start_kernel, start_kernel, [1 << self.compiled.eof] * len(start_kernel))
+        while (self.worklist):
+            i = self.worklist.pop()
+            self.pending.discard(i)
+            self.build(self.states[i])
+            expansions += 1
+        self._prune()
+        self.start_state = self.states[0]
+
+        self.transition_table = [
+            {self.compiled.names[s]: target for s, target in transitions.items()}
+            for transitions in self.transitions
+        ]
+        for state in self.states:
+            for p in state.reductions:
+                if self.compiled.lhs[p] == self.compiled.start:
+                    self.accepting.add(state.id)
+
+        self.stats: T.Dict[str, float] = {
+            "states": len(self.states),
+            "merges": self.merges,
+            "expansions": expansions,
+            "seconds": time.perf_counter() - start_time,
+        }
+
+
+class LR1_Parser(SLR_Parser):
+    """
+        LR(1) parser on the (Pager-merged) automaton of LR1_Automaton: reductions happen on the
+        lookaheads of their items, so it has exactly the conflicts of canonical LR(1).
+    """
+
+    @property
+    def automaton(self) -> LR1_Automaton:  # type: ignore
+        if self._automaton is None:
+            self._automaton = LR1_Automaton(self.grammar, self.indicator, self.eof_symbol)  # type: ignore
+        return self._automaton  # type: ignore
+
+    def reduce_lookaheads(self) -> T.Callable[[int, int], int]:
+        states = self.automaton.states
+        return lambda state, p: states[state].reductions.get(p, 0)
+
+
+def main(argv: T.Optional[T.List[str]] = None):
+    """
+        Construction report of the SLR (LR(0) automaton), LALR and LR(1) parsers of a grammar file.
+    """
+    from parsers.LALR import LALR_Parser
+    from utils.preprocessing import parse_file
+
+    arg_parser = argparse.ArgumentParser(description="Compare SLR, LALR and LR(1) constructions of a grammar file.")
+    arg_parser.add_argument("grammar", help="grammar file, as read by utils.preprocessing.parse_file")
+    args = arg_parser.parse_args(argv)
+
+    print(f"{'parser':<8}{'states':>8}{'conflicts':>11}{'seconds':>10}")
+    for kind, cls in (("SLR", SLR_Parser), ("LALR", LALR_Parser), ("LR(1)", LR1_Parser)):
+        grammar = parse_file(args.grammar)
+        start_time = time.perf_counter()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            try:
+                states = str(cls(grammar).tables.n_states)
+                conflicts = f"{len(caught)} s/r"
+            except ValueError:  # reduce-reduce conflict
+                states, conflicts = "-", "r/r"
+        print(f"{kind:<8}{states:>8}{conflicts:>11}{time.perf_counter() - start_time:>10.4f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,134 +1,298 @@
 import warnings
+import os
 import typing as T
 from parsers.LR0 import LR0_Automaton
+from parsers.tables import ParseTables, CompressedTables, ERROR, ACCEPT, encode_shift, encode_reduce, is_shift, is_reduce, shift_target, reduced_production, eliminate_unit_reductions
+from parsers.cache import load_tables, save_tables
+from parsers.driver import PushParser, ParseError, REDUCER, recognize
 from grammar import Grammar
-from utils.AST import AST
+from utils.AST import AST, TreeLike
+from utils.arena import AST_Arena, AST_View
+from utils.lexer import Lexer, Token
+from utils.bitset import iter_bits
 
 TRANSITION = T.Tuple[str, T.Tuple[str, ...]]
 ACTION_TABLE = T.Dict[T.Tuple[int, str], T.Union[T.Optional[int], TRANSITION]]
 GOTO_TABLE = T.Dict[T.Tuple[int, str], T.Optional[int]]
 
+DEFAULT_CACHE_DIR = ".lrcache"
+
+# semantic actions: a mapping (production id, "A -> x y", (A, (x, y)) or variable name A) -> callable,
+# or a visitor object with a method per variable
+SEMANTIC_ACTIONS = T.Union[T.Mapping[T.Union[int, str, TRANSITION], T.Callable[..., T.Any]], object]
+
 
 class SLR_Parser:
-    def _identify_action_conflicts(self,
-                                   entry: T.Tuple[int, str],
-                                   new_value: T.Union[int, TRANSITION],
-                                   action_table: ACTION_TABLE) -> bool:
-        """
-            Identify possible conflicts when processing new rule in state. Raise error in case of reduce-reduce conflict. Give a warning in case of shift-reduce error. Returns true only if there was a shift-reduce conflict.
-        """
-        if action_table[entry] is None:
-            return False
-        elif isinstance(action_table[entry], int):
-            if isinstance(new_value, int) and action_table[entry] == new_value:
-                return False
-            elif isinstance(new_value, int) and action_table[entry] != new_value:
-                raise RuntimeError(f"Shift-shift conflict on state {entry[0]} for lookahead token '{entry[1]}': can't decide between states {action_table[entry]} (current) and {new_value} (new). This should not happen when using this function with a correctly built automaton, you might want to post a github issue on https://github.com/IgorPBorja/LRparser.")
-            elif isinstance(new_value, tuple):
-                var, word = new_value
-                warning_text = f"Shift-reduce conflict on lookahead {entry[1]}: defaulting to reduce action {var} -> {' '.join(word)} (new)."
-                warnings.warn(warning_text, UserWarning)
-                return True
-            else:
-                raise RuntimeError(f"Unexpected type for new value: {type(new_value)}")  # FIXME remove
-        elif isinstance(action_table[entry], tuple):
-            if isinstance(new_value, int):
-                var, word = action_table[entry]
-                warning_text = f"Shift-reduce conflict on lookahead {entry[1]}: defaulting to reduce action {var} -> {' '.join(word)} (current)."
-                warnings.warn(warning_text, UserWarning)
-                return True
-            elif isinstance(new_value, tuple):
-                var1, word1 = action_table[entry]
-                var2, word2 = new_value
-                if (var1 != var2 or word1 != word2):
-                    error_text = f"Reduce-reduce conflict: options of actions {var1} -> {' '.join(word1)} (current) or {var2} -> {' '.join(word2)} (new)"
-                    raise ValueError(error_text)
-            else:
-                raise RuntimeError(f"Unexpected type for new value: {type(new_value)}")  # FIXME remove
-        else:
-            raise RuntimeError(f"Unexpected type for current entry: {type(action_table[entry])}")  # FIXME remove
+    def _describe_action(self, action: int) -> str:
+        if is_reduce(action):
+            return f"reduce action {self.compiled.production_str(reduced_production(action))}"
+        elif is_shift(action):
+            return f"shift to state {shift_target(action)}"
+        elif action == ACCEPT:
+            return "accept"
+        return "error"
+
+    def _resolve_action_conflicts(self,
+                                  entry: T.Tuple[int, int],
+                                  current: int,
+                                  new_value: int) -> int:
+        """
+            Identify possible conflicts when processing new (encoded) action for entry (state, terminal id) currently holding 'current', and returns the action the entry should hold. Raise error in case of reduce-reduce or reduce-accept conflict.
+
+            Shift-reduce conflicts are resolved silently (as in yacc) when both the terminal and the production have a declared precedence (see Grammar.precedence):
+                higher precedence wins, and on a tie the associativity decides:
+                left -> reduce, right -> shift, nonassoc -> error
+            Otherwise give a warning and default to the reduction.
+        """
+        state, terminal = entry
+        lookahead = self.compiled.names[terminal]
+        if current == ERROR or current == new_value:
+            return new_value
+        elif is_shift(current) and is_shift(new_value):
+            raise RuntimeError(f"Shift-shift conflict on state {state} for lookahead token '{lookahead}': can't decide between states {shift_target(current)} (current) and {shift_target(new_value)} (new). This should not happen when using this function with a correctly built automaton, you might want to post a github issue on https://github.com/IgorPBorja/LRparser.")
+        elif is_reduce(current) and is_reduce(new_value):
+            error_text = f"Reduce-reduce conflict: options of actions {self._describe_action(current)} (current) or {self._describe_action(new_value)} (new)"
+            raise ValueError(error_text)
+        elif ACCEPT in (current, new_value):
+            raise ValueError(f"Reduce-accept conflict: options of actions {self._describe_action(current)} (current) or {self._describe_action(new_value)} (new)")
+
+        shift, reduce = (current, new_value) if is_shift(current) else (new_value, current)
+        terminal_level = self.compiled.precedence[terminal]
+        production_level = self.compiled.production_precedence[reduced_production(reduce)]
+        if terminal_level != 0 and production_level != 0:
+            if production_level != terminal_level:
+                return reduce if production_level > terminal_level else shift
+            associativity = self.compiled.associativity[terminal_level]
+            if associativity == "left":
+                return reduce
+            elif associativity == "right":
+                return shift
+            return ERROR  # nonassoc: a op b op c is a syntax error
+        which = "new" if reduce == new_value else "current"
+        warning_text = f"Shift-reduce conflict on lookahead {lookahead}: defaulting to {self._describe_action(reduce)} ({which})."
+        warnings.warn(warning_text, UserWarning)
+        return reduce
 
     def _identify_goto_conflicts(self,
-                                 entry: T.Tuple[int, str],
+                                 entry: T.Tuple[int, int],
                                  new_value: int,
-                                 goto_table: GOTO_TABLE):
-        if (goto_table[entry] is not None) and (goto_table[entry] != new_value):
-            raise RuntimeError(f"Shift-shift conflict on state {entry[0]} for lookahead token '{entry[1]}': can't decide between states {goto_table[entry]} (current) and {new_value} (new). This should not happen when using this function with a correctly built automaton, you might want to post a github issue on https://github.com/IgorPBorja/LRparser.")
+                                 tables: ParseTables):
+        state, var = entry
+        current = tables.get_goto(state, var)
+        if (current != -1) and (current != new_value):
+            raise RuntimeError(f"Shift-shift conflict on state {state} for lookahead token '{self.compiled.names[var]}': can't decide between states {current} (current) and {new_value} (new). This should not happen when using this function with a correctly built automaton, you might want to post a github issue on https://github.com/IgorPBorja/LRparser.")
 
-    def build_table(self) -> T.Tuple[ACTION_TABLE, GOTO_TABLE]:
+    def reduce_lookaheads(self) -> T.Callable[[int, int], int]:
+        """
+            Lookaheads of the reductions: maps (state id, production) to the bitset of terminals
+            on which the production is reduced in that state. For SLR, FOLLOW of its left side.
         """
-            Builds the SLR ACTION and GOTO parsing table in the following way
+        follow, lhs = self.compiled.follow_sets(), self.compiled.lhs
+        return lambda state, p: follow[lhs[p]]
 
-            given state s and its rules
-                for all state rules A -> a.xb for terminal x:
-                    add the corresponding shift to ACTION[s, a]
-                for all state rules A -> a.
-                    for all terminals b in FOLLOW(a)
-                        add the corresponding rule A -> a to ACTION[s, b]
-                for all state rules A -> a.Xb for variable X:
+    def compile_tables(self) -> ParseTables:
+        """
+            Builds the SLR ACTION and GOTO parsing tables in the following way
+
+            given state s and its items
+                for all items A -> a.xb for terminal x:
+                    add the corresponding shift to ACTION[s, x]
+                for all items A -> a.
+                    for all terminals b in FOLLOW(A) (see reduce_lookaheads)
+                        add the corresponding reduction by A -> a to ACTION[s, b]
+                for all items A -> a.Xb for variable X:
                     add the corresponding goto rule to GOTO[s, X]
 
+            Shift-reduce conflicts are settled by the precedence declarations of the grammar,
+            when there are any (see _resolve_action_conflicts).
+
+            There is no augmented start production, so acceptance gets its own row:
+            GOTO[0, S] (a new state if there was no such transition) accepts on EOF.
+
             @returns:
-                ACTION: Dict[Tuple[int, str], Union[int, TRANSITION]]: maps a pair (state_id, token) to a action (if integer, goto state with this new id, else reduce by rule given)
-                GOTO: Dict[Tuple[int, str], int]: maps a pair (state_id, variable) to the id of the next state
+                ParseTables: flat integer arrays, indexed by symbol ids of the compiled grammar
         """
-        action_table: ACTION_TABLE = {}
-        goto_table: GOTO_TABLE = {}
-        # prefill tables
-        for state in self.automaton.states:
-            for var in self.grammar.vars:
-                goto_table[state.id, var] = None
-            for terminal in self.grammar.terminals:
-                action_table[state.id, terminal] = None
-            action_table[state.id, self.eof_symbol] = None
+        compiled = self.compiled
+        item_symbol, item_production = compiled.item_symbol, compiled.item_production
+        lookaheads = self.reduce_lookaheads()
+        tables = ParseTables.for_grammar(compiled, len(self.automaton.states))
 
+        # shifts and gotos first, so that every conflict is seen as a reduction against them
         for state in self.automaton.states:
             id = state.id
-            for lookahead in self.grammar.symbols:
-                for var in self.grammar.vars:
-                    if ((lookahead, var) not in state.productions or len(state.productions[lookahead, var]) == 0):  # FIXME impose consistent behavior
-                        continue
-                    if lookahead in self.grammar.terminals:  # shift
-                        next_state_id = self.automaton.transition_table[id][lookahead]
-                        if next_state_id is None:
-                            raise RuntimeError(f"Unexpected error, in state {id} with lookahead {lookahead} transition table shows nothing, even though a rule exists.")
-                        conflict = self._identify_action_conflicts((id, lookahead), next_state_id, action_table)
-                        if (not conflict):
-                            action_table[id, lookahead] = next_state_id
-
-                    if lookahead in self.grammar.vars:  # goto
-                        next_state_id = self.automaton.transition_table[id][lookahead]
-                        if next_state_id is None:
-                            raise RuntimeError(f"Unexpected error, in state {id} with lookahead {lookahead} transition table shows nothing, even though a rule exists.")
-                        self._identify_goto_conflicts((id, lookahead), next_state_id, goto_table)
-                        goto_table[id, lookahead] = next_state_id
-
-            # lookahead == '' (which is not a grammar symbol)
-            for var in self.grammar.vars:
-                if ('', var) not in state.productions:
+            transitions = self.automaton.transitions[id]
+            for item in state.items:
+                symbol = item_symbol[item]
+                if symbol == -1:
                     continue
-                for word in state.productions['', var]:
-                    for lookahead in self.follow[var]:
+                next_state_id = transitions.get(symbol)
+                if next_state_id is None:
+                    raise RuntimeError(f"Unexpected error, in state {id} with lookahead {compiled.names[symbol]} transition table shows nothing, even though a rule exists.")
+                if compiled.is_terminal(symbol):  # shift
+                    action = self._resolve_action_conflicts((id, symbol), tables.get_action(id, symbol), encode_shift(next_state_id))
+                    tables.set_action(id, symbol, action)
+                else:  # goto
+                    self._identify_goto_conflicts((id, symbol), next_state_id, tables)
+                    tables.set_goto(id, symbol, next_state_id)
 
+        for state in self.automaton.states:
+            id = state.id
+            # reductions of this state by lookahead, to find reduce-reduce conflicts before
+            # precedence possibly turns an entry into an error
+            reductions: T.Dict[int, int] = dict()
+            for item in state.items:
+                if item_symbol[item] == -1:  # reduce, A -> a.
+                    action = encode_reduce(item_production[item])
+                    for lookahead in iter_bits(lookaheads(id, item_production[item])):
                         # iterate over reductions in the same state
-                        self._identify_action_conflicts((id, lookahead), (var, word), action_table)  # FIXME what about the indicator (dot)
-                        action_table[(id, lookahead)] = (var, word)
+                        reductions[lookahead] = self._resolve_action_conflicts((id, lookahead), reductions.get(lookahead, ERROR), action)
+            for lookahead, action in sorted(reductions.items()):
+                action = self._resolve_action_conflicts((id, lookahead), tables.get_action(id, lookahead), action)
+                if action == ERROR:  # nonassoc
+                    tables.explicit_errors.add((id, lookahead))
+                tables.set_action(id, lookahead, action)
+
+        accept_state = self.automaton.transitions[0].get(compiled.start)
+        if accept_state is None:
+            accept_state = tables.add_state()
+            tables.set_goto(0, compiled.start, accept_state)
+        entry = (accept_state, compiled.eof)
+        tables.set_action(accept_state, compiled.eof, self._resolve_action_conflicts(entry, tables.get_action(*entry), ACCEPT))
+        tables.expected_terminals()
+        return tables
+
+    def build_table(self) -> T.Tuple[ACTION_TABLE, GOTO_TABLE]:
+        """
+            Dict representation of the compiled ACTION and GOTO tables (see compile_tables), by symbol name, for every state of the automaton.
 
+            @returns:
+                ACTION: Dict[Tuple[int, str], Union[int, TRANSITION]]: maps a pair (state_id, token) to a action (if integer, goto state with this new id, else reduce by rule given)
+                GOTO: Dict[Tuple[int, str], int]: maps a pair (state_id, variable) to the id of the next state
+
+            NOTE: acceptance is not represented (those entries are None), and GOTO[0, S] may point to the extra accepting row of the compiled tables
+        """
+        action_table: ACTION_TABLE = {}
+        goto_table: GOTO_TABLE = {}
+        compiled = self.compiled
+        for state in self.automaton.states:
+            for v in range(compiled.n_terminals, compiled.n_symbols):
+                target = self.tables.get_goto(state.id, v)
+                goto_table[state.id, compiled.names[v]] = None if target == -1 else target
+            for t in range(compiled.n_terminals):
+                action = self.tables.get_action(state.id, t)
+                name = self.eof_symbol if t == compiled.eof else compiled.names[t]
+                if is_shift(action):
+                    action_table[state.id, name] = shift_target(action)
+                elif is_reduce(action):
+                    action_table[state.id, name] = compiled.production(reduced_production(action))
+                else:
+                    action_table[state.id, name] = None
         return action_table, goto_table
 
     def __init__(self,
                  grammar: Grammar,
                  indicator='.',
-                 eof_symbol='$'):
-        # the indicator is internal to the LR0 automaton and does not need to be an attr
+                 eof_symbol='$',
+                 compress: bool = False,
+                 tables: T.Optional[ParseTables] = None,
+                 eliminate_units: bool = False,
+                 automaton: T.Optional[LR0_Automaton] = None):
+        """
+            Args:
+                grammar (Grammar): the grammar to parse
+                indicator (str): dot used when displaying LR(0) items
+                eof_symbol (str): symbol for end of input
+                compress (bool): run on CompressedTables (row displacement and default
+                    reductions) instead of the dense ParseTables
+                tables (Optional[ParseTables]): tables already built for this grammar (e.g. loaded
+                    from a cache, see from_cache). The automaton is then only built if needed.
+                eliminate_units (bool): skip the reductions by unit productions A -> B wherever
+                    the tables allow it (see parsers.tables.eliminate_unit_reductions). Trees then
+                    lack the nodes of those productions (see full_tree) and semantic actions are
+                    not called for them, the value of B becoming the value of A.
+                automaton (Optional[LR0_Automaton]): automaton already built for this grammar
+                    (of the kind of the parser, e.g. an LR1_Automaton for LR1_Parser), used
+                    instead of building a new one
+        """
         self.grammar = grammar
         self.eof_symbol = eof_symbol
-        self.automaton: LR0_Automaton = LR0_Automaton(grammar, indicator, eof_symbol)
-        self.first = self.grammar.first()
-        self.follow = self.grammar.follow(self.first)
+        self.indicator = indicator
+        self.compiled = grammar.compile()
+        self._automaton: T.Optional[LR0_Automaton] = automaton
 
         # build parse table
-        self.action_table, self.goto_table = self.build_table()
+        if tables is None:
+            tables = self.compile_tables()
+        # unit productions whose reductions are skipped
+        self.eliminated_units: T.Set[int] = set()
+        if eliminate_units:
+            self.eliminated_units = eliminate_unit_reductions(tables, self.compiled.unit_productions())
+        self.tables: T.Union[ParseTables, CompressedTables] = tables
+        if compress:
+            self.tables = self.tables.compress()
+        self._dict_tables: T.Optional[T.Tuple[ACTION_TABLE, GOTO_TABLE]] = None
+
+    @classmethod
+    def from_cache(cls,
+                   grammar: Grammar,
+                   cache_dir: str = DEFAULT_CACHE_DIR,
+                   indicator='.',
+                   eof_symbol='$',
+                   compress: bool = False,
+                   eliminate_units: bool = False) -> "SLR_Parser":
+        """
+            Same as the constructor, but the tables are memory-mapped from a file in 'cache_dir'
+            named after the parser kind and the grammar fingerprint (see CompiledGrammar.fingerprint).
+            A missing, stale or corrupted file is rebuilt (and rewritten) automatically.
+            The file holds the plain tables: unit elimination and compression are applied after loading.
+        """
+        fingerprint = grammar.compile().fingerprint()
+        kind = cls._cache_kind()
+        path = os.path.join(cache_dir, f"{kind}-{fingerprint}.lrt")
+        tables = load_tables(path, fingerprint, kind)
+        if tables is not None:
+            return cls(grammar, indicator, eof_symbol, compress, tables=tables, eliminate_units=eliminate_units)
+        parser = cls(grammar, indicator, eof_symbol)
+        save_tables(path, parser.tables, fingerprint, kind)
+        if eliminate_units:
+            parser.eliminated_units = eliminate_unit_reductions(parser.tables, parser.compiled.unit_productions())
+        if compress:
+            parser.tables = parser.tables.compress()
+        return parser
+
+    @classmethod
+    def _cache_kind(cls) -> str:
+        """
+            Identifies the construction method in cache files, so that tables built by another
+            kind of parser are never mistaken for ours.
+        """
+        return cls.__name__
+
+    @property
+    def automaton(self) -> LR0_Automaton:
+        if self._automaton is None:
+            self._automaton = LR0_Automaton(self.grammar, self.indicator, self.eof_symbol)
+        return self._automaton
+
+    @property
+    def first(self) -> T.Mapping[str, T.Set[str]]:
+        return self.automaton.first
+
+    @property
+    def follow(self) -> T.Mapping[str, T.Set[str]]:
+        return self.automaton.follow
+
+    @property
+    def action_table(self) -> ACTION_TABLE:
+        if self._dict_tables is None:
+            self._dict_tables = self.build_table()
+        return self._dict_tables[0]
+
+    @property
+    def goto_table(self) -> GOTO_TABLE:
+        if self._dict_tables is None:
+            self._dict_tables = self.build_table()
+        return self._dict_tables[1]
 
     def _calculate_width_table_column(self) -> T.Tuple[int, int]:
         """
@@ -191,40 +355,209 @@ class SLR_Parser:
             goto_table_str += "\n"
         return action_table_str, goto_table_str
 
-    def parse(self, stream: T.List[str]) -> T.Tuple[int, AST]:
+    def full_tree(self, tree: TreeLike) -> AST:
+        """
+            Copy of a tree built with eliminate_units, where the nodes of the skipped unit
+            productions are put back, so that it is the tree the parser builds without it.
+
+            Where a node of A -> X1 ... Xn has a child labeled B instead of Xi, the chain of unit
+            productions Xi -> ... -> B is unique (otherwise the grammar would be ambiguous), so
+            the missing nodes are synthesized from it. Nothing is done at parse time: only callers
+            that need the full tree pay for it.
+        """
+        compiled = self.compiled
+        # chains[A][B] = [A, ..., C] for the chain of eliminated productions A -> ... -> C -> B
+        chains: T.Dict[int, T.Dict[int, T.List[int]]] = dict()
+        for A in {compiled.lhs[p] for p in self.eliminated_units}:
+            chain = chains[A] = {A: []}
+            frontier = [A]
+            for var in frontier:
+                for p in compiled.productions_of[var]:
+                    if p in self.eliminated_units:
+                        B = compiled.right_side(p)[0]
+                        if B not in chain:
+                            chain[B] = chain[var] + [var]
+                            frontier.append(B)
+
+        def variable(node: TreeLike) -> int:
+            # -1 for leaves of terminals (and the root of a failed parse)
+            symbol = compiled.ids.get(node.value, -1) if isinstance(node.value, str) else -1
+            return -1 if symbol == -1 or compiled.is_terminal(symbol) else symbol
+
+        def expected(node: TreeLike, children: T.Sequence[TreeLike]) -> T.Sequence[int]:
+            # right side of the production that built the node (-1 where nothing is missing)
+            A = variable(node)
+            if A == -1:
+                return [-1] * len(children)
+            for p in compiled.productions_of[A]:
+                word = compiled.right_side(p)
+                if len(word) != len(children):
+                    continue
+                for X, child in zip(word, children):
+                    B = variable(child)
+                    if (B == -1) != compiled.is_terminal(X) or (B != -1 and B != X and B not in chains.get(X, ())):
+                        break
+                else:
+                    return word
+            raise ValueError(f"Node {node.value} does not match any production")
+
+        def wrap(X: int, node: AST, B: int) -> AST:
+            if X == -1 or X == B or B == -1:
+                return node
+            for var in reversed(chains[X][B]):
+                node = AST(compiled.names[var], [node])
+            return node
+
+        root = AST(tree.value, [])
+        stack = [(tree, root)]
+        while (stack):
+            source, copy = stack.pop()
+            children = source.children
+            for X, child in zip(expected(source, children), children):
+                node = AST(child.value, [])
+                stack.append((child, node))
+                copy.children.append(wrap(X, node, variable(child)))
+        if root.value == -1:  # failed parse
+            return root
+        return wrap(compiled.start, root, variable(root))
+
+    def _semantic_reducer(self, action: T.Optional[T.Callable[..., T.Any]]) -> REDUCER:
+        if action is None:  # default action $$ = $1 (None for empty productions)
+            return lambda values: values[0] if values else None
+        return lambda values: action(*values)
+
+    def semantic_reducers(self, actions: SEMANTIC_ACTIONS) -> T.List[REDUCER]:
+        """
+            Resolves semantic actions into one reducer per production (see parsers.driver.PushParser).
+
+            Semantic actions are called on each reduction by A -> X1 ... Xn with the values of X1, ..., Xn
+            (the token itself for a terminal, the value returned by its own action for a variable), and
+            their return value becomes the value of A, in the style of yacc ($$ = f($1, ..., $n)).
+
+            Args:
+                actions: either a mapping from productions to callables, where a production is given by
+                    its id, as "A -> X1 ... Xn", as (A, (X1, ..., Xn)) or just as A (all productions of A
+                    not given otherwise); or a visitor object, whose method named after A (characters not
+                    allowed in identifiers replaced by '_') handles all productions of A.
+                    Productions without an action get the default $$ = $1 (None if the right side is empty).
+        """
+        compiled = self.compiled
+        per_production: T.List[T.Optional[T.Callable[..., T.Any]]] = [None] * compiled.n_productions
+        if isinstance(actions, T.Mapping):
+            ids = {compiled.production(p): p for p in range(compiled.n_productions)}
+            for key, action in actions.items():
+                if isinstance(key, int):
+                    if not (0 <= key < compiled.n_productions):
+                        raise ValueError(f"Semantic action for unknown production id {key}")
+                    per_production[key] = action
+                elif isinstance(key, tuple) or "->" in key:
+                    if isinstance(key, str):
+                        var, word = key.split("->", 1)
+                        key = (var.strip(), tuple(word.split()))
+                    var, word = key
+                    if (var, tuple(word)) not in ids:
+                        raise ValueError(f"Semantic action for unknown production {var} -> {' '.join(word)}")
+                    per_production[ids[var, tuple(word)]] = action
+            # variables only fill the productions left without an action
+            for key, action in actions.items():
+                if isinstance(key, str) and "->" not in key:
+                    if key not in compiled.ids or compiled.is_terminal(compiled.ids[key]):
+                        raise ValueError(f"Semantic action for unknown variable {key}")
+                    for p in compiled.productions_of[compiled.ids[key]]:
+                        if per_production[p] is None:
+                            per_production[p] = action
+        else:
+            for p in range(compiled.n_productions):
+                method_name = "".join(c if (c.isalnum() or c == '_') else '_' for c in compiled.names[compiled.lhs[p]])
+                per_production[p] = getattr(actions, method_name, None)
+        return [self._semantic_reducer(action) for action in per_production]
+
+    def push_parser(self,
+                    actions: T.Optional[SEMANTIC_ACTIONS] = None,
+                    recover: bool = False) -> PushParser:
+        """
+            New push parser (see parsers.driver.PushParser) running on this parser's tables.
+            It builds an AST, unless semantic actions are given (see semantic_reducers).
+            With recover=True, it goes on after syntax errors, collecting them.
         """
-            Run SLR parsing algorithm over list of tokens.
+        if actions is None:
+            return PushParser(self.tables, self.compiled.ids, recover=recover)
+        return PushParser(self.tables, self.compiled.ids, self.semantic_reducers(actions), recover=recover)
+
+    def parse(self, stream: T.Iterable[str]) -> T.Tuple[int, AST]:
+        """
+            Run SLR parsing algorithm over tokens, consumed lazily from any iterable
+            (a list, a generator reading a file, ...).
             Return a tuple (status code, AST).
             Status code: 0 for sucessful parsing, -1 for Error
         """
-        tok_list = stream.copy()
-        tok_list.append(self.eof_symbol)
-        ast_bottom_nodes = []
-        state_stack = [0]
-        ptr = 0
-        tok = stream[0]
-        while (True):
-            s = state_stack[-1]
-            if isinstance(self.action_table[s, tok], int):  # shift
-                ast_bottom_nodes.append(AST(tok, []))
-                state_stack.append(self.action_table[s, tok])
-                tok = tok_list[ptr + 1]
-                ptr += 1
-            elif isinstance(self.action_table[s, tok], tuple):  # reduce
-                var, word = self.action_table[s, tok]
-                if (var == self.grammar.start and tok == self.eof_symbol):
-                    return 0, AST(self.grammar.start, ast_bottom_nodes)  # accepting state, parse sucessful
-                # pop states corresponding to rule A -> alpha
-                reduce_size = len(word) - 1  # HACK: exclude indicator (dot)
-                reduce_components = ast_bottom_nodes[-reduce_size:]
-                for i in range(reduce_size):
-                    state_stack.pop()
-                    ast_bottom_nodes.pop()
-                t = state_stack[-1]
-                if self.goto_table[t, var] is None:
-                    return -1, AST(-1, ast_bottom_nodes)  # parse unsucessful
-                else:
-                    state_stack.append(self.goto_table[t, var])
-                    ast_bottom_nodes.append(AST(var, reduce_components))
-            else:
-                return -1, AST(-1, ast_bottom_nodes)  # parse unsucessful
+        parser = self.push_parser()
+        parser.feed_many(stream)
+        return parser.finish()
+
+    def parse_recovering(self, stream: T.Iterable[str]) -> T.Tuple[int, AST, T.List[ParseError]]:
+        """
+            Same as parse, but recovers from syntax errors (see parsers.driver.PushParser), so a
+            single pass finds all of them. An 'error' terminal in the grammar (as in S -> error SEMI)
+            marks where to resume; without it, the parser falls back to panic mode.
+            Return a tuple (status code, AST, errors), the AST having nodes labeled -1 for the
+            error terminal (children: the discarded nodes), or being the usual error tree if
+            the parse could not reach the end of input.
+        """
+        parser = self.push_parser(recover=True)
+        parser.feed_many(stream)
+        status, tree = parser.finish()
+        return status, tree, parser.errors
+
+    def parse_with(self, stream: T.Iterable[str], actions: SEMANTIC_ACTIONS) -> T.Tuple[int, T.Any]:
+        """
+            Same as parse, but runs semantic actions (see semantic_reducers) on each reduction
+            instead of building an AST.
+            Return a tuple (status code, value of the start variable), the value being None on errors.
+        """
+        parser = self.push_parser(actions)
+        parser.feed_many(stream)
+        return parser.finish()
+
+    def parse_arena(self, stream: T.Iterable[str]) -> T.Tuple[int, AST_View]:
+        """
+            Same as parse, but the tree is stored in an AST_Arena (a few int arrays) instead of
+            one object per node. The returned root is a view with the same interface as AST.
+        """
+        arena = AST_Arena(self.tables.names)
+        symbol_ids = self.compiled.ids
+        parser = PushParser(self.tables,
+                            symbol_ids,
+                            [arena.reducer(var) for var in self.tables.lhs],
+                            shift_value=lambda terminal, value: arena.leaf(terminal),
+                            error_value=lambda nodes: arena.node(-1, nodes))
+        parser.feed_many(stream)
+        status, root = parser.finish()
+        return status, arena.view(root)
+
+    def recognize(self, stream: T.Iterable[str]) -> bool:
+        """
+            Whether the tokens form a word of the grammar, without building anything (fastest mode).
+        """
+        symbol_ids = self.compiled.ids
+        return recognize(self.tables, (symbol_ids.get(tok, -1) for tok in stream))
+
+    def lexer(self,
+              rules: T.Sequence[T.Tuple[str, str]],
+              ignore: T.Sequence[str] = ()) -> Lexer:
+        """
+            Lexer (see utils.lexer.Lexer) producing tokens of this grammar, given a regex for each terminal.
+        """
+        return Lexer(rules, self.compiled.ids, ignore)
+
+    def parse_tokens(self,
+                     tokens: T.Iterable[Token],
+                     actions: T.Optional[SEMANTIC_ACTIONS] = None) -> T.Tuple[int, T.Any]:
+        """
+            Same as parse (or parse_with, if semantic actions are given) for the tokens of a lexer,
+            which already carry terminal ids. AST leaves (and semantic values of terminals) are the
+            matched texts.
+        """
+        parser = self.push_parser(actions)
+        parser.feed_tokens(tokens)
+        return parser.finish()
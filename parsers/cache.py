@@ -0,0 +1,142 @@
+"""
+    Binary cache of ParseTables.
+
+    File layout:
+        MAGIC (8 bytes)
+        format version, header size, CRC32 of the header and payload (three little-endian uint32)
+        header: JSON (utf-8), padded with spaces to a multiple of 8 bytes
+        payload: the int32 vectors action, goto, lhs and length, one after the other,
+            in the byte order of the machine that wrote them
+
+    The header holds the grammar fingerprint, the parser kind, the table dimensions,
+    the symbol names, the explicit error entries and the vector sizes. A file is only used if
+    all of them check out (and the vector sizes agree with the dimensions), otherwise it is
+    considered stale (or corrupted).
+"""
+import typing as T
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from parsers.tables import ParseTables
+
+MAGIC = b"LRTABLES"
+CACHE_VERSION = 4
+_PREFIX = struct.Struct("<III")
+_VECTORS = ("action", "goto", "lhs", "length")
+
+
+def save_tables(path: str,
+                tables: ParseTables,
+                fingerprint: str,
+                kind: str):
+    """
+        Writes the tables to 'path' atomically (a temporary file is renamed over it).
+    """
+    vectors = [array('i', getattr(tables, name)) for name in _VECTORS]
+    payload = b"".join(vector.tobytes() for vector in vectors)
+    header = json.dumps({
+        "fingerprint": fingerprint,
+        "kind": kind,
+        "byteorder": sys.byteorder,
+        "itemsize": vectors[0].itemsize,
+        "n_states": tables.n_states,
+        "n_terminals": tables.n_terminals,
+        "n_symbols": tables.n_symbols,
+        "eof": tables.eof,
+        "start": tables.start,
+        "names": tables.names,
+        "explicit_errors": sorted(tables.explicit_errors),
+        "sizes": [len(vector) for vector in vectors],
+    }).encode("utf-8")
+    header += b" " * (-len(header) % 8)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC)
+            f.write(_PREFIX.pack(CACHE_VERSION, len(header), zlib.crc32(payload, zlib.crc32(header))))
+            f.write(header)
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_tables(path: str,
+                fingerprint: str,
+                kind: str) -> T.Optional[ParseTables]:
+    """
+        Memory-maps the tables saved in 'path'. The vectors of the returned tables are
+        read-only int views of the mapping (nothing is copied), and the mapping is their
+        buffer (see ParseTables).
+
+        @returns:
+            None if the file does not exist, is corrupted, or was written for another
+            grammar, parser kind, cache version or machine
+    """
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):  # missing or empty file
+        return None
+
+    tables = _read_tables(buffer, fingerprint, kind)
+    if tables is None:
+        buffer.close()  # no view of it is left
+    return tables
+
+
+def _read_tables(buffer: mmap.mmap,
+                 fingerprint: str,
+                 kind: str) -> T.Optional[ParseTables]:
+    try:
+        prefix_end = len(MAGIC) + _PREFIX.size
+        if buffer[:len(MAGIC)] != MAGIC or len(buffer) < prefix_end:
+            return None
+        version, header_size, crc = _PREFIX.unpack(buffer[len(MAGIC):prefix_end])
+        if version != CACHE_VERSION or zlib.crc32(memoryview(buffer)[prefix_end:]) != crc:
+            return None
+        header = json.loads(bytes(buffer[prefix_end:prefix_end + header_size]).decode("utf-8"))
+        if (header["fingerprint"] != fingerprint or header["kind"] != kind
+                or header["byteorder"] != sys.byteorder or header["itemsize"] != array('i').itemsize):
+            return None
+
+        n_states, n_terminals, n_symbols = header["n_states"], header["n_terminals"], header["n_symbols"]
+        action_size, goto_size, lhs_size, length_size = header["sizes"]
+        if (action_size != n_states * n_terminals or goto_size != n_states * (n_symbols - n_terminals)
+                or lhs_size != length_size or len(header["names"]) != n_symbols):
+            return None
+        payload_start = prefix_end + header_size
+        view = memoryview(buffer)[payload_start:]
+        if len(view) != sum(header["sizes"]) * header["itemsize"]:
+            return None
+        view = view.cast('i')
+        vectors: T.List[memoryview] = []
+        offset = 0
+        for size in header["sizes"]:
+            vectors.append(view[offset:offset + size])
+            offset += size
+    except (ValueError, KeyError, TypeError, struct.error, UnicodeDecodeError):  # also a wrong number of sizes
+        return None
+
+    action, goto, lhs, length = vectors
+    return ParseTables(header["n_states"],
+                       header["n_terminals"],
+                       header["n_symbols"],
+                       lhs,
+                       length,
+                       header["names"],
+                       header["eof"],
+                       header["start"],
+                       action=action,
+                       goto=goto,
+                       explicit_errors=map(tuple, header["explicit_errors"]),
+                       buffer=buffer)
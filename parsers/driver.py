@@ -0,0 +1,292 @@
+import typing as T
+from parsers.tables import ParseTables, CompressedTables, ACCEPT, ERROR, is_shift, shift_target
+from utils.AST import AST
+from utils.bitset import iter_bits
+
+# called on reduce with the list of values of the popped symbols, returns the value of the variable
+REDUCER = T.Callable[[T.List[T.Any]], T.Any]
+
+
+def ast_reducers(tables: T.Union[ParseTables, CompressedTables]) -> T.List[REDUCER]:
+    """
+        Reducers building an AST node labeled with the left side of each production.
+    """
+    def node_builder(name: str) -> REDUCER:
+        return lambda children: AST(name, children)
+    return [node_builder(tables.names[var]) for var in tables.lhs]
+
+
+def _ast_leaf(terminal: int, value: T.Any) -> AST:
+    return AST(value, [])
+
+
+def _ast_error(nodes: T.List[AST]) -> AST:
+    return AST(-1, nodes)  # parse unsucessful
+
+
+class ParseError(T.NamedTuple):
+    """
+        Syntax error found by a recovering PushParser.
+
+        @attrs:
+            position [int]: index of the offending token in the input
+            token [tuple]: the token as fed, e.g. a utils.lexer.Token (with its line and column),
+                or (terminal id, name) for feed_many
+            expected [tuple[str, ...]]: names of the terminals the parser had an action for
+    """
+    position: int
+    token: T.Any
+    expected: T.Tuple[str, ...]
+
+
+class PushParser:
+    """
+        Push-style LR parsing: tokens are fed as they become available (feed / feed_many)
+        and the parser stack is kept between calls. finish() signals the end of input.
+
+        Tokens are either terminal names (feed_many) or (terminal id, value) pairs, such as
+        the tokens of utils.lexer.Lexer (feed_tokens); a name is its own value.
+
+        Along with the state stack, the parser keeps the value of each symbol on the stack:
+        a shifted token has value shift_value(terminal id, token value) (the token value itself
+        if not given), and
+        reducing by production p replaces the values of the popped symbols with
+        reducers[p](values). On a syntax error, the result is error_value(stack values).
+        By default these build an AST, but they can be any semantic action (see
+        SLR_Parser.parse_with) or build another tree representation (see SLR_Parser.parse_arena).
+
+        Nothing but the stacks is kept, so arbitrarily long streams can be parsed as long
+        as the stacks (and whatever the reducers build) fit in memory.
+
+        By default, the parse stops at the first syntax error. With recover=True, every error
+        is recorded (see ParseError) and the parse goes on, in the style of yacc:
+            - if the grammar has an 'error' terminal, states are popped until one can shift it,
+              and it is shifted with value error_value(popped values) (None if not given).
+              Tokens are then discarded until one has an action, so a production such as
+              S -> error SEMI resumes parsing at the next SEMI
+            - otherwise (or if no state can shift 'error'), in panic mode, states are popped
+              until one has an action on the offending token, which is discarded if there is none
+            - errors found less than 3 tokens after the last one are not reported, since they
+              are usually caused by the recovery itself
+        The parse fails for good only when EOF cannot be handled.
+
+        @attrs:
+            status [Optional[int]]: None while parsing, 0 after a successful parse, -1 after a syntax error
+            result [Any]: once status is set, value of the start variable (also when errors
+                were recovered from; on a failed parse, error_value(stack values), None if not given)
+            position [int]: number of tokens consumed so far (on errors, index of the offending token)
+            errors [list[ParseError]]: errors found so far (only with recover=True)
+    """
+
+    def __init__(self,
+                 tables: T.Union[ParseTables, CompressedTables],
+                 symbol_ids: T.Mapping[str, int],
+                 reducers: T.Optional[T.Sequence[REDUCER]] = None,
+                 shift_value: T.Optional[T.Callable[[int, T.Any], T.Any]] = None,
+                 error_value: T.Optional[T.Callable[[T.List[T.Any]], T.Any]] = None,
+                 recover: bool = False):
+        """
+            Args:
+                tables: ACTION and GOTO tables
+                symbol_ids (dict[str, int]): terminal name -> terminal id (as in the tables)
+                reducers (Optional[list[REDUCER]]): one per production; builds an AST if not given
+                shift_value (Optional[Callable]): value of a shifted token (ignored when building an AST)
+                error_value (Optional[Callable]): result of a failed parse, and value of the 'error'
+                    terminal (ignored when building an AST)
+                recover (bool): recover from syntax errors instead of stopping at the first one
+        """
+        self.tables = tables
+        self.symbol_ids = symbol_ids
+        if reducers is None:
+            reducers = ast_reducers(tables)
+            shift_value = _ast_leaf
+            error_value = _ast_error
+        self.reducers = reducers
+        self.shift_value = shift_value
+        self.error_value = error_value
+        self.state_stack: T.List[int] = [0]
+        self.values: T.List[T.Any] = []
+        self.status: T.Optional[int] = None
+        self.result: T.Any = None
+        self.position = 0
+        self.recover = recover
+        self.errors: T.List[ParseError] = []
+        error = symbol_ids.get("error", -1)
+        self.error_terminal = error if 0 <= error < tables.n_terminals else -1
+        # recovery state: position of the last recovery step, position of the token retried
+        # after it, and (stack size, top state) right after shifting 'error': tokens are
+        # discarded while the stack is left as is
+        self._recovered_at = -3
+        self._retry_at = -1
+        self._error_top = (-1, -1)
+
+    def _fail(self) -> bool:
+        self.status = -1
+        if self.error_value is not None:
+            self.result = self.error_value(self.values)
+        return False
+
+    def _recover(self, tok: T.Tuple[int, T.Any]) -> bool:
+        """
+            Handles a syntax error on token 'tok' (see the class docstring).
+
+            @returns:
+                true if the token must be tried again on the new stack, false if it was
+                discarded (or the parse failed, setting status)
+        """
+        tables = self.tables
+        get_action = tables.get_action
+        state_stack, values = self.state_stack, self.values
+        t = tok[0]
+        known = 0 <= t < tables.n_terminals
+        skipping = self._error_top == (len(state_stack), state_stack[-1])
+        if self.position - self._recovered_at >= 3:
+            expected = tables.expected_terminals()[state_stack[-1]]
+            if self.error_terminal != -1:
+                expected &= ~(1 << self.error_terminal)
+            self.errors.append(ParseError(self.position, tok, tuple(tables.names[e] for e in iter_bits(expected))))
+        self._recovered_at = self.position
+
+        if known and not skipping and self.position != self._retry_at:
+            error = self.error_terminal
+            if error != -1:
+                for i in range(len(state_stack) - 1, -1, -1):
+                    action = get_action(state_stack[i], error)
+                    if is_shift(action):
+                        popped = values[i:]
+                        del state_stack[i + 1:]
+                        del values[i:]
+                        values.append(None if self.error_value is None else self.error_value(popped))
+                        state_stack.append(shift_target(action))
+                        self._error_top = (len(state_stack), state_stack[-1])
+                        skipping = True
+                        break
+            if not skipping:  # panic mode
+                for i in range(len(state_stack) - 1, -1, -1):
+                    if get_action(state_stack[i], t) != ERROR:
+                        del state_stack[i + 1:]
+                        del values[i:]
+                        self._retry_at = self.position
+                        return True
+        if skipping and known and get_action(state_stack[-1], t) != ERROR:
+            self._retry_at = self.position
+            return True
+        if t == tables.eof:
+            self._fail()
+            return False
+        self.position += 1  # discarded
+        return False
+
+    def feed_many(self, tokens: T.Iterable[str]) -> bool:
+        """
+            Consumes terminal names (lazily, any iterable works) until they run out or a syntax error occurs.
+
+            @returns:
+                false iff the parse has already failed (or finished)
+        """
+        symbol_ids = self.symbol_ids
+        # unknown symbols get id -1
+        return self.feed_tokens((symbol_ids.get(tok, -1), tok) for tok in tokens)
+
+    def feed_tokens(self, tokens: T.Iterable[T.Tuple[int, T.Any]]) -> bool:
+        """
+            Same as feed_many, for tokens given as (terminal id, value, ...) tuples, e.g. utils.lexer.Token.
+        """
+        if self.status is not None:
+            return False
+        tables = self.tables
+        get_action, get_goto = tables.get_action, tables.get_goto
+        lhs, length = tables.lhs, tables.length
+        n_terminals = tables.n_terminals
+        reducers, shift_value = self.reducers, self.shift_value
+        state_stack, values = self.state_stack, self.values
+        for tok in tokens:
+            t = tok[0]
+            # unknown symbols (and variables) have no action
+            if not (0 <= t < n_terminals):
+                if not self.recover:
+                    return self._fail()
+                self._recover(tok)
+                continue
+            while (True):
+                action = get_action(state_stack[-1], t)
+                if action > 0:  # shift
+                    values.append(tok[1] if shift_value is None else shift_value(t, tok[1]))
+                    state_stack.append(action - 1)
+                    self.position += 1
+                    break
+                elif action < ACCEPT:  # reduce
+                    p = -action - 2
+                    # pop states corresponding to rule A -> alpha
+                    split = len(state_stack) - length[p]
+                    reduce_components = values[split - 1:]
+                    del state_stack[split:]
+                    del values[split - 1:]
+                    next_state = get_goto(state_stack[-1], lhs[p])
+                    if next_state == -1:
+                        return self._fail()
+                    state_stack.append(next_state)
+                    values.append(reducers[p](reduce_components))
+                elif action == ACCEPT:  # only on EOF
+                    self.status = -1 if self.errors else 0
+                    self.result = values[-1]  # accepting state, parse sucessful (or recovered)
+                    return True
+                elif not self.recover:
+                    return self._fail()
+                elif not self._recover(tok):
+                    if self.status is not None:
+                        return False
+                    break
+        return True
+
+    def feed(self, token: str) -> bool:
+        """
+            Consumes a single token (see feed_many).
+        """
+        return self.feed_many((token,))
+
+    def finish(self) -> T.Tuple[int, T.Any]:
+        """
+            Signals the end of input.
+
+            @returns:
+                (status code, result): status code 0 for sucessful parsing, -1 for Error
+        """
+        if self.status is None:
+            self.feed(self.tables.names[self.tables.eof])
+        if self.status is None:  # EOF can never be shifted
+            self._fail()
+        return T.cast(int, self.status), self.result
+
+
+def recognize(tables: T.Union[ParseTables, CompressedTables],
+              terminals: T.Iterable[int]) -> bool:
+    """
+        Whether the terminals (given by id, -1 for unknown symbols) form a word of the grammar.
+        Only the state stack is kept: no value (nor AST) is built.
+    """
+    get_action, get_goto = tables.get_action, tables.get_goto
+    lhs, length = tables.lhs, tables.length
+    n_terminals, eof = tables.n_terminals, tables.eof
+    state_stack = [0]
+    stream = iter(terminals)
+    t = next(stream, eof)
+    while (True):
+        if not (0 <= t < n_terminals):
+            return False
+        while (True):
+            action = get_action(state_stack[-1], t)
+            if action > 0:  # shift
+                state_stack.append(action - 1)
+                break
+            elif action < ACCEPT:  # reduce
+                p = -action - 2
+                if length[p] > 0:
+                    del state_stack[-length[p]:]
+                next_state = get_goto(state_stack[-1], lhs[p])
+                if next_state == -1:
+                    return False
+                state_stack.append(next_state)
+            else:  # accept (on EOF) or error
+                return action == ACCEPT
+        t = next(stream, eof)
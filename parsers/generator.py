@@ -0,0 +1,176 @@
+"""
+    Ahead-of-time parser generator: writes a standalone Python module (in the spirit of
+    yacc's parsetab) holding the parse tables as literal constants and a parse loop
+    specialized for them. The generated module only depends on the standard library,
+    so importing it does not run any grammar analysis.
+
+    Usage:
+        python -m parsers.generator GRAMMAR_FILE -o OUTPUT.py [--compress]
+"""
+import typing as T
+import argparse
+import sys
+from parsers.SLR import SLR_Parser
+from parsers.LALR import LALR_Parser
+from parsers.LR1 import LR1_Parser
+from parsers.tables import ParseTables, CompressedTables
+from utils.preprocessing import parse_file
+
+PARSERS: T.Dict[str, T.Type[SLR_Parser]] = {
+    "SLR": SLR_Parser,
+    "LALR": LALR_Parser,
+    "LR1": LR1_Parser,
+}
+
+_HEADER = '''"""
+    Parser generated by parsers.generator from {source} ({kind}). Do not edit.
+
+    parse(tokens) -> (status, tree): status is 0 on success and -1 on a syntax error.
+    Tokens are terminal names, given by any iterable. The tree is made of Node objects
+    (value, children), like utils.AST.AST.
+"""
+from array import array
+
+FINGERPRINT = {fingerprint!r}
+NAMES = {names!r}
+N_TERMINALS = {n_terminals!r}
+EOF = {eof!r}
+START = {start!r}
+LHS = {lhs!r}
+LENGTH = {length!r}
+'''
+
+_DENSE_TABLES = '''N_VARS = {n_vars!r}
+ACTION = array('i', {action!r})
+GOTO = array('i', {goto!r})
+'''
+
+_COMPRESSED_TABLES = '''ACTION_DEFAULT = array('i', {action_default!r})
+ACTION_ROW = array('i', {action_row!r})
+ACTION_BASE = array('i', {action_base!r})
+ACTION_CHECK = array('i', {action_check!r})
+ACTION_NEXT = array('i', {action_next!r})
+GOTO_DEFAULT = array('i', {goto_default!r})
+GOTO_BASE = array('i', {goto_base!r})
+GOTO_CHECK = array('i', {goto_check!r})
+GOTO_NEXT = array('i', {goto_next!r})
+'''
+
+_PARSER = '''
+SYMBOL_IDS = {{name: i for i, name in enumerate(NAMES[:N_TERMINALS])}}
+
+
+class Node:
+    __slots__ = ("value", "children")
+
+    def __init__(self, value, children):
+        self.value = value
+        self.children = children
+
+    def __repr__(self):
+        if len(self.children) == 0:
+            return f"[{{self.value}}]"
+        return "[" + ", ".join([str(self.value)] + [repr(c) for c in self.children]) + "]"
+
+
+def parse(tokens):
+    symbol_ids = SYMBOL_IDS
+{locals}
+    nodes = []
+    state_stack = [0]
+    stream = iter(tokens)
+    tok = next(stream, None)
+    while (True):
+        t = EOF if tok is None else symbol_ids.get(tok, -1)
+        while (True):
+            s = state_stack[-1]
+            if t < 0:
+                action = 0
+            else:
+{action}
+            if action > 0:  # shift
+                nodes.append(Node(tok, []))
+                state_stack.append(action - 1)
+                break
+            elif action < -1:  # reduce
+                p = -action - 2
+                split = len(state_stack) - LENGTH[p]
+                children = nodes[split - 1:]
+                del state_stack[split:]
+                del nodes[split - 1:]
+                var = LHS[p]
+                s = state_stack[-1]
+{goto}
+                if next_state == -1:
+                    return -1, Node(-1, nodes)
+                state_stack.append(next_state)
+                nodes.append(Node(NAMES[var], children))
+            elif action == -1:  # accept (only reachable from state 0, so nodes is [root])
+                return 0, nodes[-1]
+            else:
+                return -1, Node(-1, nodes)
+        tok = next(stream, None)
+'''
+
+_DENSE_LOCALS = '''    action_table, goto_table = ACTION, GOTO
+    n_terminals, n_vars = N_TERMINALS, N_VARS'''
+_DENSE_ACTION = '''                action = action_table[s * n_terminals + t]'''
+_DENSE_GOTO = '''                next_state = goto_table[s * n_vars + var - n_terminals]'''
+
+_COMPRESSED_LOCALS = '''    n_terminals = N_TERMINALS'''
+_COMPRESSED_ACTION = '''                row = ACTION_ROW[s]
+                i = ACTION_BASE[row] + t
+                action = ACTION_NEXT[i] if ACTION_CHECK[i] == row else ACTION_DEFAULT[s]'''
+_COMPRESSED_GOTO = '''                column = var - n_terminals
+                i = GOTO_BASE[column] + s
+                next_state = GOTO_NEXT[i] if GOTO_CHECK[i] == column else GOTO_DEFAULT[column]'''
+
+
+def generate_module(tables: T.Union[ParseTables, CompressedTables],
+                    fingerprint: str = "",
+                    source: str = "<grammar>",
+                    kind: str = "SLR") -> str:
+    """
+        Source code of a standalone parser module for the given tables.
+    """
+    code = _HEADER.format(source=source,
+                          kind=kind,
+                          fingerprint=fingerprint,
+                          names=tuple(tables.names),
+                          n_terminals=tables.n_terminals,
+                          eof=tables.eof,
+                          start=tables.start,
+                          lhs=tuple(tables.lhs),
+                          length=tuple(tables.length))
+    if isinstance(tables, CompressedTables):
+        code += _COMPRESSED_TABLES.format(**{
+            name: tuple(getattr(tables, name)) for name in (
+                "action_default", "action_row", "action_base", "action_check", "action_next",
+                "goto_default", "goto_base", "goto_check", "goto_next")
+        })
+        code += _PARSER.format(locals=_COMPRESSED_LOCALS, action=_COMPRESSED_ACTION, goto=_COMPRESSED_GOTO)
+    else:
+        code += _DENSE_TABLES.format(n_vars=tables.n_vars,
+                                     action=tuple(tables.action),
+                                     goto=tuple(tables.goto))
+        code += _PARSER.format(locals=_DENSE_LOCALS, action=_DENSE_ACTION, goto=_DENSE_GOTO)
+    return code
+
+
+def main(argv: T.Optional[T.List[str]] = None):
+    arg_parser = argparse.ArgumentParser(description="Generate a standalone parser module from a grammar file.")
+    arg_parser.add_argument("grammar", help="grammar file, as read by utils.preprocessing.parse_file")
+    arg_parser.add_argument("-o", "--output", default="parsetab.py", help="path of the generated module")
+    arg_parser.add_argument("--kind", choices=sorted(PARSERS), default="SLR", help="parsing method")
+    arg_parser.add_argument("--compress", action="store_true", help="emit compressed (row displacement) tables")
+    args = arg_parser.parse_args(argv)
+
+    grammar = parse_file(args.grammar)
+    parser = PARSERS[args.kind](grammar, compress=args.compress)
+    code = generate_module(parser.tables, parser.compiled.fingerprint(), args.grammar, args.kind)
+    with open(args.output, "w") as f:
+        f.write(code)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,186 @@
+"""
+    Incremental reparsing: after an edit of the token list, only the damaged region is parsed
+    again, and the subtrees of the previous tree around it are reused as a whole.
+
+    Every node records the LR state below it on the parser stack when it was built (the state
+    its symbol was shifted or reduced from) and the number of tokens it covers. The parse of
+    the tokens of a node only depends on that state, on the tokens themselves and on the token
+    following them (the lookahead of its last reductions). So a node that covers no edited
+    token, and whose following token was not edited either, can be pushed back with a single
+    GOTO whenever the parser reaches the same state in front of it (as in the "sentential form"
+    parsers of Wagner and Graham, or tree-sitter).
+
+    The previous tree is cut around the edit into a list of such nodes (plus the new tokens),
+    following the path from the root to the edit, and the parser runs on that list: a node is
+    reused if its state matches, broken down into its children if the parser shifts its first
+    token, and simply parsed again if it covers no token (epsilon nodes). The cost of a reparse
+    is the size of the edit plus the length of the path to it, so it stays low unless that path
+    is long (e.g. long left-recursive lists, where each enclosing list node is rebuilt with one
+    reduction, its items being reused).
+"""
+import typing as T
+from parsers.SLR import SLR_Parser
+from parsers.tables import ACCEPT
+from utils.AST import AST
+
+
+class Incremental_AST(AST):
+    """
+        AST node that remembers how the parser built it.
+
+        @attrs:
+            symbol [int]: symbol id
+            state [int]: LR state below the node on the parser stack when it was built
+            size [int]: number of tokens it covers
+    """
+
+    def __init__(self, value: T.Any, children: T.List["Incremental_AST"], symbol: int, state: int, size: int):
+        super().__init__(value, children)  # type: ignore
+        self.symbol = symbol
+        self.state = state
+        self.size = size
+
+
+def _first_terminal(node: Incremental_AST) -> int:
+    while (node.children):
+        node = next(c for c in node.children if c.size > 0)
+    return node.symbol
+
+
+def _cut(root: Incremental_AST, start: int, end: int) -> T.Tuple[T.List[Incremental_AST], T.List[Incremental_AST]]:
+    """
+        Reusable nodes of the tree before and after the token range [start, end) (in order),
+        covering all other tokens. Nodes followed by the token 'start' are broken down too,
+        since their lookahead changed, as well as epsilon nodes in [start, end].
+    """
+    left: T.List[Incremental_AST] = []
+    right: T.List[Incremental_AST] = []
+    stack = [(root, 0)]
+    while (stack):
+        node, offset = stack.pop()
+        node_end = offset + node.size
+        if node.size == 0:
+            if offset < start:
+                left.append(node)
+            elif offset > end:
+                right.append(node)
+        elif node_end < start or (not node.children and node_end <= start):
+            left.append(node)
+        elif offset >= end:
+            right.append(node)
+        elif node.children:
+            entries = []
+            for child in node.children:
+                entries.append((child, offset))
+                offset += child.size
+            stack.extend(reversed(entries))
+        # edited tokens are dropped
+    return left, right
+
+
+class IncrementalParser:
+    """
+        Keeps the token list and the tree of the last parse of a SLR_Parser (or subclass),
+        and updates both on each edit.
+
+        Tokens are (terminal id, value, ...) tuples, e.g. utils.lexer.Token, and leaves
+        are labeled with their value (as in SLR_Parser.parse_tokens). The replacement tokens
+        of an edit are lexed by the caller, e.g. by running a utils.lexer.Lexer on the edited text.
+
+        @attrs:
+            tokens [list[tuple]]: current input
+            status [int]: status code of the last parse, 0 for sucessful parsing, -1 for Error
+            tree [Optional[Incremental_AST]]: tree of the last parse, None after a syntax error
+                (the next edit is then parsed from scratch)
+            stats [dict[str, int]]: work done by the last parse: reused nodes, shifted tokens and reductions
+    """
+
+    def __init__(self, parser: SLR_Parser, tokens: T.Iterable[T.Tuple[int, T.Any]] = ()):
+        if not isinstance(parser, SLR_Parser):  # e.g. a GLR_Parser, whose tables have conflicts
+            raise TypeError(f"Incremental parsing needs a deterministic parser (SLR_Parser or subclass), got {type(parser).__name__}")
+        self.parser = parser
+        self.tokens: T.List[T.Tuple[int, T.Any]] = list(tokens)
+        self.tree: T.Optional[Incremental_AST] = None
+        self.status, self.result = self._parse(self._leaves(self.tokens))
+
+    @staticmethod
+    def _leaves(tokens: T.Sequence[T.Tuple[int, T.Any]]) -> T.List[Incremental_AST]:
+        return [Incremental_AST(tok[1], [], tok[0], -1, 1) for tok in tokens]
+
+    def edit(self, start: int, end: int, tokens: T.Iterable[T.Tuple[int, T.Any]]) -> T.Tuple[int, AST]:
+        """
+            Replaces self.tokens[start:end] by the given tokens and parses again.
+            Return a tuple (status code, AST) as SLR_Parser.parse.
+        """
+        if not (0 <= start <= end <= len(self.tokens)):
+            raise ValueError(f"Invalid edit range [{start}, {end}) for {len(self.tokens)} tokens")
+        new_tokens = list(tokens)
+        self.tokens[start:end] = new_tokens
+        if self.tree is None:
+            items = self._leaves(self.tokens)
+        else:
+            left, right = _cut(self.tree, start, end)
+            items = left + self._leaves(new_tokens) + right
+        self.status, self.result = self._parse(items)
+        return self.status, self.result
+
+    def _parse(self, items: T.List[Incremental_AST]) -> T.Tuple[int, AST]:
+        tables = self.parser.tables
+        get_action, get_goto = tables.get_action, tables.get_goto
+        lhs, length, names = tables.lhs, tables.length, tables.names
+        n_terminals, eof = tables.n_terminals, tables.eof
+        pending = items[::-1]
+        state_stack = [0]
+        values: T.List[Incremental_AST] = []
+        reused = shifted = reduced = 0
+        while (True):
+            if pending:
+                item: T.Optional[Incremental_AST] = pending[-1]
+                if item.symbol >= n_terminals:
+                    if item.state == state_stack[-1]:  # same left context: reuse the whole subtree
+                        pending.pop()
+                        values.append(item)
+                        state_stack.append(get_goto(state_stack[-1], item.symbol))
+                        reused += 1
+                        continue
+                    if item.size == 0:  # built again if needed
+                        pending.pop()
+                        continue
+                    t = _first_terminal(item)
+                else:
+                    t = item.symbol
+            else:
+                item, t = None, eof
+            if not (0 <= t < n_terminals):
+                break
+            action = get_action(state_stack[-1], t)
+            if action > 0:  # shift (never on EOF)
+                item = T.cast(Incremental_AST, pending.pop())
+                if item.symbol >= n_terminals:  # break the subtree down
+                    pending.extend(reversed(item.children))
+                    continue
+                values.append(Incremental_AST(item.value, [], t, state_stack[-1], 1))
+                state_stack.append(action - 1)
+                shifted += 1
+            elif action < ACCEPT:  # reduce
+                p = -action - 2
+                split = len(values) - length[p]
+                children = values[split:]
+                del values[split:]
+                del state_stack[split + 1:]
+                node = Incremental_AST(names[lhs[p]], children, lhs[p], state_stack[-1], sum(c.size for c in children))
+                next_state = get_goto(state_stack[-1], lhs[p])
+                if next_state == -1:
+                    break
+                values.append(node)
+                state_stack.append(next_state)
+                reduced += 1
+            elif action == ACCEPT:  # only reachable from state 0, so values is [root]
+                self.stats = {"reused": reused, "shifted": shifted, "reduced": reduced}
+                self.tree = values[-1]
+                return 0, self.tree
+            else:
+                break
+        self.stats = {"reused": reused, "shifted": shifted, "reduced": reduced}
+        self.tree = None
+        return -1, AST(-1, values)  # type: ignore
@@ -0,0 +1,352 @@
+import typing as T
+import time
+from array import array
+from grammar import CompiledGrammar
+from utils.bitset import bits_of
+
+# Every ACTION entry is a single integer:
+#   ERROR (0)            no action, syntax error
+#   ACCEPT (-1)          input accepted
+#   s + 1 (positive)     shift and go to state s
+#   -(p + 2) (< -1)      reduce by production p
+ERROR = 0
+ACCEPT = -1
+
+
+def encode_shift(state: int) -> int:
+    return state + 1
+
+
+def encode_reduce(production: int) -> int:
+    return -(production + 2)
+
+
+def is_shift(action: int) -> bool:
+    return action > 0
+
+
+def is_reduce(action: int) -> bool:
+    return action < ACCEPT
+
+
+def shift_target(action: int) -> int:
+    return action - 1
+
+
+def reduced_production(action: int) -> int:
+    return -action - 2
+
+
+class ParseTables:
+    """
+        ACTION and GOTO tables of an LR parser, as flat integer arrays.
+
+        @attrs:
+            n_states [int]: number of rows
+            n_terminals [int]: number of terminals (EOF included), columns of ACTION
+            n_symbols [int]: number of symbols; GOTO has n_symbols - n_terminals columns
+            action [array[int]]: action[state * n_terminals + terminal] is an encoded action
+                (see ERROR, ACCEPT, encode_shift and encode_reduce)
+            goto [array[int]]: goto[state * n_vars + (var - n_terminals)] is the next state, -1 if none
+            lhs [array[int]]: left side of each production
+            length [array[int]]: size of the right side of each production
+            names [list[str]]: symbol id -> name (for AST labels)
+            eof [int]: id of the EOF symbol
+            start [int]: id of the start variable
+            explicit_errors [set[tuple[int, int]]]: (state, terminal) entries set to ERROR on purpose
+                (by %nonassoc precedence), which compressed tables must not fill with a default
+            buffer [Optional[Any]]: object owning the memory of the vectors when they are views
+                (e.g. the mmap of a cache file), kept alive as long as the tables; None otherwise
+
+        Symbol ids are the ones of the CompiledGrammar the tables were built from, and
+        the tables only need this metadata (not the grammar) to drive a parse.
+    """
+
+    def __init__(self,
+                 n_states: int,
+                 n_terminals: int,
+                 n_symbols: int,
+                 lhs: T.Sequence[int],
+                 length: T.Sequence[int],
+                 names: T.Sequence[str],
+                 eof: int = 0,
+                 start: int = -1,
+                 action: T.Optional[T.Sequence[int]] = None,
+                 goto: T.Optional[T.Sequence[int]] = None,
+                 explicit_errors: T.Iterable[T.Tuple[int, int]] = (),
+                 buffer: T.Any = None):
+        """
+            Empty tables (all errors) unless the 'action' and 'goto' vectors are given,
+            in which case they are used as is (e.g. int views of a memory-mapped file,
+            which is then passed as 'buffer').
+        """
+        self.n_states = n_states
+        self.n_terminals = n_terminals
+        self.n_symbols = n_symbols
+        self.n_vars = n_symbols - n_terminals
+        self.action = array('i', [ERROR]) * (n_states * n_terminals) if action is None else action
+        self.goto = array('i', [-1]) * (n_states * self.n_vars) if goto is None else goto
+        self.lhs = lhs if isinstance(lhs, (array, memoryview)) else array('i', lhs)
+        self.length = length if isinstance(length, (array, memoryview)) else array('i', length)
+        self.names: T.List[str] = list(names)
+        self.eof = eof
+        self.start = start
+        self.explicit_errors: T.Set[T.Tuple[int, int]] = set(explicit_errors)
+        self.buffer = buffer
+        self._expected: T.Optional[T.List[int]] = None
+
+    @staticmethod
+    def for_grammar(compiled: CompiledGrammar, n_states: int) -> "ParseTables":
+        """
+            Empty tables (all errors) with room for n_states states.
+        """
+        return ParseTables(n_states,
+                           compiled.n_terminals,
+                           compiled.n_symbols,
+                           compiled.lhs,
+                           [compiled.length(p) for p in range(compiled.n_productions)],
+                           compiled.names,
+                           compiled.eof,
+                           compiled.start)
+
+    def add_state(self) -> int:
+        """
+            Appends an empty row to both tables and returns its state id.
+        """
+        self.action.extend(array('i', [ERROR]) * self.n_terminals)
+        self.goto.extend(array('i', [-1]) * self.n_vars)
+        self.n_states += 1
+        self._expected = None
+        return self.n_states - 1
+
+    def get_action(self, state: int, terminal: int) -> int:
+        return self.action[state * self.n_terminals + terminal]
+
+    def set_action(self, state: int, terminal: int, action: int):
+        self.action[state * self.n_terminals + terminal] = action
+        self._expected = None
+
+    def expected_terminals(self) -> T.List[int]:
+        """
+            Terminals with a (non-error) action in each state, as bitsets: state -> terminal bitset.
+            Computed once (see SLR_Parser.compile_tables), so reporting a syntax error is a lookup.
+        """
+        if self._expected is None:
+            n_terminals, action = self.n_terminals, self.action
+            self._expected = []
+            for state in range(self.n_states):
+                row = action[state * n_terminals:(state + 1) * n_terminals]
+                self._expected.append(bits_of(t for t, a in enumerate(row) if a != ERROR))
+        return self._expected
+
+    def get_goto(self, state: int, var: int) -> int:
+        return self.goto[state * self.n_vars + var - self.n_terminals]
+
+    def set_goto(self, state: int, var: int, target: int):
+        self.goto[state * self.n_vars + var - self.n_terminals] = target
+
+    @property
+    def nbytes(self) -> int:
+        """
+            Memory used by the ACTION and GOTO arrays.
+        """
+        return self.action.itemsize * len(self.action) + self.goto.itemsize * len(self.goto)
+
+    def compress(self) -> "CompressedTables":
+        return CompressedTables(self)
+
+
+def eliminate_unit_reductions(tables: ParseTables,
+                              unit_productions: T.Mapping[int, int]) -> T.Set[int]:
+    """
+        Chain rule elimination: a state whose ACTION row holds a single reduction, by a unit
+        production A -> C, and which has no GOTO does nothing but reduce, so every GOTO[r, C]
+        pointing to it is replaced by GOTO[r, A], following chains of such states. The reduction
+        by A -> C is then skipped at parse time, along with its pop and GOTO lookup.
+
+        Only the tables are inspected (not the LR items), so besides the states of the single
+        item A -> C., this covers states whose shifts all lost to the reduction by precedence.
+        Such states only reduce on lookaheads that the state reached through A accepts (or
+        rejects) anyway, so the language is unchanged; a syntax error may only be detected
+        one step later. States with explicit errors (%nonassoc) are kept, since the state
+        reached through A could accept those lookaheads. The bypassed states are left in the
+        tables, unreachable.
+
+        Args:
+            tables: dense tables, updated in place
+            unit_productions (dict[int, int]): unit production A -> C (C a variable) -> C
+
+        @returns:
+            the unit productions whose reductions were bypassed
+    """
+    n_terminals, n_vars = tables.n_terminals, tables.n_vars
+    # state -> unit production it only reduces by
+    unit_states: T.Dict[int, int] = dict()
+    rejecting = set(state for state, _ in tables.explicit_errors)
+    for state in range(tables.n_states):
+        if state in rejecting:
+            continue
+        row = set(tables.action[state * n_terminals:(state + 1) * n_terminals])
+        row.discard(ERROR)
+        if len(row) != 1:
+            continue
+        action = row.pop()
+        if (is_reduce(action) and reduced_production(action) in unit_productions
+                and all(target == -1 for target in tables.goto[state * n_vars:(state + 1) * n_vars])):
+            unit_states[state] = reduced_production(action)
+    if not unit_states:
+        return set()
+
+    if not isinstance(tables.goto, array):  # e.g. a read-only view of a cache file
+        tables.goto = array('i', tables.goto)
+    bypassed: T.Set[int] = set()
+    for state in range(tables.n_states):
+        for var in range(n_terminals, tables.n_symbols):
+            target = tables.get_goto(state, var)
+            steps = 0
+            while (target in unit_states and steps <= n_vars):
+                p = unit_states[target]
+                bypassed.add(p)
+                target = tables.get_goto(state, tables.lhs[p])
+                steps += 1
+            if steps > n_vars:
+                raise RuntimeError(f"Cycle of unit productions through state {state}: the grammar is ambiguous.")
+            tables.set_goto(state, var, target)
+    return bypassed
+
+
+def _displace(rows: T.List[T.List[T.Tuple[int, int]]],
+              width: int) -> T.Tuple[array, array, array]:
+    """
+        Row displacement (comb-vector) packing of sparse rows into a single vector.
+
+        Row r, given as a list of (column, value), is placed at offset base[r] so that
+        no two rows share a slot: values[base[r] + column] = value, and check[base[r] + column] = r
+        marks which row owns the slot. First-fit placement, densest rows first.
+
+        The vectors are padded with 'width' free slots, so base[r] + column is always
+        a valid index, whatever the row and column.
+    """
+    base = array('i', [0]) * len(rows)
+    check = array('i')
+    values = array('i')
+    first_free = 0
+    for r in sorted(range(len(rows)), key=lambda r: -len(rows[r])):
+        row = rows[r]
+        if len(row) == 0:
+            continue  # never owns a slot, so every lookup misses (check != r)
+        b = max(0, first_free - row[0][0])
+        while (any(b + c < len(check) and check[b + c] != -1 for c, _ in row)):
+            b += 1
+        needed = b + row[-1][0] + 1 - len(check)
+        if needed > 0:
+            check.extend(array('i', [-1]) * needed)
+            values.extend(array('i', [0]) * needed)
+        for c, value in row:
+            check[b + c] = r
+            values[b + c] = value
+        base[r] = b
+        while (first_free < len(check) and check[first_free] != -1):
+            first_free += 1
+    check.extend(array('i', [-1]) * width)
+    values.extend(array('i', [0]) * width)
+    return base, check, values
+
+
+class CompressedTables:
+    """
+        Compressed form of ParseTables (same metadata and lookup methods), in the style of yacc:
+
+        ACTION:
+            - every state with a single reduce action uses it as its default reduction, replacing
+              all error entries (the usual LR trade-off: an erroneous token is still never shifted,
+              but a few reductions may happen before the error is detected), except the explicit
+              errors of the dense tables, which are kept as entries of the row
+            - identical rows are stored once (action_row maps state -> row)
+            - the remaining (non-default) entries of all rows are packed with row displacement:
+              action_next[action_base[row] + terminal] is valid iff action_check[...] == row,
+              otherwise the answer is action_default[state]
+        GOTO:
+            - packed by variable (column) with the same scheme, each variable falling back to its
+              most common target (a goto is only looked up after a valid reduction, so the default
+              can be used wherever the dense table has no entry)
+
+        @attrs:
+            stats [dict[str, float]]: dense and compressed sizes (bytes), their ratio and the construction time (seconds)
+    """
+
+    def __init__(self, tables: ParseTables):
+        start_time = time.perf_counter()
+        self.n_states = tables.n_states
+        self.n_terminals = tables.n_terminals
+        self.n_symbols = tables.n_symbols
+        self.n_vars = tables.n_vars
+        self.lhs = tables.lhs
+        self.length = tables.length
+        self.names = tables.names
+        self.eof = tables.eof
+        self.start = tables.start
+        # taken from the dense tables: default reductions would make every terminal expected
+        self._expected = tables.expected_terminals()
+
+        # ACTION: default reductions and row sharing
+        self.action_default = array('i', [ERROR]) * self.n_states
+        self.action_row = array('i', [0]) * self.n_states
+        rows: T.List[T.List[T.Tuple[int, int]]] = []
+        row_ids: T.Dict[T.Tuple[T.Tuple[int, int], ...], int] = dict()
+        for state in range(self.n_states):
+            entries = tables.action[state * self.n_terminals:(state + 1) * self.n_terminals]
+            reductions = set(a for a in entries if is_reduce(a))
+            default = reductions.pop() if len(reductions) == 1 else ERROR
+            self.action_default[state] = default
+            row = tuple((t, a) for t, a in enumerate(entries)
+                        if a != default and (a != ERROR or (state, t) in tables.explicit_errors))
+            if row not in row_ids:
+                row_ids[row] = len(rows)
+                rows.append(list(row))
+            self.action_row[state] = row_ids[row]
+        self.action_base, self.action_check, self.action_next = _displace(rows, self.n_terminals)
+
+        # GOTO: one column per variable, with its most common target as default
+        self.goto_default = array('i', [-1]) * self.n_vars
+        columns: T.List[T.List[T.Tuple[int, int]]] = []
+        for v in range(self.n_vars):
+            targets = [tables.goto[state * self.n_vars + v] for state in range(self.n_states)]
+            counts: T.Dict[int, int] = dict()
+            for target in targets:
+                if target != -1:
+                    counts[target] = counts.get(target, 0) + 1
+            default = max(counts, key=lambda target: counts[target]) if counts else -1
+            self.goto_default[v] = default
+            columns.append([(state, target) for state, target in enumerate(targets) if target != -1 and target != default])
+        self.goto_base, self.goto_check, self.goto_next = _displace(columns, self.n_states)
+
+        self.stats: T.Dict[str, float] = {
+            "dense_bytes": tables.nbytes,
+            "compressed_bytes": self.nbytes,
+            "ratio": tables.nbytes / max(self.nbytes, 1),
+            "seconds": time.perf_counter() - start_time,
+        }
+
+    def get_action(self, state: int, terminal: int) -> int:
+        row = self.action_row[state]
+        i = self.action_base[row] + terminal
+        if self.action_check[i] == row:
+            return self.action_next[i]
+        return self.action_default[state]
+
+    def expected_terminals(self) -> T.List[int]:
+        return self._expected
+
+    def get_goto(self, state: int, var: int) -> int:
+        column = var - self.n_terminals
+        i = self.goto_base[column] + state
+        if self.goto_check[i] == column:
+            return self.goto_next[i]
+        return self.goto_default[column]
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.action_default, self.action_row, self.action_base, self.action_check, self.action_next,
+                  self.goto_default, self.goto_base, self.goto_check, self.goto_next)
+        return sum(a.itemsize * len(a) for a in arrays)
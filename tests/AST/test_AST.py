@@ -2,6 +2,8 @@ import typing as T
 from parsers.SLR import SLR_Parser
 from utils.preprocessing import parse_file
 from tests.AST.reader import read_ast
+from utils.AST import AST
+import io
 import os
 import pytest
 
@@ -50,3 +52,23 @@ def test_AST(grammar_filename: str, program_filename: str, target_filename: str)
         assert error_code == 0 and result_ast == target_ast
     else:
         assert error_code == -1
+
+
+def leaf(value: str) -> AST:
+    return AST(value, [])
+
+
+def test_write_matches_str():
+    tree = AST("S", [AST("Expr", [leaf("id"), leaf("PLUS"), leaf("id")]), leaf("z")])
+    buffer = io.StringIO()
+    assert tree.write(buffer) == 6
+    assert buffer.getvalue() == str(tree)
+    assert str(tree).splitlines() == ["S", "└──Expr", "   └───id", "   └───PLUS", "   └───id", "└──z"]
+
+
+def test_find_diff():
+    tree = AST("S", [AST("A", [leaf("x"), leaf("y")]), leaf("z")])
+    assert tree.find_diff(tree) == (-1, 0, "")
+    assert tree.find_diff(AST("S", [AST("A", [leaf("x"), leaf("y")]), leaf("w")])) == (4, 1, "w")
+    assert tree.find_diff(AST("S", [AST("A", [leaf("x")]), leaf("z")])) == (3, -1, leaf("y"))
+    assert AST("S", [AST("A", [leaf("x")])]).find_diff(tree) == (3, 2, leaf("y"))
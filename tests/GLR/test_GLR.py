@@ -0,0 +1,122 @@
+import math
+import warnings
+import pytest
+from utils.preprocessing import parse_file
+from parsers.GLR import GLR_Parser
+from parsers.LALR import LALR_Parser
+from parsers.SLR import SLR_Parser
+from parsers.incremental import IncrementalParser
+
+GLR_PATH = "tests/data/grammars/glr"
+
+
+@pytest.mark.parametrize(["program", "n_trees"], [
+    ("id", 1),
+    ("id PLUS id PLUS id", 2),
+    ("id PLUS id TIMES id PLUS id", 5),  # Catalan numbers
+    ("id PLUS id PLUS id PLUS id PLUS id", 14),
+    ("OPENP id PLUS id CLOSEP TIMES id PLUS id", 2),
+    ("OPENP id PLUS id CLOSEP", 1),
+    ("id PLUS", None),
+    ("id id", None),
+])
+def test_ambiguous(program: str, n_trees):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # conflicts are kept, not reported
+        parser = GLR_Parser(parse_file(f"{GLR_PATH}/ambiguous.txt"))
+    assert len(parser.conflicts) > 0
+    status, forest = parser.parse_forest(program.split())
+    if n_trees is None:
+        assert (status, forest) == (-1, None)
+        assert not parser.recognize(program.split())
+        return
+    assert status == 0
+    assert forest.count_trees() == n_trees
+    assert forest.ambiguous == (n_trees > 1)
+    trees = list(forest.trees())
+    assert len(trees) == n_trees
+    assert all(trees[i] != trees[j] for i in range(n_trees) for j in range(i))
+    assert parser.parse(program.split()) == (0, trees[0])
+
+
+def test_reduce_reduce():
+    with pytest.raises(ValueError):
+        LALR_Parser(parse_file(f"{GLR_PATH}/rr.txt"))
+    parser = GLR_Parser(parse_file(f"{GLR_PATH}/rr.txt"))
+    status, forest = parser.parse_forest(["x", "c"])
+    assert status == 0
+    assert sorted(tree.children[0].value for tree in forest.trees()) == ["A", "B"]
+    assert parser.parse_forest(["x", "x"]) == (-1, None)
+
+
+@pytest.mark.parametrize(["program", "depth"], [("x", 0), ("x b", 1), ("x b b b", 3), ("b x", None)])
+def test_hidden_left_recursion(program: str, depth):
+    # S -> A S b with A nullable: the GSS gets a loop on the state after A
+    parser = GLR_Parser(parse_file(f"{GLR_PATH}/hidden.txt"))
+    status, forest = parser.parse_forest(program.split())
+    if depth is None:
+        assert status == -1
+        return
+    assert status == 0
+    assert forest.count_trees() == 1
+    assert str(forest.first_tree()).count("A") == depth
+
+
+def test_deterministic_input():
+    grammar_file = "tests/data/grammars/lexer/expr.txt"
+    program = ("let id EQ num in " + "id PLUS num TIMES OPENP id PLUS num CLOSEP PLUS " * 200 + "id").split()
+    parser = GLR_Parser(parse_file(grammar_file))
+    assert parser.conflicts == dict()
+    status, forest = parser.parse_forest(program)
+    assert status == 0 and not forest.ambiguous
+    assert forest.first_tree() == LALR_Parser(parse_file(grammar_file)).parse(program)[1]
+
+
+def leaves(parser: GLR_Parser, tree) -> list:
+    if not tree.children:
+        return [tree.value] if parser.compiled.is_terminal(parser.compiled.ids[tree.value]) else []
+    return [leaf for child in tree.children for leaf in leaves(parser, child)]
+
+
+@pytest.mark.parametrize(["grammar_file", "program", "n_trees"], [
+    ("cyclic.txt", "a a", 1),  # S -> S S | a | (empty): reduce-accept conflicts
+    ("cyclic.txt", "a a a", 2),
+    ("cyclic.txt", "", 1),
+    ("cyclic.txt", "a b", None),
+    ("unit_cycle.txt", "id PLUS id PLUS id", 2),  # E -> T, T -> E
+    ("unit_cycle.txt", "id PLUS", None),
+])
+def test_cyclic(grammar_file: str, program: str, n_trees):
+    with warnings.catch_warnings(), pytest.raises(ValueError):
+        warnings.simplefilter("ignore")
+        LALR_Parser(parse_file(f"{GLR_PATH}/{grammar_file}"))
+    parser = GLR_Parser(parse_file(f"{GLR_PATH}/{grammar_file}"))
+    accept_state = parser.tables.get_goto(0, parser.compiled.start)
+    assert -1 in parser.conflicts[accept_state, parser.compiled.eof]  # ACCEPT kept with the reduction
+    status, forest = parser.parse_forest(program.split())
+    assert parser.recognize(program.split()) == (n_trees is not None)
+    if n_trees is None:
+        assert (status, forest) == (-1, None)
+        return
+    assert status == 0
+    assert forest.count_trees() == math.inf
+    # trees where no node derives itself
+    trees = list(forest.trees())
+    assert len(trees) == n_trees
+    assert all(leaves(parser, tree) == program.split() for tree in trees)
+    assert parser.parse(program.split()) == (0, forest.first_tree())
+    assert leaves(parser, forest.first_tree()) == program.split()
+
+
+def test_no_deterministic_entry_points():
+    # every driver of SLR_Parser would follow a single action of the conflicted entries
+    parser = GLR_Parser(parse_file(f"{GLR_PATH}/hidden.txt"))
+    assert not isinstance(parser, SLR_Parser)
+    for name in ("push_parser", "parse_with", "parse_recovering", "parse_arena", "from_cache"):
+        assert not hasattr(parser, name)
+    with pytest.raises(TypeError):
+        IncrementalParser(parser)  # type: ignore
+    tokens = list(parser.lexer([("x", "x"), ("b", "b")], [r"\s+"]).tokenize("x b b"))
+    assert parser.parse_tokens(tokens) == parser.parse("x b b".split())
+    assert parser.parse_tokens(tokens)[0] == 0
+
@@ -0,0 +1,80 @@
+import warnings
+import pytest
+from utils.preprocessing import parse_file
+from utils.bitset import iter_bits
+from parsers.SLR import SLR_Parser
+from parsers.LALR import LALR_Parser
+from tests.SLR.test_SLR import CASES, GRAMMAR_PATH
+
+LALR_PATH = "tests/data/grammars/lalr"
+
+# (grammar file, token stream, should be accepted)
+LALR_CASES = [
+    ("pointers.txt", "STAR id EQ id", True),
+    ("pointers.txt", "STAR STAR id", True),
+    ("pointers.txt", "id EQ STAR id", True),
+    ("pointers.txt", "id EQ", False),
+    ("dragon.txt", "b d c", True),
+    ("dragon.txt", "b d a", True),
+    ("dragon.txt", "d a", True),
+    ("dragon.txt", "d c", True),
+    ("dragon.txt", "d d", False),
+    ("nullable.txt", "a c", True),
+    ("nullable.txt", "c", True),
+    ("nullable.txt", "b x x c", True),
+    ("nullable.txt", "d e", True),
+    ("nullable.txt", "d b x e", True),
+    ("nullable.txt", "d c", False),
+]
+
+
+@pytest.mark.parametrize(["filename"], [("pointers.txt",), ("dragon.txt",)])
+def test_not_slr(filename: str):
+    with pytest.warns(UserWarning):
+        try:
+            SLR_Parser(parse_file(f"{LALR_PATH}/{filename}"))
+        except ValueError:  # reduce-reduce conflicts
+            warnings.warn("conflict", UserWarning)
+
+
+@pytest.mark.parametrize(["filename", "program", "accepted"], LALR_CASES)
+def test_parse(filename: str, program: str, accepted: bool):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # no conflicts
+        parser = LALR_Parser(parse_file(f"{LALR_PATH}/{filename}"))
+    status, ast = parser.parse(program.split())
+    assert status == (0 if accepted else -1)
+    if accepted:
+        assert ast.value == parser.grammar.start
+    assert parser.recognize(program.split()) == accepted
+
+
+@pytest.mark.parametrize(["filename", "program", "accepted"], CASES)
+def test_same_language_as_slr(filename: str, program: str, accepted: bool):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        slr = SLR_Parser(parse_file(f"{GRAMMAR_PATH}/{filename}"))
+        lalr = LALR_Parser(parse_file(f"{GRAMMAR_PATH}/{filename}"))
+    assert lalr.parse(program.split()) == slr.parse(program.split())
+    # same LR(0) automaton, lookaheads refine FOLLOW
+    assert lalr.tables.n_states == slr.tables.n_states
+    follow = lalr.compiled.follow_sets()
+    for (state, p), bits in lalr.lalr_lookaheads().items():
+        assert bits & ~follow[lalr.compiled.lhs[p]] == 0
+        assert len(list(iter_bits(bits))) > 0
+
+
+@pytest.mark.parametrize(["compress"], [(False,), (True,)])
+@pytest.mark.parametrize(["program", "accepted"], [
+    ("", True),
+    ("t0 t0 t1 t0 t0", True),
+    ("t0 t0 t1", False),  # a default reduction used to reach the accepting row with a deeper stack
+    ("t0 t0 t1 t0 t0 t1", False),
+])
+def test_start_on_right_side_compressed(compress: bool, program: str, accepted: bool):
+    # V0 -> V2 t1 V2 | (empty), V2 -> V0 t0 t0
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # no reduce-accept conflict from a shared accepting row
+        parser = LALR_Parser(parse_file("tests/data/grammars/accept/nullable_start.txt"), compress=compress)
+    assert parser.parse(program.split())[0] == (0 if accepted else -1)
+    assert parser.recognize(program.split()) == accepted
@@ -0,0 +1,84 @@
+import warnings
+import pytest
+from utils.preprocessing import parse_file
+from parsers.LR0 import LR0_Automaton
+from parsers.LALR import LALR_Parser
+from parsers.LR1 import LR1_Parser, weakly_compatible, main
+from tests.SLR.test_SLR import CASES, GRAMMAR_PATH
+from tests.LALR.test_LALR import LALR_CASES, LALR_PATH
+
+LR1_PATH = "tests/data/grammars/lr1"
+
+
+def test_weak_compatibility():
+    # items 0 and 1 of the same core, lookaheads {c} / {d} vs {d} / {c}
+    assert not weakly_compatible([0b01, 0b10], [0b10, 0b01])
+    assert weakly_compatible([0b01, 0b10], [0b01, 0b10])
+    assert weakly_compatible([0b01, 0b11], [0b10, 0b01])
+
+
+def test_no_mysterious_conflicts():
+    grammar_file = f"{LR1_PATH}/mysterious.txt"
+    with pytest.raises(ValueError):  # reduce-reduce conflict from LALR merging
+        LALR_Parser(parse_file(grammar_file))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        parser = LR1_Parser(parse_file(grammar_file))
+    for program in ("a e c", "a e d", "b e c", "b e d"):
+        status, ast = parser.parse(program.split())
+        assert status == 0
+        assert ast.children[1].value == ("E" if program in ("a e c", "b e d") else "F")
+    assert parser.parse("a e e".split())[0] == -1
+    # the states of e. are not merged: one more state than LR(0)
+    lr0 = LR0_Automaton(parse_file(grammar_file))
+    assert parser.automaton.stats["states"] == lr0.stats["states"] + 1
+
+
+@pytest.mark.parametrize(["filename", "program", "accepted"], LALR_CASES)
+def test_lalr_grammars(filename: str, program: str, accepted: bool):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        lr1 = LR1_Parser(parse_file(f"{LALR_PATH}/{filename}"))
+    lalr = LALR_Parser(parse_file(f"{LALR_PATH}/{filename}"))
+    assert lr1.parse(program.split()) == lalr.parse(program.split())
+    assert lr1.tables.n_states == lalr.tables.n_states
+
+
+@pytest.mark.parametrize(["filename", "program", "accepted"], CASES)
+def test_slr_grammars(filename: str, program: str, accepted: bool):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        parser = LR1_Parser(parse_file(f"{GRAMMAR_PATH}/{filename}"))
+    status, _ = parser.parse(program.split())
+    assert status == (0 if accepted else -1)
+
+
+def test_items_without_lookaheads(capsys):
+    # A -> a . b only occurs before the unproductive U: it is not an LR(1) item, so its
+    # shift on b does not conflict with the reduction of B -> (empty)
+    grammar_file = f"{LR1_PATH}/unproductive.txt"
+    with pytest.warns(UserWarning):
+        LALR_Parser(parse_file(grammar_file))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        parser = LR1_Parser(parse_file(grammar_file))
+    assert parser.recognize("a b".split())
+    assert not parser.recognize("a b z".split())
+    main([grammar_file])
+    assert capsys.readouterr().out.splitlines()[-1].split()[:3] == ["LR(1)", str(parser.tables.n_states), "0"]
+
+
+@pytest.mark.parametrize(["compress"], [(False,), (True,)])
+@pytest.mark.parametrize(["grammar_file", "program", "accepted"], [
+    ("nested_start.txt", "y z x y z", True),
+    ("nested_start.txt", "y z x y", False),
+    ("nullable_start.txt", "t0 t0 t1 t0 t0", True),
+    ("nullable_start.txt", "t0 t0 t1", False),
+])
+def test_start_on_right_side(compress: bool, grammar_file: str, program: str, accepted: bool):
+    # the accepting state (goto of state 0 on the start variable) is never merged with another one
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        parser = LR1_Parser(parse_file(f"tests/data/grammars/accept/{grammar_file}"), compress=compress)
+    assert parser.parse(program.split())[0] == (0 if accepted else -1)
+    assert parser.recognize(program.split()) == accepted
@@ -0,0 +1,188 @@
+import warnings
+import pytest
+from utils.preprocessing import parse_file
+from parsers.LR0 import LR0_Automaton
+from parsers.SLR import SLR_Parser
+from parsers.tables import ERROR, ACCEPT, is_shift, is_reduce
+from utils.AST import iter_preorder
+
+GRAMMAR_PATH = "tests/data/grammars/automaton"
+
+# (grammar file, token stream, should be accepted)
+CASES = [
+    ("g1.txt", "id", True),
+    ("g1.txt", "id PLUS id OPENP id PLUS id CLOSEP", True),
+    ("g1.txt", "id PLUS", False),
+    ("g1.txt", "id id", False),
+    ("g1.txt", "", False),
+    ("g3.txt", "print id print integer", True),
+    ("g3.txt", "while id begin if id then print id + integer end", True),
+    ("g3.txt", "print id zzz", False),
+]
+
+
+def build_parser(filename: str) -> SLR_Parser:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # g3 has a (dangling else) shift-reduce conflict
+        return SLR_Parser(parse_file(f"{GRAMMAR_PATH}/{filename}"))
+
+
+@pytest.mark.parametrize(["filename", "program", "accepted"], CASES)
+def test_parse(filename: str, program: str, accepted: bool):
+    parser = build_parser(filename)
+    status, ast = parser.parse(program.split())
+    assert status == (0 if accepted else -1)
+    if accepted:
+        assert ast.value == parser.grammar.start
+
+
+def test_nested_start_is_not_accepted_early():
+    parser = build_parser("g3.txt")
+    status, ast = parser.parse("print id print integer".split())
+    assert status == 0
+    # P -> S P: the inner P must be a child, not the reason to stop parsing
+    assert [c.value for c in ast.children] == ["S", "P"]
+
+
+@pytest.mark.parametrize(["compress"], [(False,), (True,)])
+@pytest.mark.parametrize(["program", "accepted"], [
+    ("y", True),
+    ("y z x y z", True),
+    ("y z x y", False),  # the inner S used to be accepted with a deeper stack
+    ("y z x y z x y", False),
+])
+def test_start_on_right_side_is_not_accepted_early(compress: bool, program: str, accepted: bool):
+    # S -> A x A | y, A -> S z: the goto of state 0 on S must not be shared with other states
+    parser = SLR_Parser(parse_file("tests/data/grammars/accept/nested_start.txt"), compress=compress)
+    status, ast = parser.parse(program.split())
+    assert status == (0 if accepted else -1)
+    assert parser.recognize(program.split()) == accepted
+    if accepted:
+        assert [node.value for node, _ in iter_preorder(ast) if not node.children] == program.split()
+
+
+def test_tables_match_dict_view():
+    parser = build_parser("g1.txt")
+    tables, compiled = parser.tables, parser.compiled
+    for (state, tok), action in parser.action_table.items():
+        encoded = tables.get_action(state, compiled.ids[tok])
+        if action is None:
+            assert encoded in (ERROR, ACCEPT)
+        elif isinstance(action, int):
+            assert is_shift(encoded) and encoded - 1 == action
+        else:
+            assert is_reduce(encoded)
+
+
+@pytest.mark.parametrize(["filename"], [("g1.txt",), ("g3.txt",)])
+def test_compressed_tables(filename: str):
+    dense = build_parser(filename).tables
+    compressed = dense.compress()
+    for state in range(dense.n_states):
+        for t in range(dense.n_terminals):
+            action = dense.get_action(state, t)
+            if action == ERROR:
+                assert compressed.get_action(state, t) in (ERROR, compressed.action_default[state])
+            else:
+                assert compressed.get_action(state, t) == action
+        for v in range(dense.n_terminals, dense.n_symbols):
+            if dense.get_goto(state, v) != -1:
+                assert compressed.get_goto(state, v) == dense.get_goto(state, v)
+    assert compressed.stats["compressed_bytes"] == compressed.nbytes
+
+
+@pytest.mark.parametrize(["filename", "program", "accepted"], CASES)
+def test_parse_compressed(filename: str, program: str, accepted: bool):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        parser = SLR_Parser(parse_file(f"{GRAMMAR_PATH}/{filename}"), compress=True)
+    dense_parser = build_parser(filename)
+    status, ast = parser.parse(program.split())
+    assert status == (0 if accepted else -1)
+    if accepted:
+        assert ast == dense_parser.parse(program.split())[1]
+
+
+@pytest.mark.parametrize(["filename", "program", "accepted"], CASES)
+def test_push_parser(filename: str, program: str, accepted: bool):
+    parser = build_parser(filename)
+    push = parser.push_parser()
+    for tok in program.split():
+        push.feed(tok)
+    assert push.finish() == parser.parse(program.split())
+    # pull mode consumes generators lazily
+    assert parser.parse(tok for tok in program.split()) == parser.parse(program.split())
+
+
+def test_push_parser_stops_on_error():
+    parser = build_parser("g1.txt")
+    push = parser.push_parser()
+    assert push.feed_many(["id", "PLUS"])
+    assert not push.feed("PLUS")
+    assert push.status == -1 and push.position == 2
+    assert not push.feed("id")
+    assert push.finish()[0] == -1
+
+
+@pytest.mark.parametrize(["filename", "program", "accepted"], CASES)
+def test_recognize(filename: str, program: str, accepted: bool):
+    parser = build_parser(filename)
+    assert parser.recognize(program.split()) == accepted
+    assert parser.recognize(tok for tok in program.split()) == accepted
+
+
+def test_semantic_actions():
+    parser = build_parser("g1.txt")
+    # counts the ids, P -> E defaults to $$ = $1
+    actions = {
+        "T -> id": lambda tok: 1,
+        ("T", ("id", "OPENP", "E", "CLOSEP")): lambda tok, _, e, __: 1 + e,
+        "E -> E PLUS T": lambda e, _, t: e + t,
+        "E": lambda t: t,
+    }
+    assert parser.parse_with("id PLUS id OPENP id PLUS id CLOSEP".split(), actions) == (0, 4)
+    assert parser.parse_with("id PLUS".split(), actions) == (-1, None)
+    with pytest.raises(ValueError):
+        parser.semantic_reducers({"E -> E E": lambda e, f: e})
+
+
+def test_semantic_visitor():
+    class Printer:
+        def E(self, *values):
+            return " ".join(values)
+
+        def T(self, *values):
+            return "".join(values)
+
+    parser = build_parser("g1.txt")
+    assert parser.parse_with("id OPENP id PLUS id CLOSEP PLUS id".split(), Printer()) == (0, "idOPENPid PLUS idCLOSEP PLUS id")
+
+
+@pytest.mark.parametrize(["filename", "program", "accepted"], CASES)
+def test_parse_arena(filename: str, program: str, accepted: bool):
+    parser = build_parser(filename)
+    status, root = parser.parse_arena(program.split())
+    expected_status, expected = parser.parse(program.split())
+    assert status == expected_status
+    assert root == expected and expected == root
+    assert str(root) == str(expected) and repr(root) == repr(expected)
+    assert root.to_ast() == expected
+
+
+def test_parse_arena_deep_tree():
+    parser = build_parser("g1.txt")
+    n = 20000  # far beyond the recursion limit
+    status, root = parser.parse_arena(" PLUS ".join(["id"] * n).split())
+    assert status == 0
+    assert root == root.to_ast()
+    assert sum(1 for _ in iter_preorder(root)) == len(root.arena)
+    leaves = [node for node, _ in iter_preorder(root) if len(node.children) == 0]
+    assert [leaf.token_index for leaf in leaves] == list(range(2 * n - 1))
+
+
+def test_given_automaton():
+    grammar = parse_file(f"{GRAMMAR_PATH}/g1.txt")
+    automaton = LR0_Automaton(grammar)
+    parser = SLR_Parser(grammar, automaton=automaton)
+    assert parser.automaton is automaton
+    assert list(parser.tables.action) == list(build_parser("g1.txt").tables.action)
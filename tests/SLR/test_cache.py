@@ -0,0 +1,112 @@
+import os
+import json
+import zlib
+import mmap
+from utils.preprocessing import parse_file
+from parsers.SLR import SLR_Parser
+from parsers.cache import MAGIC, _PREFIX, load_tables
+
+GRAMMAR_FILE = "tests/data/grammars/ast_no_lexer/g1.txt"
+PROGRAM = "INTEGER ID ( ) = { ID : BOOLEAN = ID ( ID + NUMBER ) }".split()
+
+
+def cache_files(cache_dir) -> list:
+    return sorted(os.listdir(cache_dir))
+
+
+def test_cache_roundtrip(tmp_path):
+    built = SLR_Parser.from_cache(parse_file(GRAMMAR_FILE), cache_dir=str(tmp_path))
+    assert len(cache_files(tmp_path)) == 1
+    loaded = SLR_Parser.from_cache(parse_file(GRAMMAR_FILE), cache_dir=str(tmp_path))
+    # tables came from the file: no automaton was needed
+    assert loaded._automaton is None
+    assert list(loaded.tables.action) == list(built.tables.action)
+    assert list(loaded.tables.goto) == list(built.tables.goto)
+    assert loaded.parse(PROGRAM) == built.parse(PROGRAM)
+    assert loaded.parse(PROGRAM)[0] == 0
+
+
+def test_corrupted_cache_is_rebuilt(tmp_path):
+    SLR_Parser.from_cache(parse_file(GRAMMAR_FILE), cache_dir=str(tmp_path))
+    path = os.path.join(tmp_path, cache_files(tmp_path)[0])
+    with open(path, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 0xFF]))
+
+    parser = SLR_Parser.from_cache(parse_file(GRAMMAR_FILE), cache_dir=str(tmp_path))
+    assert parser._automaton is not None  # rebuilt
+    assert parser.parse(PROGRAM)[0] == 0
+    assert SLR_Parser.from_cache(parse_file(GRAMMAR_FILE), cache_dir=str(tmp_path))._automaton is None
+
+
+def test_stale_cache_is_rebuilt(tmp_path):
+    SLR_Parser.from_cache(parse_file(GRAMMAR_FILE), cache_dir=str(tmp_path))
+    path = os.path.join(tmp_path, cache_files(tmp_path)[0])
+    with open(path, "r+b") as f:
+        f.seek(len(MAGIC))
+        f.write(b"\xff\xff\xff\xff")  # unknown format version
+    parser = SLR_Parser.from_cache(parse_file(GRAMMAR_FILE), cache_dir=str(tmp_path))
+    assert parser._automaton is not None
+    assert parser.parse(PROGRAM)[0] == 0
+
+
+def test_different_grammars_do_not_collide(tmp_path):
+    SLR_Parser.from_cache(parse_file(GRAMMAR_FILE), cache_dir=str(tmp_path))
+    SLR_Parser.from_cache(parse_file("tests/data/grammars/automaton/g1.txt"), cache_dir=str(tmp_path))
+    assert len(cache_files(tmp_path)) == 2
+
+
+def test_rejected_cache_is_unmapped(tmp_path, monkeypatch):
+    mappings = []
+
+    class TrackedMap(mmap.mmap):
+        def __init__(self, *args, **kwargs):
+            mappings.append(self)
+
+    monkeypatch.setattr(mmap, "mmap", TrackedMap)
+    SLR_Parser.from_cache(parse_file(GRAMMAR_FILE), cache_dir=str(tmp_path))
+    path = os.path.join(tmp_path, cache_files(tmp_path)[0])
+    kind, fingerprint = os.path.splitext(cache_files(tmp_path)[0])[0].split("-", 1)
+    loaded = SLR_Parser.from_cache(parse_file(GRAMMAR_FILE), cache_dir=str(tmp_path))
+    assert mappings and loaded.tables.buffer is mappings[0] and not mappings[0].closed
+
+    assert load_tables(path, "another fingerprint", kind) is None
+    with open(path, "r+b") as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 0xFF]))
+    assert load_tables(path, fingerprint, kind) is None  # bad checksum
+    with open(path, "r+b") as f:
+        f.write(b"NOTABLES")
+    assert load_tables(path, fingerprint, kind) is None
+    assert len(mappings) == 4
+    assert all(m.closed for m in mappings[1:])
+
+
+
+def test_corrupted_header_is_rejected(tmp_path):
+    SLR_Parser.from_cache(parse_file(GRAMMAR_FILE), cache_dir=str(tmp_path))
+    path = os.path.join(tmp_path, cache_files(tmp_path)[0])
+    kind, fingerprint = os.path.splitext(cache_files(tmp_path)[0])[0].split("-", 1)
+    with open(path, "rb") as f:
+        data = f.read()
+    prefix_end = len(MAGIC) + _PREFIX.size
+    version, header_size, _ = _PREFIX.unpack(data[len(MAGIC):prefix_end])
+    header = data[prefix_end:prefix_end + header_size]
+    n_states = json.loads(header)["n_states"]
+    # same length, so the header still parses and the payload stays in place
+    bad_header = header.replace(f'"n_states": {n_states},'.encode(), f'"n_states": {n_states - 1:{len(str(n_states))}d},'.encode())
+    assert bad_header != header and len(bad_header) == len(header)
+    payload = data[prefix_end + header_size:]
+
+    for crc in (zlib.crc32(payload, zlib.crc32(header)), zlib.crc32(payload, zlib.crc32(bad_header))):
+        with open(path, "wb") as f:
+            f.write(MAGIC + _PREFIX.pack(version, header_size, crc) + bad_header + payload)
+        assert load_tables(path, fingerprint, kind) is None  # bad checksum, then dimensions that do not match
+
+    parser = SLR_Parser.from_cache(parse_file(GRAMMAR_FILE), cache_dir=str(tmp_path))
+    assert parser._automaton is not None  # rebuilt
+    assert parser.parse(PROGRAM)[0] == 0
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+import pytest
+from utils.preprocessing import parse_file
+from parsers.SLR import SLR_Parser
+from parsers.generator import main
+
+GRAMMAR_FILE = "tests/data/grammars/ast_no_lexer/g1.txt"
+PROGRAMS = [
+    "INTEGER ID ( ) = { ID : BOOLEAN = ID ( ID + NUMBER ) }",
+    "ID : INTEGER = ( NUMBER * ID )",
+    "ID : INTEGER = ( NUMBER * )",
+    "",
+]
+
+# run from the output directory, so that nothing from this repository can be imported
+CHECK_SCRIPT = """
+import sys
+import parsetab
+for program in sys.argv[1:]:
+    status, tree = parsetab.parse(program.split())
+    print(status, repr(tree))
+assert not any(m.split('.')[0] in ('parsers', 'grammar', 'utils') for m in sys.modules)
+"""
+
+
+@pytest.mark.parametrize(["compress"], [(False,), (True,)])
+def test_generated_module(tmp_path, compress: bool):
+    output = os.path.join(tmp_path, "parsetab.py")
+    main([GRAMMAR_FILE, "-o", output] + (["--compress"] if compress else []))
+    result = subprocess.run([sys.executable, "-c", CHECK_SCRIPT] + PROGRAMS,
+                            cwd=tmp_path, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+    parser = SLR_Parser(parse_file(GRAMMAR_FILE))
+    for program, line in zip(PROGRAMS, result.stdout.splitlines()):
+        status, tree = parser.parse(program.split())
+        assert int(line.split()[0]) == status
+        if status == 0:
+            assert line == f"{status} {tree!r}"
+
+
+@pytest.mark.parametrize(["compress"], [(False,), (True,)])
+def test_generated_module_nonassoc(tmp_path, compress: bool):
+    output = os.path.join(tmp_path, "parsetab.py")
+    main(["tests/data/grammars/precedence/expr.txt", "-o", output] + (["--compress"] if compress else []))
+    result = subprocess.run([sys.executable, "-c", CHECK_SCRIPT, "num LT num", "num LT num LT num"],
+                            cwd=tmp_path, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert [line.split()[0] for line in result.stdout.splitlines()] == ["0", "-1"]
+
+
+@pytest.mark.parametrize(["compress"], [(False,), (True,)])
+def test_generated_module_start_on_right_side(tmp_path, compress: bool):
+    # S -> A x A | y, A -> S z: the generated tables only accept with the start state below S
+    output = os.path.join(tmp_path, "parsetab.py")
+    main(["tests/data/grammars/accept/nested_start.txt", "-o", output] + (["--compress"] if compress else []))
+    result = subprocess.run([sys.executable, "-c", CHECK_SCRIPT, "y z x y z", "y z x y", "y z"],
+                            cwd=tmp_path, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert [line.split()[0] for line in result.stdout.splitlines()] == ["0", "-1", "-1"]
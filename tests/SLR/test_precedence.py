@@ -0,0 +1,55 @@
+import operator
+import warnings
+import pytest
+from utils.preprocessing import parse_file
+from parsers.SLR import SLR_Parser
+from parsers.LALR import LALR_Parser
+from parsers.LR1 import LR1_Parser
+
+GRAMMAR_FILE = "tests/data/grammars/precedence/expr.txt"
+RULES = [("num", "[0-9]+"), ("PLUS", r"\+"), ("MINUS", "-"), ("TIMES", r"\*"), ("POW", r"\^"),
+         ("LT", "<"), ("OPENP", r"\("), ("CLOSEP", r"\)")]
+ACTIONS = {
+    "E -> E PLUS E": lambda a, _, b: a + b,
+    "E -> E MINUS E": lambda a, _, b: a - b,
+    "E -> E TIMES E": lambda a, _, b: a * b,
+    "E -> E POW E": lambda a, _, b: a ** b,
+    "E -> E LT E": lambda a, _, b: operator.lt(a, b),
+    "E -> MINUS E": lambda _, a: -a,
+    "E -> OPENP E CLOSEP": lambda _, a, __: a,
+    "E -> num": int,
+}
+
+
+@pytest.mark.parametrize(["compress"], [(False,), (True,)])
+@pytest.mark.parametrize(["kind"], [(SLR_Parser,), (LALR_Parser,), (LR1_Parser,)])
+@pytest.mark.parametrize(["program", "value"], [
+    ("2 - 3 - 4", -5),  # left associative
+    ("2 ^ 3 ^ 2", 512),  # right associative
+    ("2 + 3 * 4 - 1", 13),
+    ("- 2 ^ 2", 4),  # %prec UMINUS
+    ("(2 + 3) * 4", 20),
+    ("1 + 1 < 3", True),
+    ("1 < 2 < 3", None),  # nonassoc
+    ("1 < 2 < 3 + 4", None),
+])
+def test_precedence(kind, compress: bool, program: str, value):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # every conflict is resolved silently
+        parser = kind(parse_file(GRAMMAR_FILE), compress=compress)
+    lexer = parser.lexer(RULES, [r"\s+"])
+    status, result = parser.parse_tokens(lexer.tokenize(program), ACTIONS)
+    assert (status, result) == ((0, value) if value is not None else (-1, None))
+    # the nonassoc errors survive default reductions in compressed tables
+    assert parser.recognize(parser.compiled.names[token.type] for token in lexer.tokenize(program)) == (value is not None)
+
+
+def test_precedence_in_fingerprint():
+    with_precedence = parse_file(GRAMMAR_FILE).compile()
+    grammar = parse_file(GRAMMAR_FILE)
+    grammar.precedence = []
+    grammar.production_precedence = dict()
+    without_precedence = grammar.compile()
+    assert with_precedence.fingerprint() != without_precedence.fingerprint()
+    with pytest.warns(UserWarning):
+        SLR_Parser(grammar)
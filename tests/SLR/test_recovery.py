@@ -0,0 +1,67 @@
+import pytest
+from utils.preprocessing import parse_file
+from utils.AST import iter_preorder
+from parsers.SLR import SLR_Parser
+from parsers.LALR import LALR_Parser
+from parsers.LR1 import LR1_Parser
+
+STATEMENTS = "tests/data/grammars/recovery/stmts.txt"
+EXPRESSIONS = "tests/data/grammars/lexer/expr.txt"
+PARSERS = [(SLR_Parser, False), (LALR_Parser, False), (LR1_Parser, False), (SLR_Parser, True)]
+
+
+@pytest.mark.parametrize(["kind", "compress"], PARSERS)
+def test_error_productions(kind, compress: bool):
+    parser = kind(parse_file(STATEMENTS), compress=compress)
+    program = "id EQ id PLUS SEMI id EQ num SEMI id id EQ num SEMI id EQ OPENP num SEMI id EQ num SEMI"
+    status, tree, errors = parser.parse_recovering(program.split())
+    assert status == -1
+    assert [(e.position, e.token[1]) for e in errors] == [(4, "SEMI"), (10, "id"), (18, "SEMI")]
+    assert set(errors[0].expected) == {"id", "num", "OPENP"}
+    assert errors[1].expected == ("EQ",)
+    # every statement is in the tree, the three wrong ones through S -> error SEMI
+    statements = [node for node, _ in iter_preorder(tree) if node.value == "S"]
+    assert tree.value == "P"
+    assert [s.children[0].value for s in statements] == [-1, "id", -1, -1, "id"]
+
+    # a correct program is not affected
+    assert parser.parse_recovering("id EQ num SEMI".split())[::2] == (0, [])
+    # EOF can not be discarded
+    status, tree, errors = parser.parse_recovering("id EQ num".split())
+    assert (status, tree.value, len(errors)) == (-1, -1, 1)
+    assert errors[0].token[1] == "$"
+
+
+@pytest.mark.parametrize(["kind", "compress"], PARSERS)
+def test_panic_mode(kind, compress: bool):
+    parser = kind(parse_file(EXPRESSIONS), compress=compress)
+    status, tree, errors = parser.parse_recovering("id PLUS PLUS num TIMES TIMES id".split())
+    assert status == -1
+    assert [(e.position, e.token[1]) for e in errors] == [(2, "PLUS"), (5, "TIMES")]
+    assert parser.parse(["id", "PLUS", "num", "TIMES", "id"])[1] == tree
+
+    # unknown tokens are reported and skipped too
+    status, tree, errors = parser.parse_recovering("id PLUS ? num".split())
+    assert [(e.position, e.token[1]) for e in errors] == [(2, "?")]
+    assert parser.parse(["id", "PLUS", "num"])[1] == tree
+
+
+def test_recovery_with_lexer():
+    parser = SLR_Parser(parse_file(STATEMENTS))
+    lexer = parser.lexer([("id", "[a-z]+"), ("num", "[0-9]+"), ("EQ", "="), ("PLUS", r"\+"), ("SEMI", ";"),
+                          ("OPENP", r"\("), ("CLOSEP", r"\)")], [r"\s+"])
+    push_parser = parser.push_parser(recover=True)
+    push_parser.feed_tokens(lexer.tokenize("a = 1;\nb = (2 + ;\nc = 3;\nd 4;\n"))
+    status, _ = push_parser.finish()
+    assert status == -1
+    assert [(e.token.line, e.token.column, e.token.text) for e in push_parser.errors] == [(2, 10, ";"), (4, 3, "4")]
+
+
+def test_expected_terminals():
+    parser = SLR_Parser(parse_file(EXPRESSIONS))
+    tables, compiled = parser.tables, parser.compiled
+    expected = tables.expected_terminals()
+    assert len(expected) == tables.n_states
+    names = {compiled.names[t] for t in range(compiled.n_terminals) if expected[0] >> t & 1}
+    assert names == {"let", "id", "num", "OPENP"}
+    assert tables.compress().expected_terminals() == expected
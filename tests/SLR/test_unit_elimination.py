@@ -0,0 +1,66 @@
+import pytest
+from utils.preprocessing import parse_file
+from parsers.SLR import SLR_Parser
+from parsers.LALR import LALR_Parser
+from parsers.LR1 import LR1_Parser
+from parsers.driver import PushParser
+
+PARSERS = [(SLR_Parser,), (LALR_Parser,), (LR1_Parser,)]
+CASES = [
+    ("tests/data/grammars/lexer/expr.txt", "let id EQ id PLUS num TIMES OPENP id PLUS num CLOSEP in id", {"T -> F"}),
+    ("tests/data/grammars/units/chain.txt", "OPENP x comma x CLOSEP comma x", {"A -> B", "B -> C"}),
+]
+
+
+def count_reductions(parser: SLR_Parser, tokens) -> int:
+    count = [0]
+
+    def reducer(values):
+        count[0] += 1
+    push_parser = PushParser(parser.tables, parser.compiled.ids, [reducer] * parser.compiled.n_productions)
+    push_parser.feed_many(tokens)
+    assert push_parser.finish()[0] == 0
+    return count[0]
+
+
+@pytest.mark.parametrize(["kind"], PARSERS)
+@pytest.mark.parametrize(["grammar_file", "program", "eliminated"], CASES)
+def test_unit_elimination(kind, grammar_file: str, program: str, eliminated):
+    parser = kind(parse_file(grammar_file))
+    optimized = kind(parse_file(grammar_file), eliminate_units=True)
+    assert {optimized.compiled.production_str(p) for p in optimized.eliminated_units} == eliminated
+
+    tokens = program.split()
+    status, tree = parser.parse(tokens)
+    optimized_status, optimized_tree = optimized.parse(tokens)
+    assert status == optimized_status == 0
+    assert optimized_tree != tree
+    assert optimized.full_tree(optimized_tree) == tree
+    assert optimized.full_tree(optimized.parse_arena(tokens)[1]) == tree
+    assert count_reductions(optimized, tokens) < count_reductions(parser, tokens)
+
+    # same language
+    for wrong in (tokens[:-1], tokens + tokens[-1:], tokens[1:]):
+        assert parser.recognize(wrong) == optimized.recognize(wrong)
+
+
+@pytest.mark.parametrize(["kind"], PARSERS)
+@pytest.mark.parametrize(["grammar_file", "eliminated"], [
+    ("tests/data/grammars/units/prec_left.txt", {"T -> F"}),  # the shift on PLUS lost to T -> F
+    ("tests/data/grammars/units/prec_nonassoc.txt", set()),  # PLUS is an explicit error after F
+])
+def test_unit_elimination_precedence(kind, grammar_file: str, eliminated):
+    parser = kind(parse_file(grammar_file))
+    optimized = kind(parse_file(grammar_file), eliminate_units=True)
+    assert {optimized.compiled.production_str(p) for p in optimized.eliminated_units} == eliminated
+    for program in ("id", "id PLUS id", "id PLUS id PLUS id", "id PLUS"):
+        assert parser.recognize(program.split()) == optimized.recognize(program.split())
+
+
+def test_unit_elimination_cache(tmp_path):
+    grammar_file, program, _ = CASES[1]
+    expected = SLR_Parser(parse_file(grammar_file)).parse(program.split())
+    for _ in range(2):  # built, then loaded
+        parser = SLR_Parser.from_cache(parse_file(grammar_file), str(tmp_path), eliminate_units=True, compress=True)
+        status, tree = parser.parse(program.split())
+        assert (status, parser.full_tree(tree)) == expected
@@ -0,0 +1,53 @@
+import copy
+import json
+import warnings
+import pytest
+from benchmarks.generators import default_workloads, expression_tower, statement_list, nullable_sequence, large_vocabulary
+from benchmarks.runner import PHASES, THROUGHPUTS, run, save, load, compare
+from benchmarks.__main__ import main
+from parsers.SLR import SLR_Parser
+
+WORKLOADS = [expression_tower(6), statement_list(3), nullable_sequence(5), large_vocabulary(50)]
+
+
+@pytest.mark.parametrize(["workload"], [(w,) for w in WORKLOADS])
+@pytest.mark.parametrize(["n_tokens"], [(1,), (100,), (2000,)])
+def test_generated_inputs(workload, n_tokens: int):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # no conflict
+        parser = SLR_Parser(workload.grammar())
+    tokens = list(workload.tokens(n_tokens, 1))
+    assert len(tokens) >= n_tokens
+    assert parser.recognize(tokens)
+    assert tokens == list(workload.tokens(n_tokens, 1))  # reproducible
+
+
+def test_run_and_compare(tmp_path):
+    results = run(default_workloads(), 200, repeat=1)
+    assert set(results["workloads"]) == {w.name for w in default_workloads()}
+    for metrics in results["workloads"].values():
+        assert set(metrics) == set(PHASES) | set(THROUGHPUTS)
+    path = str(tmp_path / "results.json")
+    save(results, path)
+    assert load(path) == json.loads(json.dumps(results))
+    assert compare(results, results) == []
+
+    name = next(iter(results["workloads"]))
+    slower = copy.deepcopy(results)
+    slower["workloads"][name]["automaton"] = 1.0
+    slower["workloads"][name]["parse"] /= 2
+    regressions = compare(slower, results)
+    assert len(regressions) == 2
+    assert all(r.startswith(name) for r in regressions)
+    assert compare(results, slower) == []
+
+
+def test_main(tmp_path, capsys):
+    path = str(tmp_path / "baseline.json")
+    assert main(["--tokens", "100", "--repeat", "1", "--output", path]) == 0
+    baseline = load(path)
+    for metrics in baseline["workloads"].values():
+        metrics["parse"] = metrics["recognize"] = float("inf")
+    save(baseline, path)
+    assert main(["--tokens", "100", "--repeat", "1", "--baseline", path]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
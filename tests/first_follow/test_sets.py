@@ -0,0 +1,100 @@
+import typing as T
+import os
+import pytest
+from grammar import Grammar
+from utils.preprocessing import parse_file
+
+GRAMMAR_PATHS = [
+    "tests/data/grammars/automaton",
+    "tests/data/grammars/ast_no_lexer",
+    "tests/data/grammars/first_follow",
+]
+GRAMMAR_FILES = [os.path.join(path, f) for path in GRAMMAR_PATHS for f in sorted(os.listdir(path))]
+
+
+def naive_first(G: Grammar) -> T.Dict[str, T.Set[str]]:
+    """
+        Textbook fixed point, kept deliberately simple to serve as an oracle.
+    """
+    first: T.Dict[str, T.Set[str]] = {'': {''}}
+    for t in G.terminals:
+        first[t] = {t}
+    for A in G.vars:
+        first[A] = set()
+    converged = False
+    while (not converged):
+        converged = True
+        for A, possible_targets in G.grammar.items():
+            for word in possible_targets:
+                new_first = set(first[A])
+                for symb in word:
+                    new_first.update(first[symb] - {''})
+                    if ('' not in first[symb]):
+                        break
+                else:
+                    new_first.add('')
+                if (new_first != first[A]):
+                    first[A] = new_first
+                    converged = False
+    return first
+
+
+def naive_follow(G: Grammar, first: T.Dict[str, T.Set[str]]) -> T.Dict[str, T.Set[str]]:
+    follow: T.Dict[str, T.Set[str]] = {A: set() for A in G.vars}
+    follow[G.start].add(G.eof_symbol)
+    converged = False
+    while (not converged):
+        converged = True
+        for A, possible_targets in G.grammar.items():
+            for word in possible_targets:
+                for i, symb in enumerate(word):
+                    if (symb not in G.vars):
+                        continue
+                    first_suffix = Grammar.first_fromword(word[i + 1:], first)
+                    new_follow = follow[symb] | (first_suffix - {''})
+                    if ('' in first_suffix):
+                        new_follow |= follow[A]
+                    if (new_follow != follow[symb]):
+                        follow[symb] = new_follow
+                        converged = False
+    return follow
+
+
+@pytest.mark.parametrize(["filepath"], [(f,) for f in GRAMMAR_FILES])
+def test_first(filepath: str):
+    G = parse_file(filepath)
+    assert G.first() == naive_first(G)
+
+
+def test_first_nullable():
+    G = parse_file("tests/data/grammars/first_follow/g1.txt")
+    first = G.first()
+    assert G.nullable() == {'S', 'A', 'B', 'C'}
+    assert first['S'] == {'a', 'b', 'c', 'e', 'd', ''}
+    assert first['A'] == {'a', 'b', 'e', ''}
+    assert first['C'] == {'a', 'b', 'e', ''}
+
+
+@pytest.mark.parametrize(["filepath"], [(f,) for f in GRAMMAR_FILES])
+def test_follow(filepath: str):
+    G = parse_file(filepath)
+    first = G.first()
+    assert G.follow(first) == naive_follow(G, first)
+
+
+def test_follow_nullable():
+    G = parse_file("tests/data/grammars/first_follow/g1.txt")
+    follow = G.follow(G.first())
+    assert follow['S'] == {'$', 'd'}
+    assert follow['C'] == {'a', 'b', 'c', 'd', 'e'}
+
+
+@pytest.mark.parametrize(["filepath"], [(f,) for f in GRAMMAR_FILES])
+def test_bitset_view(filepath: str):
+    G = parse_file(filepath)
+    first = G.first(bitset=True)
+    assert first == G.first()
+    assert G.follow(first, bitset=True) == G.follow(G.first())
+    # the view of the compiled FIRST sets is used as is, without encoding it again
+    assert first is G.first(bitset=True)
+    assert G.follow(first, bitset=True).rows is G.compile().follow_sets()
@@ -0,0 +1,81 @@
+import random
+import pytest
+from utils.preprocessing import parse_file
+from parsers.SLR import SLR_Parser
+from parsers.LALR import LALR_Parser
+from parsers.LR1 import LR1_Parser
+from parsers.incremental import IncrementalParser
+
+GRAMMAR_FILE = "tests/data/grammars/lexer/expr.txt"
+ATOMS = ["id", "num", "OPENP id PLUS num CLOSEP"]
+EDITS = ["", "id", "PLUS", "TIMES num", "OPENP", "CLOSEP", "num PLUS id"]
+
+
+def make_tokens(parser: SLR_Parser, program: str):
+    return [(parser.compiled.ids[name], name) for name in program.split()]
+
+
+def make_program(rng: random.Random, n_terms: int) -> str:
+    return " PLUS ".join(" TIMES ".join(rng.choice(ATOMS) for _ in range(3)) for _ in range(n_terms))
+
+
+@pytest.mark.parametrize(["kind"], [(SLR_Parser,), (LALR_Parser,), (LR1_Parser,)])
+def test_random_edits(kind):
+    parser = kind(parse_file(GRAMMAR_FILE))
+    rng = random.Random(0)
+    incremental = IncrementalParser(parser, make_tokens(parser, make_program(rng, 20)))
+    for _ in range(100):
+        n = len(incremental.tokens)
+        start = rng.randrange(n + 1)
+        end = min(n, start + rng.randrange(3))
+        status, tree = incremental.edit(start, end, make_tokens(parser, rng.choice(EDITS)))
+        expected_status, expected_tree = parser.parse([tok[1] for tok in incremental.tokens])
+        assert status == expected_status
+        if status == 0:
+            assert tree == expected_tree
+
+
+def test_reparse_cost():
+    parser = SLR_Parser(parse_file(GRAMMAR_FILE))
+    tokens = make_tokens(parser, make_program(random.Random(1), 300))
+    incremental = IncrementalParser(parser, tokens)
+    full = incremental.stats["shifted"] + incremental.stats["reduced"]
+    assert incremental.stats["shifted"] == len(tokens)
+
+    # near the end: only the last term is parsed again
+    last = max(i for i, tok in enumerate(tokens) if tok[1] in ("id", "num"))
+    assert incremental.edit(last, last + 1, make_tokens(parser, "OPENP num CLOSEP"))[0] == 0
+    assert incremental.stats["shifted"] + incremental.stats["reduced"] < 20
+
+    # in the middle: each term after the edit is reused (only the spine E -> E PLUS T is rebuilt)
+    middle = len(tokens) // 2
+    while incremental.tokens[middle][1] != "id":
+        middle += 1
+    assert incremental.edit(middle, middle + 1, make_tokens(parser, "num"))[0] == 0
+    assert incremental.stats["reused"] > 100
+    assert incremental.stats["shifted"] + incremental.stats["reduced"] < full / 5
+    assert incremental.tree == parser.parse([tok[1] for tok in incremental.tokens])[1]
+
+
+def test_syntax_errors():
+    parser = SLR_Parser(parse_file(GRAMMAR_FILE))
+    incremental = IncrementalParser(parser, make_tokens(parser, "id PLUS num"))
+    assert incremental.edit(1, 2, make_tokens(parser, "TIMES TIMES")) == parser.parse("id TIMES TIMES num".split())
+    assert incremental.tree is None
+    status, tree = incremental.edit(1, 3, make_tokens(parser, "TIMES"))
+    assert (status, tree) == parser.parse("id TIMES num".split())
+    with pytest.raises(ValueError):
+        incremental.edit(2, 5, [])
+
+
+@pytest.mark.parametrize(["kind"], [(SLR_Parser,), (LALR_Parser,), (LR1_Parser,)])
+def test_start_on_right_side(kind):
+    # S -> A x A | y, A -> S z: the reused inner S must not be accepted as the whole input
+    parser = kind(parse_file("tests/data/grammars/accept/nested_start.txt"))
+    incremental = IncrementalParser(parser, make_tokens(parser, "y z x y z"))
+    assert incremental.status == 0
+    for start, end, edit, accepted in [(4, 5, "", False), (4, 4, "z", True), (5, 5, "z x y z", True),
+                                       (0, 0, "y z x", False), (0, 3, "", True)]:
+        status, tree = incremental.edit(start, end, make_tokens(parser, edit))
+        assert status == (0 if accepted else -1)
+        assert (status, tree) == parser.parse([tok[1] for tok in incremental.tokens])
@@ -0,0 +1,60 @@
+import pytest
+from utils.preprocessing import parse_file, parse_lexer_file
+from utils.lexer import Lexer
+from parsers.SLR import SLR_Parser
+
+GRAMMAR_FILE = "tests/data/grammars/lexer/expr.txt"
+LEXER_FILE = "tests/data/grammars/lexer/expr.lex"
+PROGRAM_FILE = "tests/data/programs/lexer/expr.txt"
+
+
+def build():
+    parser = SLR_Parser(parse_file(GRAMMAR_FILE))
+    rules, ignore = parse_lexer_file(LEXER_FILE)
+    return parser, parser.lexer(rules, ignore)
+
+
+def test_longest_match_and_priority():
+    ids = {"if": 1, "id": 2}
+    lexer = Lexer([("if", "if"), ("id", "[a-z]+")], ids, ignore=[r"\s+"])
+    tokens = list(lexer.tokenize("if iffy\n  if"))
+    assert [(tok.type, tok.text) for tok in tokens] == [(1, "if"), (2, "iffy"), (1, "if")]
+    assert [(tok.line, tok.column, tok.offset) for tok in tokens] == [(1, 1, 0), (1, 4, 3), (2, 3, 10)]
+
+
+def test_lexer_errors():
+    with pytest.raises(ValueError):
+        Lexer([("x", "x")], {"y": 1})
+    with pytest.raises(ValueError):
+        Lexer([("x", "(x)")], {"x": 1})
+    lexer = Lexer([("x", "x")], {"x": 1})
+    with pytest.raises(ValueError, match="line 1, column 3"):
+        list(lexer.tokenize("xx?"))
+
+
+def test_tokenize_file():
+    parser, lexer = build()
+    with open(PROGRAM_FILE) as f:
+        text = f.read()
+    from_file = list(lexer.tokenize_file(PROGRAM_FILE))
+    assert from_file == list(lexer.tokenize(text))  # the program is ASCII
+    assert [parser.compiled.names[tok.type] for tok in from_file[:4]] == ["let", "id", "EQ", "num"]
+    assert (from_file[-1].text, from_file[-1].line) == ("10", 3)
+
+
+def test_parse_tokens():
+    parser, lexer = build()
+    status, ast = parser.parse_tokens(lexer.tokenize_file(PROGRAM_FILE))
+    assert status == 0 and ast.value == "S"
+    assert [c.value for c in ast.children][:4] == ["let", "x", "=", "E"]
+
+    actions = {
+        "S -> let id EQ E in S": lambda _, name, __, value, ___, body: body.replace(name, str(value)),
+        "S -> E": lambda e: e,
+        "E -> E PLUS T": lambda e, _, t: f"({e} + {t})",
+        "T -> T TIMES F": lambda t, _, f: f"({t} * {f})",
+        "F -> OPENP E CLOSEP": lambda _, e, __: e,
+    }
+    status, value = parser.parse_tokens(lexer.tokenize("let a = 1 + 2 in a * b"), actions)
+    assert (status, value) == (0, "((1 + 2) * b)")
+    assert parser.parse_tokens(lexer.tokenize("1 + * 2"))[0] == -1
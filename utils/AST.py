@@ -1,4 +1,118 @@
 import typing as T
+import io
+
+
+class TreeLike(T.Protocol):
+    """
+        Anything shaped like an AST node (AST, utils.arena.AST_View, ...).
+    """
+    value: T.Any
+
+    @property
+    def children(self) -> T.Sequence["TreeLike"]:
+        ...
+
+
+def iter_preorder(root: TreeLike) -> T.Iterator[T.Tuple[TreeLike, int]]:
+    """
+        Nodes (with their depth) in preorder, without recursion.
+    """
+    stack = [(root, 0)]
+    while (stack):
+        node, depth = stack.pop()
+        yield node, depth
+        stack.extend((c, depth + 1) for c in reversed(node.children))
+
+
+def trees_equal(a: TreeLike, b: TreeLike) -> bool:
+    """
+        Structural equality (values and children), without recursion.
+    """
+    stack = [(a, b)]
+    while (stack):
+        x, y = stack.pop()
+        if x is y:
+            continue
+        if x.value != y.value:
+            return False
+        x_children, y_children = x.children, y.children
+        if len(x_children) != len(y_children):
+            return False
+        stack.extend(zip(x_children, y_children))
+    return True
+
+
+def tree_repr(root: TreeLike) -> str:
+    """
+        Bracketed representation [value, child_1, ..., child_n] ([value] for leaves), without recursion.
+    """
+    parts: T.List[str] = []
+    stack: T.List[T.Union[TreeLike, str]] = [root]
+    while (stack):
+        top = stack.pop()
+        if isinstance(top, str):
+            parts.append(top)
+            continue
+        children = top.children
+        parts.append(f"[{top.value}")
+        stack.append("]")
+        for c in reversed(children):
+            stack.append(c)
+            stack.append(", ")
+    return "".join(parts)
+
+
+def iter_lines(root: TreeLike) -> T.Iterator[str]:
+    """
+        Lines of the pretty-printed tree (see AST.__str__), without recursion.
+    """
+    stack = [(root, "")]
+    while (stack):
+        node, prefix = stack.pop()
+        value = str(node.value)
+        yield prefix + value
+        spacing = len(prefix) * " " + "└──" + "─" * max(len(value) - 3, 0)
+        stack.extend((c, spacing) for c in reversed(node.children))
+
+
+def write_tree(root: TreeLike, file: T.TextIO) -> int:
+    """
+        Writes the pretty-printed tree (see AST.__str__) to an open text file (or buffer),
+        line by line, in a single pass.
+
+        @returns:
+            number of lines written
+    """
+    n_lines = 0
+    for line in iter_lines(root):
+        file.write(line)
+        file.write("\n")
+        n_lines += 1
+    return n_lines
+
+
+def find_diff(a: TreeLike, b: TreeLike, lineno: int = 0) -> T.Tuple[int, int, T.Any]:
+    """
+        First divergence between two trees (see AST.find_diff), in a single preorder traversal
+        of both. Line numbers are those of the pretty-printed 'a', offset by lineno.
+    """
+    # (x, y, False): compare the subtrees; (x, y, True): all common children compared, check their number
+    stack: T.List[T.Tuple[TreeLike, TreeLike, bool]] = [(a, b, False)]
+    while (stack):
+        x, y, children_done = stack.pop()
+        x_children, y_children = x.children, y.children
+        if children_done:
+            if len(x_children) > len(y_children):  # missing children
+                return lineno, -1, x_children[len(y_children)]
+            else:
+                return lineno, 2, y_children[len(x_children)]
+        if x.value != y.value:
+            return lineno, 1, y.value
+        lineno += 1
+        if len(x_children) != len(y_children):
+            stack.append((x, y, True))
+        stack.extend((c1, c2, False) for c1, c2 in reversed(list(zip(x_children, y_children))))
+    return -1, 0, ""  # equal
 
 
 class AST:
@@ -14,41 +128,27 @@ class AST:
         self.value: str = value
         self.children: T.List["AST"] = children
 
-    def _stringify(self, current_depth):
-        final_str = ""
-        final_str += current_depth * " " + str(self.value) + "\n"
-        link = "└──"
-        for subtree in self.children:
-            spacing = current_depth * " " + link + "─" * max(len(str(self.value)) - 3, 0)
-            final_str += spacing + subtree._stringify(len(spacing))[len(spacing):]
-        return final_str
+    def write(self, file: T.TextIO) -> int:
+        """
+            Writes the tree as in str(self) to an open text file, see write_tree.
+        """
+        return write_tree(self, file)
 
     def __str__(self):
-        return self._stringify(0)
+        buffer = io.StringIO()
+        write_tree(self, buffer)
+        return buffer.getvalue()
 
     # TODO decide on implementation of internal representation (repr)
     #  def __repr__(self):
     #      return str(self)
 
     def __repr__(self):
-        if len(self.children) == 0:
-            return f"[{self.value}]"
-        else:
-            repr_str = "["
-            repr_str += str(self.value)
-            for c in self.children:
-                repr_str += ", " + repr(c)
-            repr_str += "]"
-            return repr_str
+        return tree_repr(self)
 
     def __eq__(self, other: object) -> bool:
         if isinstance(other, AST):
-            if (self.value != other.value) or (len(self.children) != len(other.children)):
-                return False
-            for c1, c2 in zip(self.children, other.children):
-                if not (c1 == c2):
-                    return False
-            return True
+            return trees_equal(self, other)
         else:
             return NotImplemented
 
@@ -60,29 +160,14 @@ class AST:
             Performs a detailed comparison between ASTs
 
             @return
-                [int] : line number of first diff
+                [int] : line number of first diff (0-based, in str(self), offset by lineno)
                 [int] : type of diff
-                    -1 for missing children in "other"
+                    -1 for missing children in "other" (the line is the one of the first missing child)
                     0 for equal
                     1 for different values
-                    2 for extra children in "other", not in the first AST
+                    2 for extra children in "other", not in the first AST (the line is where it would be in self)
                 [Union[str, AST]] if mode 1, string value of different symbol. Else return the whole subtree
         """
         if not isinstance(other, AST):
             raise ValueError(f"Can't perform rich comparison on object of type {type(other)} != AST")
-        else:
-            if self.value != other.value:
-                return lineno, 1, other.value
-            else:
-                lineno += 1
-                for c1, c2 in zip(self.children, other.children):
-                    if c1 != c2:
-                        return c1.find_diff(c2, lineno)
-                    else:
-                        lineno += len(str(c1).split('\n'))
-                if len(self.children) > len(other.children):  # missing children
-                    return lineno + 1, -1, self.children[len(other.children)]
-                elif len(other.children) > len(self.children):
-                    return lineno + 1, 2, other.children[len(self.children)]
-                else:
-                    return -1, 0, ""  # equal
+        return find_diff(self, other, lineno)
@@ -0,0 +1,136 @@
+"""
+    Compact AST storage: all nodes of a tree live in a few parallel int arrays
+    (about 20 bytes per node) instead of one Python object (plus a list) each.
+    Nodes are only materialized as lightweight views when they are visited.
+"""
+import typing as T
+import io
+from array import array
+from utils.AST import AST, find_diff, tree_repr, trees_equal, write_tree
+
+
+class AST_Arena:
+    """
+        Flat storage of AST nodes, built bottom-up (children before their parent) by an LR parser.
+
+        @attrs:
+            symbol [array[int]]: node -> symbol id (-1 for the root of a failed parse)
+            first_child [array[int]]: node -> position of its first child in 'children'
+            child_count [array[int]]: node -> number of children
+            token [array[int]]: node -> index of its token in the input (-1 for inner nodes)
+            children [array[int]]: the children of node n are children[first_child[n]:first_child[n] + child_count[n]]
+            names [list[str]]: symbol id -> name (node values)
+    """
+
+    def __init__(self, names: T.Sequence[str]):
+        self.names: T.List[str] = list(names)
+        self.symbol = array('i')
+        self.first_child = array('i')
+        self.child_count = array('i')
+        self.token = array('i')
+        self.children = array('i')
+        self.n_tokens = 0
+
+    def __len__(self) -> int:
+        return len(self.symbol)
+
+    def leaf(self, symbol: int) -> int:
+        """
+            Adds a node for the next token of the input (a terminal with id 'symbol') and returns its id.
+        """
+        self.symbol.append(symbol)
+        self.first_child.append(len(self.children))
+        self.child_count.append(0)
+        self.token.append(self.n_tokens)
+        self.n_tokens += 1
+        return len(self.symbol) - 1
+
+    def node(self, symbol: int, children: T.Sequence[int]) -> int:
+        """
+            Adds an inner node with the given (already added) children and returns its id.
+        """
+        self.symbol.append(symbol)
+        self.first_child.append(len(self.children))
+        self.child_count.append(len(children))
+        self.token.append(-1)
+        self.children.extend(children)
+        return len(self.symbol) - 1
+
+    def reducer(self, symbol: int) -> T.Callable[[T.List[int]], int]:
+        """
+            Reducer (see parsers.driver.PushParser) adding a node for variable 'symbol'.
+        """
+        return lambda children: self.node(symbol, children)
+
+    def view(self, node: int) -> "AST_View":
+        return AST_View(self, node)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.symbol, self.first_child, self.child_count, self.token, self.children)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+
+class AST_View:
+    """
+        Read-only view of a node of an AST_Arena, with the same interface as AST
+        (value, children, equality, str and repr). Views are created on demand and
+        hold no data besides the node id, so equality, printing and traversal never
+        recurse, whatever the depth of the tree.
+    """
+    __slots__ = ("arena", "node")
+
+    def __init__(self, arena: AST_Arena, node: int):
+        self.arena = arena
+        self.node = node
+
+    @property
+    def value(self) -> T.Union[str, int]:
+        symbol = self.arena.symbol[self.node]
+        return self.arena.names[symbol] if symbol >= 0 else -1
+
+    @property
+    def token_index(self) -> int:
+        """
+            Position of the token in the input (-1 for inner nodes).
+        """
+        return self.arena.token[self.node]
+
+    @property
+    def children(self) -> T.List["AST_View"]:
+        arena = self.arena
+        start = arena.first_child[self.node]
+        return [AST_View(arena, c) for c in arena.children[start:start + arena.child_count[self.node]]]
+
+    def to_ast(self) -> AST:
+        """
+            Copy of the subtree as plain AST nodes.
+        """
+        root = AST(self.value, [])
+        stack = [(self, root)]
+        while (stack):
+            view, node = stack.pop()
+            for c in view.children:
+                child = AST(c.value, [])
+                node.children.append(child)
+                stack.append((c, child))
+        return root
+
+    def write(self, file: T.TextIO) -> int:
+        return write_tree(self, file)
+
+    def find_diff(self, other: T.Union[AST, "AST_View"], lineno: int = 0) -> T.Tuple[int, int, T.Any]:
+        return find_diff(self, other, lineno)
+
+    def __str__(self):
+        buffer = io.StringIO()
+        write_tree(self, buffer)
+        return buffer.getvalue()
+
+    def __repr__(self):
+        return tree_repr(self)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (AST, AST_View)):
+            return trees_equal(self, other)
+        return NotImplemented
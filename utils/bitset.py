@@ -0,0 +1,83 @@
+"""
+    Sets of small non-negative integers (e.g. terminal ids) represented as Python ints,
+    bit i being set iff i belongs to the set. Union is a single '|', and comparing
+    two sets is an integer comparison.
+"""
+import typing as T
+
+
+def bits_of(elements: T.Iterable[int]) -> int:
+    mask = 0
+    for i in elements:
+        mask |= 1 << i
+    return mask
+
+
+def iter_bits(mask: int) -> T.Iterator[int]:
+    """
+        Elements of the set, in increasing order.
+    """
+    while (mask):
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def count_bits(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+class BitsetMapping(T.Mapping[str, T.Set[str]]):
+    """
+        Read-only view of a family of bitsets with the same API as a dict[str, set[str]].
+
+        @attrs:
+            index [dict[str, int]]: key -> row
+            rows [list[int]]: the bitsets
+            bit_names [list[str]]: name of each bit
+            epsilon [Optional[list[bool]]]: rows whose (decoded) set also contains the empty word ''
+
+        Rows are decoded on first access and memoized, so the view should not be
+        kept around if the underlying rows are mutated.
+    """
+
+    def __init__(self,
+                 index: T.Dict[str, int],
+                 rows: T.Sequence[int],
+                 bit_names: T.Sequence[str],
+                 epsilon: T.Optional[T.Sequence[bool]] = None):
+        self.index = index
+        self.rows = rows
+        self.bit_names = bit_names
+        self.epsilon = epsilon
+        self._decoded: T.Dict[str, T.Set[str]] = dict()
+
+    def bits(self, key: str) -> int:
+        """
+            Raw bitset of a key (without the empty word).
+        """
+        return self.rows[self.index[key]]
+
+    def __getitem__(self, key: str) -> T.Set[str]:
+        if key not in self._decoded:
+            row = self.index[key]
+            decoded = set(self.bit_names[i] for i in iter_bits(self.rows[row]))
+            if (self.epsilon is not None and self.epsilon[row]):
+                decoded.add('')
+            self._decoded[key] = decoded
+        return self._decoded[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.index
+
+    def __iter__(self) -> T.Iterator[str]:
+        return iter(self.index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def to_dict(self) -> T.Dict[str, T.Set[str]]:
+        """
+            Plain dict with fresh sets (safe to modify).
+        """
+        return {key: set(self[key]) for key in self.index}
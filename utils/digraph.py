@@ -0,0 +1,69 @@
+import typing as T
+
+V = T.TypeVar("V")
+
+
+def digraph(relation: T.Sequence[T.Sequence[int]],
+            values: T.List[V]) -> T.List[V]:
+    """
+        DeRemer and Pennello's digraph algorithm.
+
+        Given a relation R over the nodes 0 ... n-1 (relation[x] lists every y with x R y)
+        and initial values F'(x), computes in place the smallest F satisfying
+
+            F(x) = F'(x) U U{ F(y) | x R y }
+
+        Values only need to support the '|' operator (sets and int bitmasks both work).
+        This is Tarjan's strongly connected components traversal: every node of a
+        component receives the same (final) value, so each edge is followed exactly once
+        and the cost is linear on the size of the relation.
+        The traversal uses an explicit stack, so long chains do not hit the recursion limit.
+
+        NOTE: nodes of the same component end up sharing the same value object.
+
+        @returns:
+            the (updated) list of values
+    """
+    n = len(relation)
+    infinity = n + 1
+    depth: T.List[int] = [0] * n
+    stack: T.List[int] = []
+    for root in range(n):
+        if depth[root] != 0:
+            continue
+        stack.append(root)
+        depth[root] = len(stack)
+        # frames hold (node, index of next successor, depth on entry)
+        frames: T.List[T.Tuple[int, int, int]] = [(root, 0, depth[root])]
+        while (frames):
+            x, i, d = frames[-1]
+            successors = relation[x]
+            if i < len(successors):
+                frames[-1] = (x, i + 1, d)
+                y = successors[i]
+                if depth[y] == 0:
+                    stack.append(y)
+                    depth[y] = len(stack)
+                    frames.append((y, 0, depth[y]))
+                    continue
+                if depth[y] < depth[x]:
+                    depth[x] = depth[y]
+                values[x] = values[x] | values[y]
+                continue
+
+            # all successors of x visited
+            frames.pop()
+            if depth[x] == d:
+                # x is the root of a strongly connected component
+                while (True):
+                    top = stack.pop()
+                    depth[top] = infinity
+                    values[top] = values[x]
+                    if top == x:
+                        break
+            if (frames):
+                parent = frames[-1][0]
+                if depth[x] < depth[parent]:
+                    depth[parent] = depth[x]
+                values[parent] = values[parent] | values[x]
+    return values
@@ -0,0 +1,175 @@
+"""
+    Shared packed parse forests (SPPF), the result of GLR parsing: all the parse trees of an
+    ambiguous input in a single DAG. Nodes are shared by symbol and span (a subtree derived in
+    several ways is stored once), and each node holds its alternative derivations (families)
+    side by side instead of duplicating its ancestors.
+"""
+import typing as T
+import math
+from utils.AST import AST
+
+
+class SPPF_Node:
+    """
+        @attrs:
+            value [Any]: variable name, or token value for terminals (leaves)
+            symbol [int]: symbol id
+            start [int]: index of the first token it covers
+            end [int]: index after the last token it covers
+            families [list[list[SPPF_Node]]]: alternative lists of children (empty for terminals,
+                a single empty list for variables derived to the empty word)
+    """
+    __slots__ = ("value", "symbol", "start", "end", "families")
+
+    def __init__(self, value: T.Any, symbol: int, start: int, end: int):
+        self.value = value
+        self.symbol = symbol
+        self.start = start
+        self.end = end
+        self.families: T.List[T.List["SPPF_Node"]] = []
+
+    def add_family(self, children: T.List["SPPF_Node"]):
+        for family in self.families:
+            if len(family) == len(children) and all(a is b for a, b in zip(family, children)):
+                return
+        self.families.append(children)
+
+    def nodes(self) -> T.Iterator["SPPF_Node"]:
+        """
+            Every node of the forest below this one (itself included), once, without recursion.
+        """
+        seen = {id(self)}
+        stack = [self]
+        while (stack):
+            node = stack.pop()
+            yield node
+            for family in node.families:
+                for child in family:
+                    if id(child) not in seen:
+                        seen.add(id(child))
+                        stack.append(child)
+
+    @property
+    def ambiguous(self) -> bool:
+        return any(len(node.families) > 1 for node in self.nodes())
+
+    def count_trees(self) -> T.Union[int, float]:
+        """
+            Number of parse trees in the forest (the product of the choices of each family,
+            summed over families), computed bottom-up in time linear on the size of the forest.
+            Infinite (math.inf) if the forest has a cycle, as for grammars with A =>+ A.
+        """
+        counts: T.Dict[int, int] = dict()
+        expanding: T.Set[int] = set()
+        stack = [(self, False)]
+        while (stack):
+            node, expanded = stack.pop()
+            if id(node) in counts:
+                continue
+            if not node.families:
+                counts[id(node)] = 1
+            elif expanded:
+                expanding.discard(id(node))
+                total = 0
+                for family in node.families:
+                    product = 1
+                    for child in family:
+                        product *= counts[id(child)]
+                    total += product
+                counts[id(node)] = total
+            else:
+                expanding.add(id(node))
+                stack.append((node, True))
+                for family in node.families:
+                    for child in family:
+                        if id(child) in expanding:
+                            return math.inf
+                        if id(child) not in counts:
+                            stack.append((child, False))
+        return counts[id(self)]
+
+    def _finite_families(self) -> T.Dict[int, T.List["SPPF_Node"]]:
+        """
+            A family of every node leading to a finite tree: its first family, unless the first
+            families make a cycle, in which case the first family whose children were all found
+            to derive a finite tree before the node itself (so choices never loop).
+        """
+        nodes = list(self.nodes())
+        choice = {id(node): node.families[0] for node in nodes if node.families}
+        if self.count_trees() != math.inf:
+            return choice
+        # rank of each node in the order in which its finiteness is established
+        rank: T.Dict[int, int] = dict()
+        waiting: T.Dict[int, T.List[T.Tuple["SPPF_Node", T.List[int]]]] = dict()
+        ready = []
+        for node in nodes:
+            if not node.families:
+                ready.append(node)
+            for family in node.families:
+                missing = [len(family)]
+                if not family:
+                    ready.append(node)
+                for child in family:
+                    waiting.setdefault(id(child), []).append((node, missing))
+        while (ready):
+            node = ready.pop()
+            if id(node) in rank:
+                continue
+            rank[id(node)] = len(rank)
+            for parent, missing in waiting.get(id(node), ()):
+                missing[0] -= 1
+                if missing[0] == 0 and id(parent) not in rank:
+                    ready.append(parent)
+        for node in nodes:
+            if node.families:
+                choice[id(node)] = next(family for family in node.families
+                                        if all(rank.get(id(child), len(rank)) < rank[id(node)] for child in family))
+        return choice
+
+    def first_tree(self) -> AST:
+        """
+            One of the parse trees (the first family of every node, see _finite_families), as an AST.
+        """
+        choice = self._finite_families()
+        root = AST(self.value, [])
+        stack = [(self, root)]
+        while (stack):
+            node, tree = stack.pop()
+            if node.families:
+                for child in choice[id(node)]:
+                    subtree = AST(child.value, [])
+                    tree.children.append(subtree)
+                    stack.append((child, subtree))
+        return root
+
+    def trees(self) -> T.Iterator[AST]:
+        """
+            All parse trees, as ASTs (beware: there can be exponentially many). On cyclic
+            forests, only the trees where no node is its own descendant (finitely many).
+        """
+        yield from self._trees(frozenset())
+
+    def _trees(self, ancestors: T.FrozenSet[int]) -> T.Iterator[AST]:
+        if not self.families:
+            yield AST(self.value, [])
+            return
+        ancestors = ancestors | {id(self)}
+        for family in self.families:
+            if all(id(child) not in ancestors for child in family):
+                yield from self._family_trees(family, 0, [], ancestors)
+
+    def _family_trees(self,
+                      family: T.List["SPPF_Node"],
+                      i: int,
+                      prefix: T.List[AST],
+                      ancestors: T.FrozenSet[int]) -> T.Iterator[AST]:
+        if i == len(family):
+            yield AST(self.value, list(prefix))
+            return
+        for subtree in family[i]._trees(ancestors):
+            prefix.append(subtree)
+            yield from self._family_trees(family, i + 1, prefix, ancestors)
+            prefix.pop()
+
+    def __repr__(self):
+        return f"SPPF_Node({self.value!r}, {self.start}, {self.end}, families={len(self.families)})"
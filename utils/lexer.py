@@ -0,0 +1,122 @@
+"""
+    Regex lexer producing the token stream of a parser.
+
+    Every terminal is defined by a regular expression. All of them are combined into a
+    single master regex, where rule i is an optional lookahead group: one match at a
+    position tells how far each rule reaches from there, so the longest match wins and,
+    among matches of the same length, the rule defined first (the priority rule of lex).
+
+    Tokens carry the terminal id of the grammar (see CompiledGrammar.ids) instead of its
+    name, so the parser can use them without any lookup (see SLR_Parser.parse_tokens).
+"""
+import typing as T
+import mmap
+import re
+
+AnyStr = T.TypeVar("AnyStr", str, bytes)
+
+
+class Token(T.NamedTuple):
+    """
+        @attrs:
+            type [int]: terminal id
+            text [str]: matched text
+            offset [int]: position of the first character in the input (in bytes when reading files)
+            line [int]: line number, starting at 1
+            column [int]: column of the first character, starting at 1 (in bytes when reading files)
+    """
+    type: int
+    text: str
+    offset: int
+    line: int
+    column: int
+
+
+class Lexer:
+    """
+        @attrs:
+            rules [list[tuple[str, str]]]: (terminal name, regex), by decreasing priority
+            ignore [list[str]]: regexes of text skipped between tokens (e.g. whitespace, comments)
+            types [list[int]]: terminal id of each rule (-1 for ignored text), in master group order
+    """
+
+    def __init__(self,
+                 rules: T.Sequence[T.Tuple[str, str]],
+                 symbol_ids: T.Mapping[str, int],
+                 ignore: T.Sequence[str] = ()):
+        """
+            Args:
+                rules: (terminal name, regex) pairs, by decreasing priority
+                symbol_ids (dict[str, int]): terminal name -> terminal id
+                ignore: regexes of text to skip
+        """
+        self.rules = list(rules)
+        self.ignore = list(ignore)
+        self.types: T.List[int] = []
+        patterns: T.List[str] = []
+        for name, pattern in self.rules:
+            if name not in symbol_ids:
+                raise ValueError(f"Lexer rule for unknown terminal '{name}'")
+            self.types.append(symbol_ids[name])
+            patterns.append(pattern)
+        for pattern in self.ignore:
+            self.types.append(-1)
+            patterns.append(pattern)
+        for pattern in patterns:
+            if re.compile(pattern).groups > 0:
+                # capturing groups would shift the group numbers of the master regex
+                raise ValueError(f"Lexer rule '{pattern}' has capturing groups, use (?:...) instead")
+        self._patterns = patterns
+        self._master = re.compile("".join(f"(?:(?=({p})))?" for p in patterns))
+        self._master_bytes: T.Optional[T.Pattern[bytes]] = None
+
+    @staticmethod
+    def _scan(data: AnyStr,
+              master: T.Pattern[AnyStr],
+              types: T.Sequence[int],
+              decode: T.Callable[[AnyStr], str]) -> T.Iterator[Token]:
+        newline = "\n" if isinstance(data, str) else b"\n"
+        n_rules = len(types)
+        match = master.match
+        pos, size = 0, len(data)
+        line, line_start = 1, 0
+        while (pos < size):
+            spans = match(data, pos).regs
+            best, best_end = -1, pos
+            for i in range(1, n_rules + 1):
+                end = spans[i][1]
+                if end > best_end:  # longest match, earlier rules first on ties
+                    best, best_end = i, end
+            if best == -1:
+                raise ValueError(f"Unexpected character {decode(data[pos:pos + 1])!r} at line {line}, column {pos - line_start + 1}")
+            t = types[best - 1]
+            raw = data[pos:best_end]
+            if t != -1:
+                yield Token(t, decode(raw), pos, line, pos - line_start + 1)
+            newlines = raw.count(newline)
+            if newlines:
+                line += newlines
+                line_start = pos + raw.rfind(newline) + 1
+            pos = best_end
+
+    def tokenize(self, text: str) -> T.Iterator[Token]:
+        """
+            Tokens of a string, produced lazily.
+        """
+        return self._scan(text, self._master, self.types, str)
+
+    def tokenize_file(self, filepath: str, encoding: str = "utf-8") -> T.Iterator[Token]:
+        """
+            Tokens of a file, produced lazily from a memory mapping of it (the file is never read
+            as a whole). Patterns are matched against the encoded bytes, so offsets and columns
+            count bytes.
+        """
+        if self._master_bytes is None:
+            self._master_bytes = re.compile(b"".join(b"(?:(?=(" + p.encode(encoding) + b")))?" for p in self._patterns))
+        with open(filepath, "rb") as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                return
+        with buffer:
+            yield from self._scan(buffer, self._master_bytes, self.types, lambda raw: bytes(raw).decode(encoding))
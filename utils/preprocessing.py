@@ -2,16 +2,36 @@ import typing as T
 from grammar import Grammar
 
 
+PRECEDENCE_DECLARATIONS = {"%left": "left", "%right": "right", "%nonassoc": "nonassoc"}
+
+
 def parse_file(filepath: str,
                rule_separator: str = "->",
                or_clause: str = '|') -> Grammar:
+    """
+        Reads a grammar, one variable per line: 'var -> word1 | word2 | ... | wordn'.
+
+        yacc-style precedence declarations are also accepted, one level per line, from the
+        lowest to the highest precedence:
+            %left PLUS MINUS
+            %right POW
+            %nonassoc EQ
+        and a word may end with '%prec TERMINAL' to take the precedence of TERMINAL instead
+        of the one of its last terminal (see Grammar).
+    """
     grammar: T.Dict[str, T.Set[str]] = dict()
     start: str = ""
+    precedence: T.List[T.Tuple[str, T.List[str]]] = []
+    production_precedence: T.Dict[T.Tuple[str, T.Tuple[str, ...]], str] = dict()
 
     with open(filepath, 'r') as f:
         for line in f.readlines():
             if len(line.strip()) == 0:
                 continue
+            declaration = line.split()[0]
+            if declaration in PRECEDENCE_DECLARATIONS:
+                precedence.append((PRECEDENCE_DECLARATIONS[declaration], line.split()[1:]))
+                continue
             if (len(line.strip()) != 0 and len(line.lstrip().split(rule_separator)) != 2):
                 raise ValueError(f"In line '{line.lstrip()}' \n\
                         Wrong format: each line must be either empty or \
@@ -22,10 +42,48 @@ def parse_file(filepath: str,
                 start = var
             words = raw_production.split(or_clause)
             words = [w.strip() for w in words]  # remove internal whitespace
+            for i, w in enumerate(words):
+                if "%prec" in w.split():
+                    symbols = w.split()
+                    if (len(symbols) < 2 or symbols[-2] != "%prec"):
+                        raise ValueError(f"In line '{line.lstrip()}' \n\
+                        Wrong format: '%prec TERMINAL' must end the word")
+                    words[i] = " ".join(symbols[:-2])
+                    production_precedence[var, tuple(symbols[:-2])] = symbols[-1]
             # now we are sure the format is right
             # unite on or_clause
             if (var not in grammar):
                 grammar[var] = set()
             grammar[var] = grammar[var].union(set(words))
 
-    return Grammar(grammar, start)
+    return Grammar(grammar, start, precedence=precedence, production_precedence=production_precedence)
+
+
+def parse_lexer_file(filepath: str,
+                     rule_separator: str = "->",
+                     ignore_name: str = "%ignore") -> T.Tuple[T.List[T.Tuple[str, str]], T.List[str]]:
+    """
+        Reads terminal definitions, one per line, of the format 'terminal -> regex' (by decreasing
+        priority). Text matching a line '%ignore -> regex' is skipped between tokens.
+
+        @returns:
+            rules and ignored patterns, as expected by utils.lexer.Lexer
+    """
+    rules: T.List[T.Tuple[str, str]] = []
+    ignore: T.List[str] = []
+
+    with open(filepath, 'r') as f:
+        for line in f.readlines():
+            if len(line.strip()) == 0:
+                continue
+            if (rule_separator not in line):
+                raise ValueError(f"In line '{line.lstrip()}' \n\
+                        Wrong format: each line must be either empty or of the format 'terminal -> regex'")
+            name, pattern = line.strip().split(rule_separator, 1)  # the regex may contain the separator
+            name, pattern = name.strip(), pattern.strip()
+            if name == ignore_name:
+                ignore.append(pattern)
+            else:
+                rules.append((name, pattern))
+
+    return rules, ignore